@@ -50,7 +50,10 @@ try:
     import pandas as pd
     from datetime import datetime
     import os
-    import sqlite3
+    from views import (STAT_FIELDS, LEADERBOARD_COLS, PLAYER_VIEW_COLS, RECENT_GAMES_MAX, GamelogStore,
+                       make_display_df, compute_percent_hits, leaderboard, attach_schedule_context, format_next_game)
+    from schedule_context import load_next_games, load_schedule_context
+    from storage import load_players
 except ImportError as e:
     st.error(f"Import Error: {e}")
     st.stop()
@@ -87,51 +90,59 @@ def check_password():
 try:
     if check_password():
         DB_PATH = "gamelogs.db"
+        # Parquet copy written by stats.py; only the selected seasons' partitions are read
+        EXPORT_DIR = "gamelogs_parquet"
 
-        def db_mtime(path):
-            return os.path.getmtime(path) if os.path.exists(path) else 0
+        @st.cache_resource
+        def get_store():
+            # One store per server process; its LRU cache is shared by every session
+            return GamelogStore(DB_PATH, EXPORT_DIR)
 
-        @st.cache_data
-        def load_gamelogs(db_path, mtime):
-            if not os.path.exists(db_path):
-                return pd.DataFrame()
+        def store_read(method, *args, default=None, **kwargs):
             try:
-                conn = sqlite3.connect(db_path)
-                df = pd.read_sql_query("SELECT * FROM gamelogs", conn)
-                conn.close()
-                if not df.empty:
-                    df['season_label'] = df['Season']
-                    df['is_preseason'] = df['GameType'] == 'Preseason'
-                return df
+                return method(*args, **kwargs)
             except Exception as e:
                 st.error(f"Error reading database: {e}")
+                return pd.DataFrame() if default is None else default
+
+        @st.cache_data
+        def load_players_data(version):
+            try:
+                return load_players(DB_PATH)
+            except Exception as e:
+                st.error(f"Error reading the players table: {e}")
                 return pd.DataFrame()
 
         @st.cache_data
-        def load_players_data():
-            path = "players.xlsx"
-            if not os.path.exists(path):
+        def load_player_context(player_id, version):
+            # One player's rows through the schedule_context primary key
+            try:
+                return load_schedule_context(DB_PATH, [player_id])
+            except Exception as e:
+                st.error(f"Error reading the schedule context: {e}")
                 return pd.DataFrame()
+
+        @st.cache_data
+        def load_upcoming_games(version):
             try:
-                return pd.read_excel(path)
+                return load_next_games(DB_PATH)
             except Exception as e:
-                st.error(f"Error reading players.xlsx: {e}")
+                st.error(f"Error reading the schedule context: {e}")
                 return pd.DataFrame()
 
-        df = load_gamelogs(DB_PATH, db_mtime(DB_PATH))
-        players_df = load_players_data()
+        store = get_store()
+        version = store.version()
+        all_season_labels = store_read(store.seasons, default=[])
+        players_df = load_players_data(version)
 
-        if df.empty:
+        if not all_season_labels:
             st.warning("No data found in gamelogs.db or database file is missing.")
         else:
-            all_players = sorted(df['Player'].unique())
-
             # Sidebar selectors
             st.sidebar.markdown("## 📊 Navigation & Filters")
             view_mode = st.sidebar.radio('View Mode', ['Select Player', 'Select Stat'])
             
-            # Season selector (loaded from pre-calculated database column)
-            all_season_labels = sorted(df['season_label'].dropna().unique(), reverse=True)
+            # Season selector (from the export's partitions or the database's Season column)
             selected_seasons = st.sidebar.multiselect('Select Season(s)', all_season_labels, default=all_season_labels[:1] if all_season_labels else [])
             
             # Game Type selector
@@ -139,24 +150,42 @@ try:
             selected_game_types = st.sidebar.multiselect('Select Game Type(s)', all_game_types, default=['Regular Season', 'Playoffs'])
 
             selected_player = None
+            selected_player_id = None
             if view_mode == 'Select Player':
-                selected_player = st.sidebar.selectbox('Select Player', all_players, key='player_select')
-
-            # Filter data based on sidebar settings
-            df_filtered = df.copy()
-            if selected_seasons:
-                df_filtered = df_filtered[df_filtered['season_label'].isin(selected_seasons)]
-            if selected_game_types:
-                df_filtered = df_filtered[df_filtered['GameType'].isin(selected_game_types)]
-
-            if view_mode == 'Select Player' and selected_player:
-                df_filtered = df_filtered[df_filtered['Player'] == selected_player]
+                # Options are PlayerIDs, since names can collide; shared names show the id to tell them apart
+                all_players = store_read(store.players, selected_seasons, selected_game_types, default=[])
+                names = dict(all_players)
+                counts = pd.Series(list(names.values()), dtype=object).value_counts()
+                shared = set(counts[counts > 1].index)
+                selected_player_id = st.sidebar.selectbox(
+                    'Select Player', list(names), key='player_select',
+                    format_func=lambda pid: f"{names[pid]} (#{pid})" if names[pid] in shared else names[pid])
+                selected_player = names.get(selected_player_id)
+
+            # Each player's last 20 games of the selection, ranked at ingest (recent_games); the
+            # Last 5/10/20 tabs filter on that rank, and only the view's columns are read
+            if view_mode == 'Select Player':
+                df_filtered = (store_read(store.recent_games, selected_seasons, selected_game_types, RECENT_GAMES_MAX,
+                                          selected_player_id, PLAYER_VIEW_COLS)
+                               if selected_player_id is not None else pd.DataFrame())
+            else:
+                df_filtered = store_read(store.recent_games, selected_seasons, selected_game_types, RECENT_GAMES_MAX,
+                                         columns=LEADERBOARD_COLS)
+            upcoming = load_upcoming_games(version)
+            next_game = ''
+            if view_mode == 'Select Player' and selected_player_id is not None and not df_filtered.empty:
+                df_filtered = attach_schedule_context(df_filtered, load_player_context(selected_player_id, version))
+                if not upcoming.empty:
+                    rows = upcoming[upcoming['PlayerID'] == selected_player_id]
+                    next_game = format_next_game(rows.iloc[0]) if not rows.empty else ''
 
             st.title('NBA Player Game Logs')
             
             if view_mode == 'Select Player':
                 if selected_player:
                     st.subheader(f"🏀 {selected_player}")
+                    if next_game:
+                        st.markdown(f"**Next game:** {next_game}")
                     st.write("Showing summary stats for Last 5, Last 10, and Last 20 games.")
                 else:
                     st.subheader("No player loaded")
@@ -165,12 +194,7 @@ try:
                 st.subheader("🏆 Leaderboard View")
                 st.write("Showing the Top 10 players who hit the selected stats in their Last 5, 10, and 20 games.")
 
-            columns_to_display = [
-                'Date', 'Team', 'Opponent', 'WL', 'Status', 'Pos', 'MIN',
-                'PTS', 'TPM', 'REB', 'AST', 'STL', 'BLK', 'TOV',
-                'P|R|A', 'P|A', 'P|R'
-            ]
-            stat_fields = ['PTS', 'TPM', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'P|R|A', 'P|A', 'P|R']
+            stat_fields = STAT_FIELDS
 
             # Target Stat Line Filters Layout
             stat_inputs = {}
@@ -245,51 +269,12 @@ try:
                             pass
                     st.dataframe(df_out, width='stretch', hide_index=True)
 
-            def make_display_df(df_source, n):
-                if df_source.empty:
-                    return pd.DataFrame(columns=columns_to_display)
-                temp = df_source.sort_values('Date', ascending=False).head(n).copy()
-                
-                # Calculate combined columns if present
-                for combo, parts in [('P|R|A', ['PTS', 'REB', 'AST']), ('P|A', ['PTS', 'AST']), ('P|R', ['PTS', 'REB'])]:
-                    if all(p in temp.columns for p in parts):
-                        temp[combo] = temp[parts].astype(float).sum(axis=1)
-                
-                if 'Date' in temp.columns:
-                    temp['Date'] = pd.to_datetime(temp['Date'], errors='coerce').dt.strftime('%Y-%m-%d')
-                
-                for col in ['FGPercent', 'TPPercent', 'FTPercent', 'FIC']:
-                    if col in temp.columns:
-                        temp[col] = temp[col].apply(lambda x: f'{x:.3f}' if pd.notnull(x) else '')
-                
-                for col in columns_to_display:
-                    if col not in temp.columns:
-                        temp[col] = ''
-                        
-                return temp[columns_to_display].copy()
-
             display_5 = make_display_df(df_filtered, 5)
             display_10 = make_display_df(df_filtered, 10)
             display_20 = make_display_df(df_filtered, 20)
 
-            def compute_percent_hits(display_df_local):
-                results = {}
-                n = len(display_df_local)
-                if n == 0:
-                    for stat in stat_fields:
-                        results[stat] = None
-                    return results
-                for stat in stat_fields:
-                    if stat in display_df_local.columns and stat_inputs[stat] > 0:
-                        mask = display_df_local[stat].astype(float) >= stat_inputs[stat]
-                        percent = mask.sum() / n * 100
-                        results[stat] = percent
-                    else:
-                        results[stat] = None
-                return results
-
             def render_table_with_summary(display_df_local, title):
-                percents = compute_percent_hits(display_df_local)
+                percents = compute_percent_hits(display_df_local, stat_inputs)
                 
                 active_stats = [stat for stat in stat_fields if stat_inputs.get(stat, 0) > 0]
                 if active_stats:
@@ -301,7 +286,7 @@ try:
                             unsafe_allow_html=True
                         )
                         
-                    base_cols = ['Date', 'Team', 'Opponent', 'WL', 'Status', 'Pos', 'MIN']
+                    base_cols = ['Date', 'Team', 'Opponent', 'H/A', 'Rest', 'B2B', 'WL', 'Status', 'Pos', 'MIN']
                     cols_to_keep = [c for c in base_cols + active_stats if c in display_df_local.columns]
                     display_df_local = display_df_local[cols_to_keep]
 
@@ -334,8 +319,8 @@ try:
                     
                     styled = display_df_local.style.set_properties(**{'text-align': 'right'}).set_table_styles([
                         dict(selector='th', props=[('text-align', 'right')]),
-                        dict(selector='td:nth-child(-n+7)', props=[('text-align', 'left')]), # Text columns left-aligned
-                        dict(selector='th:nth-child(-n+7)', props=[('text-align', 'left')])
+                        dict(selector='td:nth-child(-n+10)', props=[('text-align', 'left')]), # Text columns left-aligned
+                        dict(selector='th:nth-child(-n+10)', props=[('text-align', 'left')])
                     ]).apply(lambda _: highlight_rows(display_df_local), axis=None)
                     st.dataframe(styled, width='stretch', hide_index=True)
                 except Exception as e:
@@ -351,63 +336,11 @@ try:
                     st.write("No gamelogs available.")
                     return
                 
-                temp = df_all.copy()
-                for combo, parts in [('P|R|A', ['PTS', 'REB', 'AST']), ('P|A', ['PTS', 'AST']), ('P|R', ['PTS', 'REB'])]:
-                    if all(p in temp.columns for p in parts):
-                        temp[combo] = temp[parts].astype(float).sum(axis=1)
-
-                cols_to_keep = ['Player', 'Date'] + [col for col in stat_fields if stat_inputs[col] > 0]
-                temp_filtered = temp[[c for c in cols_to_keep if c in temp.columns]].copy()
-                
-                temp_filtered['Date'] = pd.to_datetime(temp_filtered['Date'], errors='coerce')
-                temp_filtered = temp_filtered.sort_values(['Player', 'Date'], ascending=[True, False])
-                temp_filtered = temp_filtered.groupby('Player').head(n_games)
-                
-                hit_mask = pd.Series([True] * len(temp_filtered), index=temp_filtered.index)
-                for stat in stat_fields:
-                    if stat_inputs[stat] > 0 and stat in temp_filtered.columns:
-                        hit_mask = hit_mask & (temp_filtered[stat].astype(float) >= stat_inputs[stat])
-                
-                temp_filtered['Hit'] = hit_mask.astype(int)
-                
-                def calc_active_streak(series):
-                    streak = 0
-                    for val in series:
-                        if val == 1:
-                            streak += 1
-                        else:
-                            break
-                    return streak
-
-                agg_df = temp_filtered.groupby('Player').agg(
-                    Hits=('Hit', 'sum'),
-                    GamesPlayed=('Hit', 'count'),
-                    ActiveStreak=('Hit', calc_active_streak)
-                ).reset_index()
-                
-                agg_df = agg_df[agg_df['Hits'] > 0]
-                
-                if agg_df.empty:
+                display_df, temp = leaderboard(df_all, players_base_df, n_games, stat_inputs, upcoming)
+                if display_df.empty:
                     st.write("No players found hitting these stats in the selected timeframe.")
                     return
                 
-                if not players_base_df.empty:
-                    agg_df = agg_df.merge(players_base_df[['Player', 'Pos', 'Age', 'Current Team', 'YOS']], on='Player', how='left')
-                else:
-                    for col in ['Pos', 'Age', 'Current Team', 'YOS']:
-                        agg_df[col] = ''
-                
-                agg_df['IsHotStreak'] = agg_df['ActiveStreak'] >= 3
-                agg_df['LastName'] = agg_df['Player'].apply(lambda n: n.split(' ')[-1] if isinstance(n, str) and ' ' in n else n)
-                agg_df = agg_df.sort_values(['IsHotStreak', 'Hits', 'LastName'], ascending=[False, False, True]).head(10)
-                
-                agg_df['Player'] = agg_df.apply(lambda r: f"🔥 {r['Player']}" if r['IsHotStreak'] else r['Player'], axis=1)
-                agg_df['Hit Rate'] = agg_df.apply(lambda r: f"{r['Hits']} / {r['GamesPlayed']}", axis=1)
-                
-                display_cols = ['Player', 'Pos', 'Age', 'Current Team', 'YOS', 'ActiveStreak', 'Hit Rate']
-                display_df = agg_df[display_cols].copy()
-                display_df.rename(columns={'ActiveStreak': 'Active Streak'}, inplace=True)
-                
                 try:
                     def highlight_hot(val):
                         return 'background-color: rgba(249, 115, 22, 0.15)' if isinstance(val, str) and '🔥' in val else ''
@@ -434,8 +367,10 @@ try:
                     if event and hasattr(event, 'selection') and hasattr(event.selection, 'rows') and len(event.selection.rows) > 0:
                         row_idx = event.selection.rows[0]
                         clean_name = display_df.iloc[row_idx]['Player'].replace('🔥 ', '').strip()
+                        # The table is indexed by PlayerID, so players sharing a name stay apart
+                        player_key = display_df.index[row_idx]
                         
-                        player_details = temp[temp['Player'] == clean_name].copy()
+                        player_details = temp[temp[display_df.index.name] == player_key].copy()
                         player_details['Date'] = pd.to_datetime(player_details['Date'], errors='coerce')
                         player_details = player_details.sort_values('Date', ascending=False).head(n_games)
                         show_player_logs_dialog(clean_name, player_details, title)
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from typing import AsyncIterator, Optional
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from fetching import USER_AGENT, is_challenge_page
+from scheduler import PRIORITY_NORMAL, get_scheduler
+from telemetry import get_telemetry
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+async def _fetch_one(client, sem: asyncio.Semaphore, url: str, timeout: int, tries: int = 3,
+                     cache=None, priority: int = PRIORITY_NORMAL) -> tuple[str, str]:
+    scheduler = get_scheduler()
+    telemetry = get_telemetry()
+    entry = cache.get(url) if cache is not None else None
+    headers = cache.conditional_headers(entry) if cache is not None else {}
+    for attempt in range(tries):
+        queued = time.perf_counter()
+        # Wait for the host's rate budget before taking a connection slot
+        if not await scheduler.acquire_async(url, priority):
+            telemetry.error('fetch', url, fetcher='aiohttp', error='circuit open', retries=attempt)
+            return url, ''
+        async with sem:
+            start = time.perf_counter()
+            try:
+                async with client.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                    status = resp.status
+                    html = await resp.text() if status == 200 else ''
+                    if is_challenge_page(html):
+                        status = 429
+                    latency = time.perf_counter() - start
+                    scheduler.record(url, status, latency, resp.headers.get('Retry-After'))
+                    telemetry.event('fetch', url=url, fetcher='aiohttp', status=status, queue_s=start - queued,
+                                    fetch_s=latency, bytes=len(html), retries=attempt,
+                                    error=f"HTTP {status}" if status not in (200, 304) else None)
+                    if status == 304 and entry is not None:
+                        cache.touch(url)
+                        return url, entry.html
+                    if status == 200:
+                        if cache is not None:
+                            cache.put(url, html, resp.headers.get('ETag'), resp.headers.get('Last-Modified'))
+                        return url, html
+                    if resp.status not in RETRY_STATUSES:
+                        return url, html
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                scheduler.record(url, None, time.perf_counter() - start)
+                telemetry.error('fetch', url, e, fetcher='aiohttp', queue_s=start - queued,
+                                fetch_s=time.perf_counter() - start, retries=attempt)
+        # Back off outside the semaphore so a slow retry does not hold a slot
+        await asyncio.sleep(2 ** attempt)
+    return url, ''
+
+
+async def fetch_as_completed(urls: list[str], *, concurrency: int = 100, per_host: int = 16,
+                             timeout: int = 20, headers: Optional[dict] = None,
+                             cookies: Optional[dict] = None, cache=None,
+                             priorities: Optional[dict] = None) -> AsyncIterator[tuple[str, str]]:
+    """Fetch every URL on one event loop and yield `(url, html)` pairs in completion order.
+
+    `concurrency` caps requests in flight overall, `per_host` caps open connections
+    per host. Fresh pages from `cache` are yielded first without a request; in
+    offline mode nothing else is fetched. Failed pages are yielded with an empty string.
+    Requests are paced by the shared scheduler; `priorities` maps URLs to their priority.
+    """
+    pending = []
+    for url in urls:
+        entry = cache.get(url) if cache is not None else None
+        if entry is not None and entry.fresh:
+            get_telemetry().event('fetch', url=url, fetcher='cache', bytes=len(entry.html))
+            yield url, entry.html
+        elif cache is not None and cache.offline:
+            yield url, ''
+        else:
+            pending.append(url)
+    if not pending:
+        return
+
+    if aiohttp is None:
+        raise RuntimeError("The async engine requires aiohttp (pip install aiohttp)")
+
+    headers = headers or {'User-Agent': USER_AGENT}
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host, ttl_dns_cache=300)
+    sem = asyncio.Semaphore(concurrency)
+    priorities = priorities or {}
+    async with aiohttp.ClientSession(connector=connector, headers=headers, cookies=cookies) as client:
+        tasks = [asyncio.create_task(_fetch_one(client, sem, url, timeout, cache=cache,
+                                                priority=priorities.get(url, PRIORITY_NORMAL))) for url in pending]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                yield await fut
+        finally:
+            for t in tasks:
+                t.cancel()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import stats
+from html_cache import HtmlCache, DEFAULT_CACHE_DIR
+from fixtures import gamelog_page, load_pages
+
+
+def pages_from_cache(cache_dir: str, limit: int) -> dict:
+    if not os.path.exists(os.path.join(cache_dir, 'index.db')):
+        return {}
+    cache = HtmlCache(cache_dir, offline=True)
+    pages = {}
+    for url in cache.urls('%/GameLogs/%', limit):
+        entry = cache.get(url)
+        if entry is not None:
+            pages[url] = entry.html
+    cache.close()
+    return pages
+
+
+def time_parser(fn, pages: dict, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages.values():
+            fn(html)
+        best = min(best, time.perf_counter() - start)
+    return best / max(1, len(pages))
+
+
+def main():
+    p = argparse.ArgumentParser(description='Compare the BeautifulSoup and lxml gamelog parsers on saved pages')
+    p.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='HTML cache to take saved gamelog pages from')
+    p.add_argument('--limit', type=int, default=50, help='Max number of saved pages to use')
+    p.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported)')
+    args = p.parse_args()
+
+    pages = pages_from_cache(args.cache_dir, args.limit)
+    source = 'HTML cache'
+    if not pages:
+        pages = load_pages('gamelogs')
+        source = 'recorded fixtures'
+    if not pages:
+        pages = {f'synthetic-{pid}-{sfx}': gamelog_page(pid, sfx) for pid in range(1, 6) for sfx in ('Reg', 'Playoffs', 'Preseason')}
+        source = 'synthetic pages'
+
+    mismatches = 0
+    for name, html in pages.items():
+        try:
+            pd.testing.assert_frame_equal(stats.parse_gamelogs_table_soup(html), stats.parse_gamelogs_table_fast(html))
+        except AssertionError:
+            mismatches += 1
+            print(f'Output differs for {name}')
+
+    soup_t = time_parser(stats.parse_gamelogs_table_soup, pages, args.repeat)
+    fast_t = time_parser(stats.parse_gamelogs_table_fast, pages, args.repeat)
+    avg_kb = sum(len(h) for h in pages.values()) / len(pages) / 1024
+    print(f'{len(pages)} pages from {source}, avg {avg_kb:.0f} KB, {mismatches} output mismatches')
+    print(f'soup parser: {soup_t * 1000:8.2f} ms/page')
+    print(f'fast parser: {fast_t * 1000:8.2f} ms/page')
+    print(f'speedup:     {soup_t / fast_t:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import gamelog_page, load_pages, players_page, schedule_page
+
+GAMELOG_PATH = re.compile(r'/GameLogs/(\d+)/NBA/All/([\w-]+)/?$')
+SCHEDULE_PATH = re.compile(r'/nba/teams/([\w-]+)/\d+/Schedule/(\d+)/?$')
+
+
+class FixtureServer:
+    """Local stand-in for basketball.realgm.com serving recorded or synthetic fixture pages.
+
+    Every response waits `latency` seconds (plus up to `jitter`), `error_rate` of requests
+    get a 500 and `throttle_rate` a 429 with `Retry-After: 1`, so fetch paths can be
+    benchmarked against a slow or flaky site without touching the network. Recorded
+    pages from benchmarks/fixtures/ are preferred over synthetic ones.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, players: int = 530, port: int = 0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.players = players
+        self.port = port
+        self.requests = 0
+        self.injected = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recorded = {kind: load_pages(kind) for kind in ('players', 'gamelogs', 'schedules')}
+        self._pages = {}
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    def page(self, path: str):
+        if path not in self._pages:
+            self._pages[path] = self._render(path)
+        return self._pages[path]
+
+    def _render(self, path: str):
+        m = GAMELOG_PATH.search(path)
+        if m:
+            pid, suffix = int(m.group(1)), m.group(2)
+            recorded = self._recorded['gamelogs']
+            # Recorded file names end with the URL's game type, e.g. ..._NBA_All_Play_In.html
+            same_type = [html for name, html in recorded.items()
+                         if name[:-len('.html')].endswith('_' + re.sub(r'[^A-Za-z0-9]+', '_', suffix))]
+            pages = same_type or list(recorded.values())
+            return pages[pid % len(pages)] if pages else gamelog_page(pid, suffix)
+        m = SCHEDULE_PATH.search(path)
+        if m:
+            recorded = self._recorded['schedules']
+            # A team's own recorded schedule when there is one, otherwise any recorded schedule
+            own = [html for name, html in recorded.items() if f"_teams_{m.group(1).replace('-', '_')}_" in name]
+            pages = own or list(recorded.values())
+            return pages[zlib.crc32(m.group(1).encode()) % len(pages)] if pages else schedule_page(m.group(1), int(m.group(2)))
+        if path.rstrip('/').endswith('/nba/players'):
+            recorded = list(self._recorded['players'].values())
+            return recorded[0] if recorded else players_page(self.players, self.url)
+        return None
+
+    def _draw(self) -> tuple[str, float]:
+        """Decide the fate of one request: ('ok' | 'throttle' | 'error', extra latency)."""
+        with self._lock:
+            self.requests += 1
+            fault, jitter = self._rng.random(), self._rng.random()
+            outcome = 'ok'
+            if fault < self.throttle_rate:
+                outcome = 'throttle'
+            elif fault < self.throttle_rate + self.error_rate:
+                outcome = 'error'
+            if outcome != 'ok':
+                self.injected += 1
+        return outcome, self.latency + jitter * self.jitter
+
+    def start(self) -> 'FixtureServer':
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                outcome, delay = server._draw()
+                time.sleep(delay)
+                if outcome == 'throttle':
+                    return self._send(429, b'Too Many Requests', {'Retry-After': '1'})
+                if outcome == 'error':
+                    return self._send(500, b'Internal Server Error')
+                html = server.page(self.path)
+                if html is None:
+                    return self._send(404, b'Not Found')
+                self._send(200, html.encode('utf-8'))
+
+            def _send(self, status, body, headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    p = argparse.ArgumentParser(description='Serve fixture pages as a local RealGM stand-in')
+    p.add_argument('--port', type=int, default=8765)
+    p.add_argument('--latency-ms', type=float, default=0.0)
+    p.add_argument('--jitter-ms', type=float, default=0.0)
+    p.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with 500')
+    p.add_argument('--throttle-rate', type=float, default=0.0, help='Share of requests answered with 429')
+    p.add_argument('--players', type=int, default=530, help='Rows on the synthetic /nba/players page')
+    args = p.parse_args()
+
+    server = FixtureServer(args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate, args.throttle_rate,
+                           players=args.players, port=args.port).start()
+    print(f'Serving fixtures on {server.url} (players list at {server.url}/nba/players), Ctrl+C to stop')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,182 @@
+import os
+import random
+import re
+import sys
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+GAMELOG_HEADERS = [
+    'Date', 'Team', 'Opponent', 'W/L', 'Status', 'Pos', 'MIN', 'PTS', 'FGM', 'FGA', 'FG%',
+    '3PM', '3PA', '3P%', 'FTM', 'FTA', 'FT%', 'ORB', 'DRB', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'FIC',
+]
+TEAMS = [
+    ('Atlanta-Hawks', 'ATL', 1), ('Boston-Celtics', 'BOS', 2), ('Brooklyn-Nets', 'BKN', 38),
+    ('Chicago-Bulls', 'CHI', 5), ('Denver-Nuggets', 'DEN', 8), ('Golden-State-Warriors', 'GSW', 10),
+    ('Los-Angeles-Lakers', 'LAL', 14), ('Miami-Heat', 'MIA', 16), ('New-York-Knicks', 'NYK', 20),
+    ('Phoenix-Suns', 'PHX', 23),
+]
+GAME_TYPE_ROWS = {'Reg': 600, 'Playoffs': 60, 'Play-In': 2, 'Preseason': 25}
+FIRST_NAMES = ['Jalen', 'Tyrese', 'Anthony', 'Devin', 'Jaylen', 'Luka', 'Shai', 'Donovan', 'Cade', 'Scottie']
+LAST_NAMES = ['Brown', 'Williams', 'Johnson', 'Murray', 'Green', 'Allen', 'Barnes', 'Edwards', 'Mitchell', 'Young']
+
+# URL fragment -> fixture kind, used when recording pages from the HTML cache
+RECORD_KINDS = [('/GameLogs/', 'gamelogs'), ('/nba/players', 'players'), ('/Schedule/', 'schedules')]
+
+
+def _filler_tables(rng: random.Random, count: int) -> str:
+    # RealGM player pages carry 30-50 unrelated stat tables around the gamelog table
+    out = []
+    for _ in range(count):
+        rows = ''.join(
+            '<tr>' + ''.join(f'<td>{rng.randint(0, 99)}</td>' for _ in range(8)) + '</tr>'
+            for _ in range(rng.randint(3, 15))
+        )
+        head = ''.join(f'<th>C{i}</th>' for i in range(8))
+        out.append(f'<table class="tablesaw"><thead><tr>{head}</tr></thead><tbody>{rows}</tbody></table>')
+    return ''.join(out)
+
+
+def gamelog_page(player_id: int, suffix: str = 'Reg', seed: int = 0) -> str:
+    """Synthetic gamelog page with the same markup the parsers rely on (fixed-table-body, data-th cells, links)."""
+    rng = random.Random(f'{player_id}-{suffix}-{seed}')
+    n_rows = GAME_TYPE_ROWS.get(suffix, 50)
+    team, abbr, tid = rng.choice(TEAMS)
+    rows = []
+    for i in range(n_rows):
+        year = 2016 + i // 82 if suffix == 'Reg' else 2016 + i % 10
+        month = [10, 11, 12, 1, 2, 3, 4][i % 7] if suffix == 'Reg' else {'Playoffs': 5, 'Play-In': 4, 'Preseason': 10}.get(suffix, 1)
+        day = 1 + (i * 3) % 28
+        date = f'{month:02d}/{day:02d}/{year + (1 if month < 8 else 0)}'
+        opp, opp_abbr, opp_id = rng.choice([t for t in TEAMS if t[0] != team])
+        fgm, fga = rng.randint(0, 15), rng.randint(15, 25)
+        tpm, tpa = rng.randint(0, 6), rng.randint(6, 12)
+        ftm, fta = rng.randint(0, 8), rng.randint(8, 12)
+        orb, drb = rng.randint(0, 5), rng.randint(0, 10)
+        vals = [
+            f'<a href="/nba/boxscore/{year}-{month:02d}-{day:02d}/{abbr}-at-{opp_abbr}/{400000 + i}">{date}</a>',
+            f'<a href="/nba/teams/{team}/{tid}/Home">{abbr}</a>',
+            f'<a href="/nba/teams/{opp}/{opp_id}/Home">{"@ " if i % 2 else "v. "}{opp_abbr}</a>',
+            f'{"W" if rng.random() > 0.5 else "L"}, {rng.randint(95, 130)}-{rng.randint(90, 125)}',
+            'Starter' if rng.random() > 0.3 else 'Bench',
+            rng.choice(['PG', 'SG', 'SF', 'PF', 'C']),
+            f'{rng.randint(10, 42)}:{rng.randint(0, 59):02d}',
+            str(2 * fgm + tpm + ftm), str(fgm), str(fga), f'{fgm / fga:.3f}',
+            str(tpm), str(tpa), f'{tpm / tpa:.3f}', str(ftm), str(fta), f'{ftm / fta:.3f}',
+            str(orb), str(drb), str(orb + drb), str(rng.randint(0, 12)), str(rng.randint(0, 4)),
+            str(rng.randint(0, 4)), str(rng.randint(0, 6)), str(rng.randint(0, 6)), f'{rng.uniform(-5, 40):.1f}',
+        ]
+        cells = ''.join(f'<td data-th="{h}">{v}</td>' for h, v in zip(GAMELOG_HEADERS, vals))
+        rows.append(f'<tr>{cells}</tr>')
+    head = ''.join(f'<th>{h}</th>' for h in GAMELOG_HEADERS)
+    gamelog = (
+        '<div class="fixed-table-container"><div class="fixed-table-body">'
+        f'<table class="tablesaw" data-toggle="table"><thead><tr>{head}</tr></thead>'
+        f'<tbody>{"".join(rows)}</tbody></table></div></div>'
+    )
+    filler = _filler_tables(rng, rng.randint(30, 50))
+    return (
+        '<!DOCTYPE html><html><head><title>Player Game Logs | Basketball</title>'
+        '<link rel="stylesheet" href="/css/site.css"><script>var x = 1;</script></head>'
+        f'<body><div class="main-container">{filler[:len(filler) // 2]}{gamelog}{filler[len(filler) // 2:]}</div></body></html>'
+    )
+
+
+def player_name(player_id: int) -> str:
+    return f'{FIRST_NAMES[player_id % 10]} {LAST_NAMES[(player_id // 10) % 10]}{player_id // 100 or ""}'
+
+
+def players_page(count: int = 530, base: str = '', seed: int = 0) -> str:
+    """Synthetic /nba/players page: one row per player with the data-th cells players.py reads."""
+    rng = random.Random(f'players-{seed}')
+    rows = []
+    for pid in range(1, count + 1):
+        name = player_name(pid)
+        team = rng.choice(TEAMS)[0].replace('-', ' ')
+        cells = [
+            ('Player', f'<a href="{base}/player/{name.replace(" ", "-")}/Summary/{pid}">{name}</a>'),
+            ('Pos', rng.choice(['PG', 'SG', 'SF', 'PF', 'C'])),
+            ('Age', str(rng.randint(19, 38))),
+            ('Current Team', team),
+            ('YOS', str(rng.randint(0, 18))),
+        ]
+        rows.append('<tr>' + ''.join(f'<td data-th="{h}">{v}</td>' for h, v in cells) + '</tr>')
+    head = ''.join(f'<th>{h}</th>' for h in ['Player', 'Pos', 'Age', 'Current Team', 'YOS'])
+    return (
+        '<!DOCTYPE html><html><head><title>NBA Players | Basketball</title></head><body>'
+        f'<table class="tablesaw" data-toggle="table"><thead><tr>{head}</tr></thead><tbody>{"".join(rows)}</tbody></table>'
+        '</body></html>'
+    )
+
+
+def schedule_page(team_ref: str, year: int = 2026, team_refs: list = None, seed: int = 0) -> str:
+    """Synthetic team schedule page: 82 games with a dated first cell and a linked 'v. '/'@ ' opponent cell."""
+    rng = random.Random(f'{team_ref}-{year}-{seed}')
+    others = [t for t in (team_refs or [t[0] for t in TEAMS]) if t != team_ref]
+    rows = []
+    for i in range(82):
+        month = [10, 11, 12, 1, 2, 3, 4][min(6, i // 12)]
+        day = 1 + (i * 5) % 28
+        date = f'{["", "Jan", "Feb", "Mar", "Apr", "", "", "", "", "", "Oct", "Nov", "Dec"][month]} {day}, {year - (month >= 10)}'
+        opp = rng.choice(others)
+        opp_text = re.sub(r'^Los Angeles ', 'L.A. ', opp.replace('-', ' '))
+        rows.append(
+            f'<tr><td data-th="Date"><a href="/nba/boxscore/{i}">{date}</a></td>'
+            f'<td data-th="Opponent">{"@ " if i % 2 else "v. "}<a href="/nba/teams/{opp}/1/Home">{opp_text}</a></td>'
+            f'<td data-th="Result">{"W" if rng.random() > 0.5 else "L"}</td></tr>'
+        )
+    return (
+        '<!DOCTYPE html><html><head><title>Schedule | Basketball</title></head><body>'
+        '<table class="tablesaw" data-toggle="table"><thead><tr><th>Date</th><th>Opponent</th><th>Result</th></tr></thead>'
+        f'<tbody>{"".join(rows)}</tbody></table></body></html>'
+    )
+
+
+def record_from_cache(cache_dir: str, limit: int = 50) -> dict:
+    """Copy pages from the HTML cache into benchmarks/fixtures/<kind>/ so benchmarks run on real markup."""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from html_cache import HtmlCache
+
+    cache = HtmlCache(cache_dir, offline=True)
+    counts = {}
+    try:
+        for fragment, kind in RECORD_KINDS:
+            folder = os.path.join(FIXTURES_DIR, kind)
+            os.makedirs(folder, exist_ok=True)
+            for url in cache.urls(f'%{fragment}%', limit):
+                entry = cache.get(url)
+                if entry is None:
+                    continue
+                name = re.sub(r'[^A-Za-z0-9]+', '_', url.split('://', 1)[-1]).strip('_')[-120:]
+                with open(os.path.join(folder, name + '.html'), 'w', encoding='utf-8') as f:
+                    f.write(entry.html)
+                counts[kind] = counts.get(kind, 0) + 1
+    finally:
+        cache.close()
+    return counts
+
+
+def load_pages(kind: str = 'gamelogs') -> dict:
+    """Recorded pages from benchmarks/fixtures/<kind>/ as {file name: html}, or {} when none are recorded."""
+    folder = os.path.join(FIXTURES_DIR, kind)
+    if not os.path.isdir(folder):
+        return {}
+    pages = {}
+    for name in sorted(os.listdir(folder)):
+        if name.endswith('.html'):
+            with open(os.path.join(folder, name), encoding='utf-8') as f:
+                pages[name] = f.read()
+    return pages
+
+
+if __name__ == '__main__':
+    import argparse
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from html_cache import DEFAULT_CACHE_DIR
+
+    p = argparse.ArgumentParser(description='Record benchmark fixtures from the HTML cache')
+    p.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    p.add_argument('--limit', type=int, default=50, help='Max pages recorded per kind')
+    args = p.parse_args()
+    counts = record_from_cache(args.cache_dir, args.limit)
+    print(', '.join(f'{n} {kind}' for kind, n in counts.items()) or 'No pages in the cache')
@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+import generate_schedule
+import players
+import recent_games
+import stats
+import views
+from fetching import make_session
+from scheduler import RequestScheduler, set_scheduler
+from fixture_server import FixtureServer
+from fixtures import gamelog_page, load_pages, players_page, player_name
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+SUFFIXES = ['Reg', 'Playoffs', 'Play-In', 'Preseason']
+STAT_LINES = {'PTS': 20, 'TPM': 0, 'REB': 5, 'AST': 0, 'STL': 0, 'BLK': 0, 'TOV': 0, 'P|R|A': 0, 'P|A': 0, 'P|R': 0}
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class Context:
+    """Shared inputs for every benchmark: fixture server, parsed frames and a populated gamelogs.db."""
+
+    def __init__(self, args):
+        self.args = args
+        self.tmp = tempfile.mkdtemp(prefix='nba-bench-')
+        self.server = FixtureServer(args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate,
+                                    args.throttle_rate, players=args.players).start()
+        self.player_ids = list(range(1, args.players + 1))
+        recorded = load_pages('gamelogs')
+        self.gamelog_pages = list(recorded.values()) or [gamelog_page(pid, sfx) for pid in self.player_ids[:5] for sfx in SUFFIXES]
+        self.players_html = next(iter(load_pages('players').values()), None) or players_page(args.players)
+        self.players_df = pd.DataFrame({
+            'Player': [player_name(pid) for pid in self.player_ids],
+            'Pos': 'G', 'Age': 25, 'Current Team': 'Atlanta Hawks', 'YOS': 3,
+            'PlayerHref': [self.summary_href(pid) for pid in self.player_ids],
+            'PlayerID': self.player_ids,
+        })
+        self._frames = None
+        self._db_path = None
+
+    def summary_href(self, pid: int) -> str:
+        return f'{self.server.url}/player/{player_name(pid).replace(" ", "-")}/Summary/{pid}'
+
+    def frames(self) -> list[pd.DataFrame]:
+        # One normalized frame per player, as the engines hand them to GamelogWriter
+        if self._frames is None:
+            self._frames = []
+            for pid in self.player_ids:
+                href = self.summary_href(pid)
+                gamelogs_url = stats.build_gamelogs_url(href)
+                pages = [stats.parse_page(gamelog_page(pid, sfx)) for sfx in SUFFIXES]
+                self._frames.append(stats.build_player_frame(player_name(pid), href, gamelogs_url, stats.GAME_TYPES, pages))
+        return self._frames
+
+    def db_path(self) -> str:
+        if self._db_path is None:
+            self._db_path = os.path.join(self.tmp, 'views.db')
+            writer = stats.GamelogWriter(self._db_path, self.players_df)
+            for df in self.frames():
+                writer.add(df)
+            writer.flush()
+            recent_games.refresh_recent_games(self._db_path)
+        return self._db_path
+
+    def close(self):
+        self.server.stop()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+def bench_parse_gamelogs_table(ctx: Context, repeat: int):
+    pages = ctx.gamelog_pages
+    seconds = best_of(lambda: [stats.parse_gamelogs_table(html) for html in pages], repeat)
+    return seconds / len(pages), 'page'
+
+
+def bench_players_parse(ctx: Context, repeat: int):
+    seconds = best_of(lambda: players._parse_table_rows(ctx.players_html), repeat)
+    return seconds, 'page'
+
+
+def bench_process_player(ctx: Context, repeat: int):
+    session = make_session()
+    ids = ctx.player_ids[:ctx.args.fetch_players]
+
+    def run():
+        for pid in ids:
+            stats.process_player(player_name(pid), ctx.summary_href(pid), ctx.tmp, session=session)
+
+    seconds = best_of(run, repeat)
+    session.close()
+    return seconds / len(ids), 'player'
+
+
+def bench_scrape_schedules(ctx: Context, repeat: int):
+    refs = generate_schedule.DEFAULT_TEAM_REFS
+    season_df = pd.DataFrame({
+        'TeamRef': refs,
+        'Schedule': [f'{ctx.server.url}/nba/teams/{ref}/1/Schedule/2026' for ref in refs],
+    })
+    out = os.path.join(ctx.tmp, 'schedule.xlsx')
+    seconds = best_of(lambda: generate_schedule.scrape_schedules(season_df, 2026, out), repeat)
+    return seconds, 'run'
+
+
+def bench_gamelog_upsert(ctx: Context, repeat: int):
+    frames = ctx.frames()
+    rows = sum(len(df) for df in frames)
+
+    def run():
+        db_path = os.path.join(ctx.tmp, 'upsert.db')
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+        writer = stats.GamelogWriter(db_path, ctx.players_df)
+        for df in frames:
+            writer.add(df)
+        writer.flush()
+
+    seconds = best_of(run, repeat)
+    return seconds / rows * 1000, '1k rows'
+
+
+def bench_app_player_view(ctx: Context, repeat: int):
+    store = views.GamelogStore(ctx.db_path())
+    seasons = store.seasons()[:1]
+    player_ids = ctx.player_ids[:20]
+
+    def run():
+        # Cold cache: every view pays for its (pushed-down) read
+        store.clear()
+        for player_id in player_ids:
+            df_filtered = store.recent_games(seasons, ['Regular Season', 'Playoffs'], 20, player_id,
+                                             views.PLAYER_VIEW_COLS)
+            for n in (5, 10, 20):
+                views.compute_percent_hits(views.make_display_df(df_filtered, n), STAT_LINES)
+
+    return best_of(run, repeat) / len(player_ids), 'view'
+
+
+def bench_app_leaderboard(ctx: Context, repeat: int):
+    store = views.GamelogStore(ctx.db_path())
+    seasons = store.seasons()[:1]
+
+    def run():
+        store.clear()
+        df_filtered = store.recent_games(seasons, ['Regular Season', 'Playoffs'], 20, columns=views.LEADERBOARD_COLS)
+        for n in (5, 10, 20):
+            views.leaderboard(df_filtered, ctx.players_df, n, STAT_LINES)
+
+    return best_of(run, repeat), 'view'
+
+
+BENCHMARKS = {
+    'parse_gamelogs_table': bench_parse_gamelogs_table,
+    'players_parse_table_rows': bench_players_parse,
+    'process_player': bench_process_player,
+    'scrape_schedules': bench_scrape_schedules,
+    'gamelog_upsert': bench_gamelog_upsert,
+    'app_player_view': bench_app_player_view,
+    'app_leaderboard': bench_app_leaderboard,
+}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> int:
+    regressions = 0
+    print(f"\n{'benchmark':<26}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            print(f"{name:<26}{'-':>12}{result['ms']:>10.2f}ms{'new':>9}")
+            continue
+        change = result['ms'] / base['ms'] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        elif change < -threshold:
+            flag = '  faster'
+        print(f"{name:<26}{base['ms']:>10.2f}ms{result['ms']:>10.2f}ms{change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    p = argparse.ArgumentParser(description='Offline benchmarks against fixture pages and a local RealGM stand-in')
+    p.add_argument('names', nargs='*', help=f'Benchmarks to run (default: all of {", ".join(BENCHMARKS)})')
+    p.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported)')
+    p.add_argument('--players', type=int, default=60, help='Players in the fixture roster and gamelogs.db')
+    p.add_argument('--fetch-players', type=int, default=10, help='Players fetched by the process_player benchmark')
+    p.add_argument('--latency-ms', type=float, default=0.0, help='Fixture server latency per request')
+    p.add_argument('--jitter-ms', type=float, default=0.0, help='Extra random latency per request')
+    p.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with 500')
+    p.add_argument('--throttle-rate', type=float, default=0.0, help='Share of requests answered with 429')
+    p.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results file')
+    p.add_argument('--save-baseline', action='store_true', help='Write these results as the new baseline')
+    p.add_argument('--threshold', type=float, default=0.15, help='Slowdown vs the baseline reported as a regression')
+    args = p.parse_args()
+
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        p.error(f'unknown benchmarks: {", ".join(unknown)}')
+
+    # Measure the code, not the politeness delay towards the real site
+    set_scheduler(RequestScheduler(rate=1000.0, max_rate=1000.0, burst=1000))
+    ctx = Context(args)
+    results = {}
+    try:
+        for name in args.names or BENCHMARKS:
+            seconds, unit = BENCHMARKS[name](ctx, args.repeat)
+            results[name] = {'ms': seconds * 1000, 'unit': unit}
+            print(f'{name:<26}{seconds * 1000:10.2f} ms/{unit}')
+    finally:
+        ctx.close()
+
+    regressions = 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    if args.save_baseline:
+        baseline = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'machine': platform.platform(),
+            'server': {'latency_ms': args.latency_ms, 'error_rate': args.error_rate, 'throttle_rate': args.throttle_rate},
+            'results': results,
+        }
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+        print(f'Saved baseline to {args.baseline}')
+    sys.exit(1 if regressions and not args.save_baseline else 0)
+
+
+if __name__ == '__main__':
+    main()
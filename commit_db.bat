@@ -1,18 +1,16 @@
 @echo off
 cd /d "C:\ZyProjects\Git\NBA"
-REM Check for modified files and only commit if gamelogs.db is modified
+REM Check for changed files and only commit if gamelogs.db or its Parquet export changed
 setlocal enabledelayedexpansion
 set MODIFIED=0
-for /f "usebackq tokens=*" %%A in (`git ls-files --modified`) do (
-  if /I "%%~A"=="gamelogs.db" (
-    set MODIFIED=1
-  )
+for /f "usebackq tokens=*" %%A in (`git status --porcelain -- gamelogs.db gamelogs_parquet`) do (
+  set MODIFIED=1
 )
 if "%MODIFIED%"=="1" (
-  git add gamelogs.db
+  git add gamelogs.db gamelogs_parquet
   git commit -m "Update gamelogs.db (scheduled update)" --quiet
   git push
 ) else (
-  echo No changes to gamelogs.db; nothing to commit.
+  echo No changes to gamelogs.db or gamelogs_parquet; nothing to commit.
 )
 endlocal
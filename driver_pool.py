@@ -0,0 +1,145 @@
+import queue
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import WebDriverException
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+# Resources the gamelog pages never need; blocking them keeps page loads and memory down
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot', '*.css',
+]
+
+
+def build_chrome_options(user_agent: str = USER_AGENT) -> Options:
+    chrome_options = Options()
+    chrome_options.add_argument("--incognito")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_argument(f"user-agent={user_agent}")
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+    })
+    return chrome_options
+
+
+class DriverPool:
+    """Fixed-size pool of warm headless Chrome drivers shared across worker threads.
+
+    Drivers are created lazily up to `size`, handed out with `checkout()`, and
+    recycled after `max_pages` page loads or whenever a caller reports a crash.
+    """
+
+    def __init__(self, size: int = 2, max_pages: int = 200, timeout: int = 30):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._pages = {}
+        self._driver_path = None
+        self._closed = False
+
+    def _get_driver_path(self) -> str:
+        # ChromeDriverManager().install() hits the network, so resolve it once per run
+        with self._lock:
+            if self._driver_path is None:
+                self._driver_path = ChromeDriverManager().install()
+            return self._driver_path
+
+    def _new_driver(self):
+        driver = webdriver.Chrome(service=ChromeService(self._get_driver_path()), options=build_chrome_options())
+        driver.set_page_load_timeout(self.timeout)
+        driver.implicitly_wait(2)
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        except Exception:
+            pass
+        self._pages[id(driver)] = 0
+        return driver
+
+    def _is_healthy(self, driver) -> bool:
+        try:
+            driver.execute_script('return 1')
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    def acquire(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        return self._new_driver()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                # Poll so a slot freed by a discarded driver is noticed
+                try:
+                    driver = self._idle.get(timeout=1)
+                except queue.Empty:
+                    continue
+
+            if self._is_healthy(driver):
+                return driver
+            self._discard(driver)
+
+    def release(self, driver, broken: bool = False):
+        if driver is None:
+            return
+        if broken or self._closed or self._pages.get(id(driver), 0) >= self.max_pages:
+            self._discard(driver)
+            return
+        self._idle.put(driver)
+
+    def record_page(self, driver):
+        self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+
+    @contextmanager
+    def checkout(self):
+        driver = self.acquire()
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
@@ -0,0 +1,153 @@
+import glob
+import json
+import os
+import shutil
+import sqlite3
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from schema import GAMELOG_SCHEMA
+from storage import GAMELOG_DB_COLS
+
+DEFAULT_EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gamelogs_parquet')
+PARTITION_COLS = ['Season', 'GameType']
+PARTITIONS_FILE = '_partitions.json'
+PART_NAME = 'part-0.parquet'
+
+# RowHash is only needed for the fingerprints, so it stays in the database
+EXPORT_COLS = [c for c in GAMELOG_DB_COLS if c != 'RowHash']
+# Partition values live in the directory names (hive style), the files hold the other columns
+FILE_COLS = [c for c in EXPORT_COLS if c not in PARTITION_COLS]
+
+
+def _arrow_schema():
+    types = {'INTEGER': pa.int64(), 'REAL': pa.float64(), 'TEXT': pa.string()}
+    return pa.schema([(c.name, types[c.sql_type]) for c in GAMELOG_SCHEMA if c.name in FILE_COLS])
+
+
+def partition_path(season: str, game_type: str) -> str:
+    return f'Season={season}/GameType={game_type}'
+
+
+def partition_fingerprints(conn: sqlite3.Connection) -> dict:
+    """{partition path: [rows, hashed rows, RowHash low sum, RowHash high sum, team id counts and sums]}.
+
+    Upserts never delete rows and only touch a row when its RowHash changes, so a partition's
+    contents changed exactly when one of these numbers moved; no row data has to be read.
+    TeamID/OpponentID are not part of RowHash (fill_team_ids backfills them in place), so
+    they are counted and summed separately.
+    """
+    rows = conn.execute(
+        "SELECT Season, GameType, COUNT(*), COUNT(RowHash), "
+        "SUM(RowHash % 4294967296), SUM(RowHash / 4294967296), "
+        "COUNT(TeamID), SUM(TeamID), COUNT(OpponentID), SUM(OpponentID) "
+        "FROM gamelogs WHERE Season IS NOT NULL AND GameType IS NOT NULL GROUP BY Season, GameType"
+    ).fetchall()
+    return {partition_path(season, gt): list(rest) for season, gt, *rest in rows}
+
+
+def _load_partitions_file(export_dir: str) -> dict:
+    path = os.path.join(export_dir, PARTITIONS_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        state = json.load(f)
+    # A different column layout invalidates every partition
+    return state.get('partitions', {}) if state.get('columns') == FILE_COLS else {}
+
+
+def _write_partition(conn: sqlite3.Connection, export_dir: str, season: str, game_type: str, schema) -> None:
+    df = pd.read_sql_query(
+        f"SELECT {', '.join(FILE_COLS)} FROM gamelogs WHERE Season = ? AND GameType = ? "
+        f"ORDER BY PlayerID, Date, Opponent",
+        conn, params=(season, game_type),
+    )
+    out_dir = os.path.join(export_dir, partition_path(season, game_type))
+    os.makedirs(out_dir, exist_ok=True)
+    tmp = os.path.join(out_dir, PART_NAME + '.tmp')
+    pq.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False), tmp, compression='zstd')
+    os.replace(tmp, os.path.join(out_dir, PART_NAME))
+
+
+def export_gamelogs(db_path: str, export_dir: str = DEFAULT_EXPORT_DIR) -> dict:
+    """Mirror the gamelogs table as Parquet partitioned by Season and GameType.
+
+    Only partitions whose fingerprint changed since the last export are rewritten, and
+    partitions that no longer exist are removed, so untouched seasons keep identical files.
+    Returns {'written': n, 'unchanged': n, 'removed': n}.
+    """
+    if pa is None:
+        print("Parquet export needs pyarrow (pip install pyarrow); skipped.")
+        return {}
+    if not os.path.exists(db_path):
+        return {}
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+        if 'gamelogs' not in tables:
+            return {}
+        current = partition_fingerprints(conn)
+        previous = _load_partitions_file(export_dir)
+        schema = _arrow_schema()
+        written = 0
+        for path, fingerprint in current.items():
+            if previous.get(path) == fingerprint and os.path.exists(os.path.join(export_dir, path, PART_NAME)):
+                continue
+            season, game_type = (part.split('=', 1)[1] for part in path.split('/'))
+            _write_partition(conn, export_dir, season, game_type, schema)
+            written += 1
+    finally:
+        conn.close()
+
+    removed = 0
+    for path in set(previous) - set(current):
+        shutil.rmtree(os.path.join(export_dir, path), ignore_errors=True)
+        removed += 1
+    if written or removed or not os.path.exists(os.path.join(export_dir, PARTITIONS_FILE)):
+        with open(os.path.join(export_dir, PARTITIONS_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'columns': FILE_COLS, 'partitions': dict(sorted(current.items()))}, f, indent=1)
+    report = {'written': written, 'unchanged': len(current) - written, 'removed': removed}
+    print(f"Parquet export to {export_dir}: {written} partitions written, {report['unchanged']} unchanged, "
+          f"{removed} removed.")
+    return report
+
+
+def has_export(export_dir: str) -> bool:
+    """True when `export_dir` holds exported partitions that can be read here."""
+    return bool(export_dir) and pa is not None and os.path.exists(os.path.join(export_dir, PARTITIONS_FILE))
+
+
+def list_partitions(export_dir: str = DEFAULT_EXPORT_DIR) -> list[tuple[str, str]]:
+    """(Season, GameType) of every exported partition."""
+    found = []
+    for path in glob.glob(os.path.join(export_dir, 'Season=*', 'GameType=*', PART_NAME)):
+        game_type_dir = os.path.dirname(path)
+        season = os.path.basename(os.path.dirname(game_type_dir)).split('=', 1)[1]
+        found.append((season, os.path.basename(game_type_dir).split('=', 1)[1]))
+    return sorted(found)
+
+
+def read_gamelogs(export_dir: str = DEFAULT_EXPORT_DIR, seasons: list = None, game_types: list = None,
+                  columns: list = None, player_id: int = None) -> pd.DataFrame:
+    """Rows of the requested seasons and game types (and `player_id`), reading only their partition files."""
+    frames = []
+    file_cols = [c for c in columns if c in FILE_COLS] if columns else None
+    filters = [('PlayerID', '==', int(player_id))] if player_id is not None else None
+    for season, game_type in list_partitions(export_dir):
+        if (seasons and season not in seasons) or (game_types and game_type not in game_types):
+            continue
+        df = pd.read_parquet(os.path.join(export_dir, partition_path(season, game_type), PART_NAME), columns=file_cols,
+                             filters=filters)
+        df['Season'] = season
+        df['GameType'] = game_type
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=columns or EXPORT_COLS)
+    df = pd.concat(frames, ignore_index=True)
+    return df[[c for c in (columns or EXPORT_COLS) if c in df.columns]]
@@ -0,0 +1,84 @@
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from scheduler import PRIORITY_NORMAL, get_scheduler
+from telemetry import get_telemetry
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
+
+# Strings that only show up on bot-check / interstitial pages, never on real RealGM content
+CHALLENGE_MARKERS = [
+    'cf-browser-verification',
+    'challenge-platform',
+    'cf_chl_',
+    '<title>Just a moment...</title>',
+    'Attention Required! | Cloudflare',
+    'Checking your browser before accessing',
+]
+
+
+def make_session(user_agent: str = USER_AGENT, pool_size: int = 10) -> requests.Session:
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': user_agent,
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.9',
+    })
+    retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["HEAD", "GET", "OPTIONS"])
+    adapter = HTTPAdapter(max_retries=retries, pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def is_challenge_page(html: str) -> bool:
+    if not html:
+        return False
+    head = html[:20000]
+    return any(marker in head for marker in CHALLENGE_MARKERS)
+
+
+def sync_session_from_driver(session: requests.Session, driver) -> None:
+    # Reuse the browser's clearance cookies and user agent so later requests can skip the browser
+    try:
+        for c in driver.get_cookies():
+            session.cookies.set(c['name'], c['value'], domain=c.get('domain'), path=c.get('path', '/'))
+        ua = driver.execute_script('return navigator.userAgent')
+        if ua:
+            session.headers['User-Agent'] = ua.replace('HeadlessChrome', 'Chrome')
+    except Exception as e:
+        get_telemetry().error('cookie_sync', exc=e)
+
+
+def scheduled_get(session, url: str, priority: int = PRIORITY_NORMAL, **kwargs):
+    """GET `url` once the shared scheduler allows it and report the outcome back.
+
+    Returns None when the host's circuit is open or the request failed; either way the
+    outcome is recorded in the telemetry with its queue wait and latency.
+    """
+    scheduler = get_scheduler()
+    telemetry = get_telemetry()
+    queued = time.perf_counter()
+    if not scheduler.acquire(url, priority):
+        telemetry.error('fetch', url, fetcher='http', error='circuit open', queue_s=time.perf_counter() - queued)
+        return None
+    start = time.perf_counter()
+    try:
+        resp = session.get(url, **kwargs)
+    except Exception as e:
+        scheduler.record(url, None, time.perf_counter() - start)
+        telemetry.error('fetch', url, e, fetcher='http', queue_s=start - queued, fetch_s=time.perf_counter() - start)
+        return None
+    latency = time.perf_counter() - start
+    status = resp.status_code
+    if status == 200 and is_challenge_page(resp.text):
+        status = 429
+    scheduler.record(url, status, latency, resp.headers.get('Retry-After'))
+    retries = getattr(getattr(resp.raw, 'retries', None), 'history', ())
+    telemetry.event('fetch', url=url, fetcher='http', status=status, queue_s=start - queued, fetch_s=latency,
+                    bytes=len(resp.content), retries=len(retries),
+                    error=f"HTTP {status}" if status not in (200, 304) else None)
+    return resp
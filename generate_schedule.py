@@ -1,23 +1,30 @@
 import argparse
+import os
 import pandas as pd
-import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from bs4 import BeautifulSoup
+from lxml import etree
 import re
 from typing import Optional, List
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from fetching import make_session
+from html_cache import HtmlCache, fetch_cached
+from schedule_context import refresh_schedule_context
+from scheduler import PRIORITY_HIGH, PRIORITY_NORMAL
+from storage import GAME_DB_COLS, write_games
+from teams import REF_BY_ID, TEAM_REFS, team_ids, team_refs
+from telemetry import get_telemetry
 
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
 
-DEFAULT_TEAM_REFS = [
-    'Atlanta-Hawks','Boston-Celtics','Brooklyn-Nets','Charlotte-Hornets','Chicago-Bulls',
-    'Cleveland-Cavaliers','Dallas-Mavericks','Denver-Nuggets','Detroit-Pistons','Golden-State-Warriors',
-    'Houston-Rockets','Indiana-Pacers','Los-Angeles-Clippers','Los-Angeles-Lakers','Memphis-Grizzlies',
-    'Miami-Heat','Milwaukee-Bucks','Minnesota-Timberwolves','New-Orleans-Pelicans','New-York-Knicks',
-    'Oklahoma-City-Thunder','Orlando-Magic','Philadelphia-Sixers','Phoenix-Suns','Portland-Trail-Blazers',
-    'Sacramento-Kings','San-Antonio-Spurs','Toronto-Raptors','Utah-Jazz','Washington-Wizards'
-]
+DEFAULT_TEAM_REFS = TEAM_REFS
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gamelogs.db')
+# Team pages fetched at once; the shared scheduler still paces requests per host
+DEFAULT_WORKERS = 4
+
+_HTML_PARSER = etree.HTMLParser(encoding='utf-8')
 
 def build_initial_df(year: int, team_refs: list = None) -> pd.DataFrame:
     team_refs = team_refs or DEFAULT_TEAM_REFS
@@ -68,25 +75,158 @@ def normalize_opponent_text(opp: str, team_refs: list) -> str:
         return best
     return '-'.join([w.capitalize() for w in s_norm.split()])
 
-def fetch_html_requests(session: requests.Session, url: str, timeout: int = 15) -> str:
+def schedule_refs(opponents: pd.Series) -> pd.Series:
+    """Team ref for each opponent text through the alias index; spellings it does not know fall back
+    to normalize_opponent_text, once per distinct value."""
+    refs = pd.Series(team_refs(opponents), index=opponents.index)
+    unknown = refs == ''
+    if unknown.any():
+        fallback = {o: normalize_opponent_text(o, DEFAULT_TEAM_REFS) for o in opponents[unknown].unique()}
+        refs[unknown] = opponents[unknown].map(fallback)
+    return refs
+
+def fetch_html_requests(session: requests.Session, url: str, timeout: int = 15, cache: HtmlCache = None,
+                        priority: int = PRIORITY_NORMAL) -> str:
     try:
-        r = session.get(url, timeout=timeout)
-        r.raise_for_status()
-        return r.text
-    except Exception:
+        return fetch_cached(session, url, cache, timeout=timeout, priority=priority)
+    except Exception as e:
+        get_telemetry().error('fetch', url, e)
         return ''
 
 
 
+def _parse_schedule_rows_from_soup(html: str) -> list[tuple]:
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.find('table', attrs={'data-toggle': 'table'}) or soup.find('table', class_='table')
+    if not table:
+        return []
+    tbody = table.find('tbody')
+    if not tbody:
+        return []
+
+    rows = []
+    for tr in tbody.find_all('tr'):
+        tds = tr.find_all('td')
+        if len(tds) < 2:
+            continue
+        date_td = tds[0]
+        opp_td = tds[1]
+        date_text = date_td.get_text(separator=' ', strip=True)
+        a_date = date_td.find('a')
+        if a_date and a_date.text:
+            date_text = a_date.text.strip()
+        rows.append((date_text, extract_opponent_text(opp_td), _home_flag(opp_td.get_text(separator=' ', strip=True))))
+    return rows
+
+def _home_flag(opp_text: str) -> Optional[int]:
+    # 'v. X' is a home game, '@ X' an away game
+    if opp_text.startswith('v.'):
+        return 1
+    if opp_text.startswith('@'):
+        return 0
+    return None
+
+def _joined_text(el) -> str:
+    return ' '.join(t.strip() for t in el.itertext() if t.strip())
+
+def _schedule_table(root):
+    tables = list(root.iter('table'))
+    for table in tables:
+        if table.get('data-toggle') == 'table':
+            return table
+    for table in tables:
+        if 'table' in (table.get('class') or '').split():
+            return table
+    return None
+
+def parse_schedule_rows(html: str) -> list[tuple]:
+    """(date text, opponent text, home flag) for every game row of a team schedule page (lxml)."""
+    try:
+        root = etree.fromstring(html.encode('utf-8'), _HTML_PARSER)
+    except Exception:
+        root = None
+    if root is None:
+        return _parse_schedule_rows_from_soup(html)
+
+    table = _schedule_table(root)
+    tbody = next(table.iter('tbody'), None) if table is not None else None
+    if tbody is None:
+        return []
+    rows = []
+    for tr in tbody.iter('tr'):
+        tds = list(tr.iter('td'))
+        if len(tds) < 2:
+            continue
+        date_td, opp_td = tds[0], tds[1]
+        date_text = _joined_text(date_td)
+        a_date = next(date_td.iter('a'), None)
+        if a_date is not None and ''.join(a_date.itertext()):
+            date_text = ''.join(a_date.itertext()).strip()
+        opp_full = _joined_text(opp_td)
+        a_opp = next(opp_td.iter('a'), None)
+        opp_text = ''.join(a_opp.itertext()).strip() if a_opp is not None else ''
+        if not opp_text:
+            opp_text = opp_full
+            for marker in ['v.', '@']:
+                if opp_text.startswith(marker):
+                    opp_text = opp_text[len(marker):].strip()
+                    break
+        rows.append((date_text, opp_text, _home_flag(opp_full)))
+    return rows
+
+def season_label(year: int) -> str:
+    """Schedule year (the year a season ends) -> gamelogs Season label, e.g. 2026 -> '2025-26'."""
+    return f'{year - 1}-{year % 100:02d}'
+
+def build_games(schedule_df: pd.DataFrame, year: int) -> pd.DataFrame:
+    """One row per game from per-team schedule rows, where every game appears once from each side.
+
+    The GameKey (date, away team, home team) is the same from both pages, so the two copies
+    collapse into one; rows without a home/away marker are keyed with the teams in name order.
+    """
+    if schedule_df.empty:
+        return pd.DataFrame(columns=GAME_DB_COLS)
+    df = schedule_df.dropna(subset=['Date'])
+    dates = pd.to_datetime(df['Date'], errors='coerce', format='%m/%d/%Y').dt.strftime('%Y-%m-%d')
+    team_id = pd.Series(team_ids(df['Team']), index=df.index)
+    opponent_id = pd.Series(team_ids(df['Opponent']), index=df.index)
+    home = df['Home'] if 'Home' in df.columns else pd.Series(None, index=df.index)
+    # Unknown venue: order the pair by id so both sides still produce the same key
+    team_home = home.eq(1) | (home.isna() & (team_id > opponent_id))
+    games = pd.DataFrame({
+        'Season': season_label(year),
+        'Date': dates,
+        'HomeTeamID': team_id.where(team_home, opponent_id),
+        'AwayTeamID': opponent_id.where(team_home, team_id),
+    }).dropna(subset=['Date'])
+    games = games[(games['HomeTeamID'] > 0) & (games['AwayTeamID'] > 0)]
+    games['HomeTeam'] = games['HomeTeamID'].map(REF_BY_ID)
+    games['AwayTeam'] = games['AwayTeamID'].map(REF_BY_ID)
+    games['GameKey'] = games['Date'] + '/' + games['AwayTeam'] + '@' + games['HomeTeam']
+    return games.drop_duplicates(subset=['GameKey'])[GAME_DB_COLS].reset_index(drop=True)
+
+def _fetch_team_rows(session: requests.Session, team_href: str, schedule_url: str, cache: Optional[HtmlCache],
+                     priority: int) -> list[dict]:
+    if schedule_url.startswith('/'):
+        schedule_url = 'https://basketball.realgm.com' + schedule_url
+    html = fetch_html_requests(session, schedule_url, cache=cache, priority=priority)
+    if not html:
+        return []
+    return [{'TeamHref': team_href, 'ScheduleURL': schedule_url, 'Date': date_text, 'Opponent': opp_text, 'Home': home}
+            for date_text, opp_text, home in parse_schedule_rows(html)]
+
 def scrape_schedules(season_df: pd.DataFrame, year: int, output_xlsx: str, *,
                      verbose: bool = False,
-                     limit: Optional[int] = None, save_initial: Optional[str] = None):
-    session = requests.Session()
-    session.headers.update({'User-Agent': USER_AGENT})
-    retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["HEAD", "GET", "OPTIONS"])
-    adapter = HTTPAdapter(max_retries=retries)
-    session.mount('https://', adapter)
-    session.mount('http://', adapter)
+                     limit: Optional[int] = None, save_initial: Optional[str] = None,
+                     cache: Optional[HtmlCache] = None, workers: int = DEFAULT_WORKERS,
+                     db_path: Optional[str] = None) -> pd.DataFrame:
+    """Scrape every team's schedule page into `output_xlsx` (one row per team and game).
+
+    Pages are fetched by up to `workers` threads and parsed with lxml. With `db_path`, the
+    deduplicated games are also stored in its games table. Returns the per-team rows.
+    """
+    workers = max(1, workers)
+    session = make_session(USER_AGENT, pool_size=workers)
 
     if 'TeamHref' not in season_df.columns and 'TeamRef' in season_df.columns:
         season_df = season_df.rename(columns={'TeamRef': 'TeamHref'})
@@ -94,59 +234,28 @@ def scrape_schedules(season_df: pd.DataFrame, year: int, output_xlsx: str, *,
     if save_initial:
         season_df.to_excel(save_initial, index=False)
 
-    rows = []
-    team_refs = list(season_df['TeamHref'].dropna().unique()) if 'TeamHref' in season_df.columns else []
-    if limit:
-        iterable = list(season_df.iterrows())[:limit]
-    else:
-        iterable = season_df.iterrows()
-
-    for idx, row in iterable:
-        team_href = row.get('TeamHref')
-        schedule_url = row.get('Schedule')
-        if pd.isna(schedule_url) or not schedule_url:
-            continue
-        if schedule_url.startswith('/'):
-            schedule_url = 'https://basketball.realgm.com' + schedule_url
+    # The season in progress (it ends in the year after October) is fetched ahead of older ones
+    now = datetime.now()
+    priority = PRIORITY_HIGH if year == now.year + (now.month >= 10) else PRIORITY_NORMAL
 
-        html = ''
-        html = fetch_html_requests(session, schedule_url)
+    jobs = season_df.head(limit) if limit else season_df
+    jobs = [(row.get('TeamHref'), row.get('Schedule')) for _, row in jobs.iterrows()]
+    jobs = [(team_href, url) for team_href, url in jobs if not pd.isna(url) and url]
 
-        if not html:
-            time.sleep(1)
-            continue
-
-        soup = BeautifulSoup(html, 'html.parser')
-        table = soup.find('table', attrs={'data-toggle': 'table'}) or soup.find('table', class_='table')
-        if not table:
-            time.sleep(1)
-            continue
-        tbody = table.find('tbody')
-        if not tbody:
-            time.sleep(1)
-            continue
-
-        for tr in tbody.find_all('tr'):
-            tds = tr.find_all('td')
-            if len(tds) < 2:
-                continue
-            date_td = tds[0]
-            opp_td = tds[1]
-            date_text = date_td.get_text(separator=' ', strip=True)
-            a_date = date_td.find('a')
-            if a_date and a_date.text:
-                date_text = a_date.text.strip()
-            opp_text = extract_opponent_text(opp_td)
-            rows.append({'TeamHref': team_href, 'ScheduleURL': schedule_url, 'Date': date_text, 'Opponent': opp_text})
-
-        time.sleep(0.8)
+    try:
+        with ThreadPoolExecutor(max_workers=min(workers, max(1, len(jobs)))) as executor:
+            # map keeps team order, so the output rows do not depend on which page arrived first
+            results = list(executor.map(lambda job: _fetch_team_rows(session, *job, cache, priority), jobs))
+    finally:
+        session.close()
+    rows = [row for team_rows in results for row in team_rows]
 
     out_df = pd.DataFrame(rows)
     if not out_df.empty:
         out_df['Team'] = out_df['TeamHref'].apply(extract_team_from_href)
         out_df['Date'] = pd.to_datetime(out_df['Date'], errors='coerce')
         out_df['Date'] = out_df['Date'].dt.strftime('%m/%d/%Y')
-        out_df['Opponent'] = out_df['Opponent'].apply(lambda o: normalize_opponent_text(o, DEFAULT_TEAM_REFS))
+        out_df['Opponent'] = schedule_refs(out_df['Opponent'])
         final_df = out_df[['Team', 'Date', 'Opponent']].copy()
     else:
         final_df = pd.DataFrame(columns=['Team', 'Date', 'Opponent'])
@@ -154,28 +263,61 @@ def scrape_schedules(season_df: pd.DataFrame, year: int, output_xlsx: str, *,
     final_df.to_excel(output_xlsx, index=False)
     if verbose:
         print(f'Wrote {output_xlsx} with {len(final_df)} rows')
+    if db_path:
+        with_venue = final_df.assign(Home=out_df['Home'].to_numpy() if not out_df.empty else [])
+        games = build_games(with_venue, year)
+        fetched = sorted({extract_team_from_href(team_href) for team_href in
+                          (out_df['TeamHref'].unique() if not out_df.empty else [])})
+        added, removed = write_games(db_path, games, season_label(year), fetched)
+        print(f'{season_label(year)}: {len(games)} games from {len(final_df)} team rows '
+              f'({added} new, {removed} no longer scheduled) in {db_path}')
+        refresh_schedule_context(db_path)
+    return final_df
+
+def parse_years(spec: str) -> list[int]:
+    """'2026' -> [2026]; '2024-2026' -> [2024, 2025, 2026]; '2022,2024-2025' -> [2022, 2024, 2025]."""
+    years = set()
+    for part in str(spec).split(','):
+        start, _, end = part.strip().partition('-')
+        years.update(range(int(start), int(end or start) + 1))
+    if not years:
+        raise ValueError(spec)
+    return sorted(years)
+
 def parse_args():
     p = argparse.ArgumentParser()
-    p.add_argument('--year', type=int, default=2026)
-    p.add_argument('--output', type=str, default=None)
+    p.add_argument('--year', type=parse_years, default=[2026],
+                   help='Season end year, or a range/list of them (e.g. 2024-2026 or 2022,2024)')
+    p.add_argument('--output', type=str, default=None, help='Output xlsx (single year only)')
     p.add_argument('--verbose', action='store_true', help='Print summary at end')
     p.add_argument('--limit', type=int, default=None, help='Limit number of teams to process (useful for testing)')
     p.add_argument('--save-initial', type=str, default=None, help='Optionally save the initial df to an xlsx file')
+    p.add_argument('--offline', action='store_true', help='Only use pages already in the HTML cache')
+    p.add_argument('--no-cache', action='store_true', help='Bypass the on-disk HTML cache')
+    p.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Team pages fetched concurrently')
+    p.add_argument('--db', nargs='?', const=DEFAULT_DB, default=None,
+                   help='Also store the deduplicated games table in this database (gamelogs.db when no path is given)')
     return p.parse_args()
 
 def main():
     args = parse_args()
-    year = args.year
-    output = args.output or f"{year}-Schedules-Extracted.xlsx"
-    initial_df = build_initial_df(year)
-    scrape_schedules(initial_df, year, output, verbose=args.verbose, limit=args.limit, save_initial=args.save_initial)
+    if args.output and len(args.year) > 1:
+        raise SystemExit('--output only works with a single --year')
+    cache = None if args.no_cache and not args.offline else HtmlCache(offline=args.offline)
+    for year in args.year:
+        output = args.output or f"{year}-Schedules-Extracted.xlsx"
+        initial_df = build_initial_df(year)
+        scrape_schedules(initial_df, year, output, verbose=args.verbose, limit=args.limit, save_initial=args.save_initial,
+                         cache=cache, workers=args.workers, db_path=args.db or None)
 
 if __name__ == '__main__':
     main()
 
 
-def run_schedule(year: int = 2026, output: str = None, verbose: bool = False, limit: int = None, save_initial: str = None):
+def run_schedule(year: int = 2026, output: str = None, verbose: bool = False, limit: int = None, save_initial: str = None,
+                 workers: int = DEFAULT_WORKERS, db_path: str = None):
     output = output or f"{year}-Schedules-Extracted.xlsx"
     initial_df = build_initial_df(year)
-    scrape_schedules(initial_df, year, output, verbose=verbose, limit=limit, save_initial=save_initial)
-    return output
\ No newline at end of file
+    scrape_schedules(initial_df, year, output, verbose=verbose, limit=limit, save_initial=save_initial,
+                     workers=workers, db_path=db_path)
+    return output
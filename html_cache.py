@@ -0,0 +1,201 @@
+import gzip
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from fetching import is_challenge_page, scheduled_get
+from scheduler import PRIORITY_NORMAL
+from telemetry import get_telemetry
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'html')
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+# (URL pattern, seconds a cached copy is served without asking the server again)
+DEFAULT_TTLS = [
+    (r'/GameLogs/', 6 * 3600),
+    (r'/nba/players', 12 * 3600),
+    (r'/Schedule/', 24 * 3600),
+]
+DEFAULT_TTL = 6 * 3600
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    html: str
+    fetched_at: float
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh: bool
+
+
+class HtmlCache:
+    """Gzip-compressed page store keyed by URL, with per-URL-class TTLs and LRU eviction.
+
+    Bodies live under `cache_dir` and metadata in `cache_dir/index.db`. In `offline`
+    mode every cached entry is served regardless of age and nothing is fetched.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttls: list = None, offline: bool = False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttls = [(re.compile(p), s) for p, s in (ttls if ttls is not None else DEFAULT_TTLS)]
+        self.offline = offline
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(cache_dir, 'index.db'), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY,
+            path TEXT,
+            size INTEGER,
+            fetched_at REAL,
+            accessed_at REAL,
+            etag TEXT,
+            last_modified TEXT
+        )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages (accessed_at)')
+        self._conn.commit()
+        self._total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+
+    def ttl_for(self, url: str) -> int:
+        for pattern, seconds in self.ttls:
+            if pattern.search(url):
+                return seconds
+        return DEFAULT_TTL
+
+    def _path_for(self, url: str) -> str:
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest + '.html.gz')
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT path, fetched_at, etag, last_modified FROM pages WHERE url = ?', (url,)
+            ).fetchone()
+            if not row:
+                return None
+            path, fetched_at, etag, last_modified = row
+            try:
+                with open(path, 'rb') as f:
+                    html = gzip.decompress(f.read()).decode('utf-8')
+            except (OSError, EOFError):
+                self._conn.execute('DELETE FROM pages WHERE url = ?', (url,))
+                self._conn.commit()
+                return None
+            self._conn.execute('UPDATE pages SET accessed_at = ? WHERE url = ?', (time.time(), url))
+            self._conn.commit()
+        fresh = self.offline or (time.time() - fetched_at) < self.ttl_for(url)
+        return CacheEntry(url, html, fetched_at, etag, last_modified, fresh)
+
+    def put(self, url: str, html: str, etag: str = None, last_modified: str = None) -> None:
+        if not html:
+            return
+        path = self._path_for(url)
+        data = gzip.compress(html.encode('utf-8'), compresslevel=6)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute('SELECT size FROM pages WHERE url = ?', (url,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages (url, path, size, fetched_at, accessed_at, etag, last_modified) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, path, len(data), now, now, etag, last_modified),
+            )
+            self._conn.commit()
+            self._total += len(data) - (old[0] if old else 0)
+        if self._total > self.max_bytes:
+            self.evict()
+
+    def touch(self, url: str) -> None:
+        # A 304 means our copy is current again: restart its TTL
+        now = time.time()
+        with self._lock:
+            self._conn.execute('UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?', (now, now, url))
+            self._conn.commit()
+
+    def conditional_headers(self, entry: Optional[CacheEntry]) -> dict:
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def evict(self, target_ratio: float = 0.9) -> int:
+        """Drop least recently used pages until the cache is under `target_ratio` of its budget."""
+        target = int(self.max_bytes * target_ratio)
+        removed = 0
+        with self._lock:
+            rows = self._conn.execute('SELECT url, path, size FROM pages ORDER BY accessed_at').fetchall()
+            for url, path, size in rows:
+                if self._total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                self._conn.execute('DELETE FROM pages WHERE url = ?', (url,))
+                self._total -= size
+                removed += 1
+            self._conn.commit()
+        return removed
+
+    def urls(self, like: str = None, limit: int = None) -> list[str]:
+        """Cached URLs, most recently used first, optionally filtered with an SQL LIKE pattern."""
+        query = 'SELECT url FROM pages'
+        params = []
+        if like:
+            query += ' WHERE url LIKE ?'
+            params.append(like)
+        query += ' ORDER BY accessed_at DESC'
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+        with self._lock:
+            return [r[0] for r in self._conn.execute(query, params).fetchall()]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def fetch_cached(session, url: str, cache: Optional[HtmlCache], timeout: int = 15, headers: dict = None,
+                 priority: int = PRIORITY_NORMAL) -> str:
+    """GET `url` through `session` (or the `requests` module), serving fresh cache hits and revalidating stale ones."""
+    entry = cache.get(url) if cache is not None else None
+    if entry is not None and entry.fresh:
+        get_telemetry().event('fetch', url=url, fetcher='cache', bytes=len(entry.html))
+        return entry.html
+    if cache is not None and cache.offline:
+        get_telemetry().error('fetch', url, fetcher='cache', error='not cached')
+        return ''
+
+    headers = dict(headers or {})
+    if cache is not None:
+        headers.update(cache.conditional_headers(entry))
+    resp = scheduled_get(session, url, priority, headers=headers, timeout=timeout)
+    if resp is None:
+        return ''
+    if resp.status_code == 304 and entry is not None:
+        cache.touch(url)
+        return entry.html
+    if resp.status_code != 200:
+        return ''
+    if cache is not None and not is_challenge_page(resp.text):
+        cache.put(url, resp.text, resp.headers.get('ETag'), resp.headers.get('Last-Modified'))
+    return resp.text
@@ -0,0 +1,139 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Optional
+
+DEFAULT_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scrape_manifest.db')
+
+# A page moves fetched -> parsed -> written; 'empty' (no rows), 'unchanged' (same hash as the stored page)
+# and 'written' are terminal, 'failed' is retried
+DONE_STAGES = ('written', 'empty', 'unchanged')
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class RunManifest:
+    """Per-run record of every gamelog page: which stage it reached, how long each stage took, and errors.
+
+    Stored in its own SQLite file (not gamelogs.db) so bookkeeping never dirties the
+    committed database. A run that did not finish can be resumed: players whose pages
+    all reached a terminal stage are skipped, everything else is retried.
+    """
+
+    def __init__(self, path: str = DEFAULT_MANIFEST, resume: bool = False, args: dict = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at TEXT,
+            finished_at TEXT,
+            status TEXT,
+            args TEXT
+        );
+        CREATE TABLE IF NOT EXISTS pages (
+            run_id INTEGER,
+            url TEXT,
+            player_id INTEGER,
+            game_type TEXT,
+            stage TEXT,
+            rows INTEGER,
+            bytes INTEGER,
+            fetch_s REAL,
+            parse_s REAL,
+            write_s REAL,
+            error TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (run_id, url)
+        );
+        CREATE INDEX IF NOT EXISTS idx_pages_run_player ON pages (run_id, player_id);
+        ''')
+        self.resumed = False
+        self.run_id = None
+        if resume:
+            row = self._conn.execute(
+                "SELECT run_id FROM runs WHERE status != 'finished' ORDER BY run_id DESC LIMIT 1"
+            ).fetchone()
+            if row:
+                self.run_id = row[0]
+                self.resumed = True
+                with self._conn:
+                    self._conn.execute("UPDATE runs SET status = 'running' WHERE run_id = ?", (self.run_id,))
+        if self.run_id is None:
+            with self._conn:
+                cur = self._conn.execute(
+                    "INSERT INTO runs (started_at, status, args) VALUES (?, 'running', ?)",
+                    (_now(), json.dumps(args or {}, default=str)),
+                )
+            self.run_id = cur.lastrowid
+
+    def record(self, url: str, stage: str, player_id: Optional[int] = None, game_type: Optional[str] = None,
+               error: Optional[str] = None, **values) -> None:
+        """Move `url` to `stage`, keeping any earlier timings; `values` may set rows, bytes, fetch_s, parse_s, write_s."""
+        cols = ['stage', 'error', 'updated_at'] + list(values)
+        params = [stage, error, _now()] + list(values.values())
+        updates = ', '.join(f"{c} = excluded.{c}" for c in cols)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO pages (run_id, url, player_id, game_type, {', '.join(cols)}) "
+                f"VALUES (?, ?, ?, ?, {', '.join(['?'] * len(cols))}) "
+                f"ON CONFLICT (run_id, url) DO UPDATE SET {updates}, "
+                f"player_id = COALESCE(excluded.player_id, player_id), game_type = COALESCE(excluded.game_type, game_type)",
+                [self.run_id, url, player_id, game_type] + params,
+            )
+
+    def completed_players(self) -> set:
+        """Players of this run whose every recorded page reached a terminal stage (see DONE_STAGES)."""
+        marks = ', '.join('?' * len(DONE_STAGES))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT player_id, SUM(stage NOT IN ({marks})) FROM pages WHERE run_id = ? AND player_id IS NOT NULL "
+                "GROUP BY player_id",
+                (*DONE_STAGES, self.run_id),
+            ).fetchall()
+        return {pid for pid, pending in rows if not pending}
+
+    def summary(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, COUNT(*) FROM pages WHERE run_id = ? GROUP BY stage", (self.run_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def finish(self) -> None:
+        counts = self.summary()
+        pending = sum(n for stage, n in counts.items() if stage not in DONE_STAGES)
+        status = 'finished' if not pending else 'incomplete'
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ?, status = ? WHERE run_id = ?", (_now(), status, self.run_id)
+            )
+        print(f"Run {self.run_id} {status}: " + ', '.join(f"{n} {stage}" for stage, n in sorted(counts.items())))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def last_finished_run(path: str = DEFAULT_MANIFEST) -> Optional[datetime]:
+    """Start time of the most recent run that finished with every page written or empty."""
+    if not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(path)
+    try:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+        if 'runs' not in tables:
+            return None
+        row = conn.execute(
+            "SELECT started_at FROM runs WHERE status = 'finished' ORDER BY run_id DESC LIMIT 1"
+        ).fetchone()
+    finally:
+        conn.close()
+    return datetime.fromisoformat(row[0]) if row and row[0] else None
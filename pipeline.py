@@ -0,0 +1,97 @@
+import queue
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Iterable
+
+_DONE = object()
+
+
+def run_pipeline(jobs: Iterable, fetch_fn: Callable, parse_fn: Callable, write_fn: Callable, *,
+                 fetch_workers: int = 8, parse_workers: int = 2, queue_size: int = 32) -> None:
+    """Run jobs through fetch -> parse -> write stages connected by bounded queues.
+
+    `fetch_fn(job)` runs on `fetch_workers` threads and returns a payload (or None to drop
+    the job). `parse_fn(payload)` runs in a ProcessPoolExecutor with `parse_workers`
+    processes, so it must be a picklable module-level function. `write_fn(result)` runs
+    on a single writer thread, so it never competes with itself for the database.
+    """
+    job_q = queue.Queue()
+    for job in jobs:
+        job_q.put(job)
+    parse_q = queue.Queue(maxsize=queue_size)
+    write_q = queue.Queue(maxsize=queue_size)
+
+    def fetcher():
+        while True:
+            try:
+                job = job_q.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                payload = fetch_fn(job)
+            except Exception:
+                traceback.print_exc()
+                continue
+            if payload is not None:
+                parse_q.put(payload)
+
+    def writer():
+        while True:
+            result = write_q.get()
+            if result is _DONE:
+                return
+            try:
+                write_fn(result)
+            except Exception:
+                traceback.print_exc()
+
+    fetch_threads = [threading.Thread(target=fetcher, daemon=True) for _ in range(max(1, fetch_workers))]
+    for t in fetch_threads:
+        t.start()
+
+    def close_parse_queue():
+        for t in fetch_threads:
+            t.join()
+        parse_q.put(_DONE)
+
+    threading.Thread(target=close_parse_queue, daemon=True).start()
+    writer_thread = threading.Thread(target=writer, daemon=True)
+    writer_thread.start()
+
+    def forward(done):
+        for fut in done:
+            try:
+                result = fut.result()
+            except Exception:
+                traceback.print_exc()
+                continue
+            if result is not None:
+                write_q.put(result)
+
+    parse_workers = max(1, parse_workers)
+    max_inflight = parse_workers * 2
+    inflight = set()
+    try:
+        with ProcessPoolExecutor(max_workers=parse_workers) as executor:
+            while True:
+                try:
+                    payload = parse_q.get(timeout=0.1)
+                except queue.Empty:
+                    payload = None
+                if payload is _DONE:
+                    break
+                if payload is not None:
+                    inflight.add(executor.submit(parse_fn, payload))
+                # Hand finished parses to the writer as they complete; block only when the pool is saturated
+                if len(inflight) >= max_inflight:
+                    done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                else:
+                    done = {f for f in inflight if f.done()}
+                    inflight -= done
+                forward(done)
+            done, _ = wait(inflight)
+            forward(done)
+    finally:
+        write_q.put(_DONE)
+        writer_thread.join()
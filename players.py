@@ -1,17 +1,37 @@
 import os
 import re
+from datetime import datetime
 from typing import Optional
 import pandas as pd
 from bs4 import BeautifulSoup
+from lxml import etree
 import traceback
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 import time
+from fetching import is_challenge_page, make_session
+from html_cache import HtmlCache, fetch_cached
+from scheduler import PRIORITY_HIGH, get_scheduler
+from schema import PLAYER_COLUMNS
+from storage import load_players, write_players
 
 URL = "https://basketball.realgm.com/nba/players"
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gamelogs.db")
 DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "players.xlsx")
+DEFAULT_DIFF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "players_diff.xlsx")
+DIFF_COLUMNS = ["Change", "PlayerID", "Player", "PlayerHref", "OldTeam", "NewTeam", "OldPos", "NewPos", "DetectedAt"]
+
+# Upper bound for the browser to get past a challenge and render the roster table
+TABLE_WAIT_SECONDS = 30
+PLAYER_CELL = 'td[data-th="Player"]'
+
+_HTML_PARSER = etree.HTMLParser(encoding="utf-8")
 
 
 def _parse_table_rows_from_soup(soup: BeautifulSoup) -> list[dict]:
@@ -66,7 +86,78 @@ def _parse_table_rows_from_soup(soup: BeautifulSoup) -> list[dict]:
     print("No valid player rows found in any table")
     return []
 
-def _scrape_with_selenium(out_path: str) -> bool:
+def _cell_text(td) -> str:
+    return "".join(td.itertext()).strip() if td is not None else ""
+
+
+def _parse_table_rows(html: str) -> list[dict]:
+    """lxml version of _parse_table_rows_from_soup: only rows with a Player cell are visited."""
+    try:
+        root = etree.fromstring(html.encode("utf-8"), _HTML_PARSER)
+    except Exception:
+        root = None
+    if root is None:
+        return _parse_table_rows_from_soup(BeautifulSoup(html, "lxml"))
+
+    for table in root.iter("table"):
+        rows = []
+        for tr in table.iter("tr"):
+            cells = {}
+            for td in tr.iterchildren("td"):
+                cells.setdefault(td.get("data-th"), td)
+            player_cell = cells.get("Player")
+            if player_cell is None:
+                continue
+
+            a = next(player_cell.iter("a"), None)
+            player_name = _cell_text(a if a is not None else player_cell)
+            player_link = a.get("href", "") if a is not None else ""
+            m = re.search(r"/Summary/(\d+)", player_link)
+            rows.append(
+                {
+                    "Player": player_name,
+                    "PlayerHref": player_link,
+                    "Pos": _cell_text(cells.get("Pos")),
+                    "Age": _cell_text(cells.get("Age")),
+                    "Current Team": _cell_text(cells.get("Current Team")),
+                    "YOS": _cell_text(cells.get("YOS")),
+                    "PlayerID": m.group(1) if m else "",
+                }
+            )
+
+        if rows:
+            print(f"Found {len(rows)} players in table")
+            return rows
+
+    print("No valid player rows found in any table")
+    return []
+
+
+def _has_player_table(html: str) -> bool:
+    return bool(html) and not is_challenge_page(html) and 'data-th="Player"' in html
+
+
+def _fetch_roster_html(cache: Optional[HtmlCache] = None) -> Optional[str]:
+    # Plain HTTP first (through the cache, with revalidation); the browser only when that gets no table
+    session = make_session(pool_size=1)
+    try:
+        html = fetch_cached(session, URL, cache, timeout=30, priority=PRIORITY_HIGH)
+    except Exception:
+        html = ""
+    finally:
+        session.close()
+    if _has_player_table(html):
+        return html
+    if cache is not None and cache.offline:
+        print(f"No cached copy of {URL} available offline")
+        return None
+
+    html = _fetch_with_selenium()
+    if html is not None and cache is not None and _has_player_table(html):
+        cache.put(URL, html)
+    return html
+
+def _fetch_with_selenium() -> Optional[str]:
     try:
         print(f"Setting up Selenium...")
         options = Options()
@@ -81,50 +172,165 @@ def _scrape_with_selenium(out_path: str) -> bool:
         # Bypass detection by removing 'webdriver' property
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
 
+        scheduler = get_scheduler()
         try:
+            # The roster drives everything else, so it jumps the queue
+            if not scheduler.acquire(URL, PRIORITY_HIGH):
+                print(f"Skipping {URL}: too many recent failures")
+                return None
             print(f"Fetching {URL}...")
-            driver.get(URL)
-            time.sleep(10) # Wait for page and cloudflare challenge if any
+            start = time.perf_counter()
+            try:
+                driver.get(URL)
+            except Exception:
+                scheduler.record(URL, None, time.perf_counter() - start)
+                raise
+            latency = time.perf_counter() - start
+            # Returns as soon as the roster rows exist, which also covers a Cloudflare challenge resolving
+            try:
+                WebDriverWait(driver, TABLE_WAIT_SECONDS).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, PLAYER_CELL)))
+            except TimeoutException:
+                print(f"Player table did not appear within {TABLE_WAIT_SECONDS}s")
             html = driver.page_source
+            scheduler.record(URL, 429 if is_challenge_page(html) else 200, latency)
             print(f"Page Title: {driver.title}")
         finally:
             driver.quit()
         
         print("Page retrieved")
+        return html
     except Exception:
         print("Exception during Selenium scrape")
         traceback.print_exc()
-        return False
+        return None
+
+def roster_diff(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Players added, removed, traded (Current Team changed) or with a new Pos, keyed by PlayerID."""
+    def keyed(df):
+        df = df.copy()
+        df["PlayerID"] = df["PlayerID"].astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+        df = df[~df["PlayerID"].isin(["", "nan"])]
+        return df.drop_duplicates(subset=["PlayerID"]).set_index("PlayerID")
+
+    old, new = keyed(old), keyed(new)
+    both = new.index.intersection(old.index)
+    old_team = old.loc[both, "Current Team"].fillna("").astype(str)
+    new_team = new.loc[both, "Current Team"].fillna("").astype(str)
+    old_pos = old.loc[both, "Pos"].fillna("").astype(str)
+    new_pos = new.loc[both, "Pos"].fillna("").astype(str)
+
+    parts = []
+    for change, ids, source in (
+        ("added", new.index.difference(old.index), new),
+        ("removed", old.index.difference(new.index), old),
+        ("traded", both[(old_team != new_team).to_numpy()], new),
+        ("position", both[((old_team == new_team) & (old_pos != new_pos)).to_numpy()], new),
+    ):
+        if len(ids) == 0:
+            continue
+        part = pd.DataFrame({
+            "Change": change,
+            "PlayerID": ids,
+            "Player": source.loc[ids, "Player"].to_numpy(),
+            "PlayerHref": source.loc[ids, "PlayerHref"].to_numpy(),
+            "OldTeam": old["Current Team"].reindex(ids).to_numpy(),
+            "NewTeam": new["Current Team"].reindex(ids).to_numpy(),
+            "OldPos": old["Pos"].reindex(ids).to_numpy(),
+            "NewPos": new["Pos"].reindex(ids).to_numpy(),
+        })
+        parts.append(part)
+    diff = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=DIFF_COLUMNS[:-1])
+    diff["DetectedAt"] = datetime.now().isoformat(timespec="seconds")
+    return diff[DIFF_COLUMNS]
+
+
+def _write_excel(df: pd.DataFrame, path: str) -> None:
+    # Write next to the target and swap it in, so a failed write never leaves the old file deleted
+    tmp = path + ".tmp.xlsx"
+    df.to_excel(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def _previous_roster(db_path: str, excel_path: Optional[str]) -> pd.DataFrame:
+    # The players table is the previous roster; before its first write, the last players.xlsx is
+    old = load_players(db_path)
+    if old.empty:
+        legacy = excel_path or DEFAULT_OUTPUT
+        if os.path.exists(legacy):
+            old = pd.read_excel(legacy, dtype=str)
+    return old.astype(object).where(old.notna(), "").astype(str)
+
+
+def _write_players(html: str, db_path: str, out_path: Optional[str] = None, diff_path: Optional[str] = None) -> bool:
+    rows = _parse_table_rows(html)
 
-    soup = BeautifulSoup(html, "lxml")
-    rows = _parse_table_rows_from_soup(soup)
-    
     if not rows:
         print("No rows found to save")
         return False
 
-    df = pd.DataFrame(rows, columns=["Player", "Pos", "Age", "Current Team", "YOS", "PlayerHref", "PlayerID"])
+    df = pd.DataFrame(rows, columns=PLAYER_COLUMNS)
     try:
-        if os.path.exists(out_path):
-            try:
-                os.remove(out_path)
-                print(f"Removed existing {out_path}")
-            except Exception:
-                print(f"Failed to remove {out_path}")
-                traceback.print_exc()
-        df.to_excel(out_path, index=False)
-        print(f"Successfully wrote to {out_path}")
+        diff = roster_diff(_previous_roster(db_path, out_path), df)
+        counts = diff["Change"].value_counts()
+        print("Roster changes: " + ", ".join(f"{counts.get(c, 0)} {c}" for c in ("added", "removed", "traded", "position")))
+        if diff_path:
+            _write_excel(diff, diff_path)
+            print(f"Wrote roster diff to {diff_path}")
+
+        added, changed, deactivated = write_players(db_path, df)
+        print(f"players table in {db_path}: {added} added, {changed} updated, {deactivated} no longer listed")
+    except Exception:
+        print("Exception during players table write")
+        traceback.print_exc()
+        return False
+
+    if not out_path:
+        return True
+    try:
+        old = pd.read_excel(out_path, dtype=str).fillna("") if os.path.exists(out_path) else pd.DataFrame(columns=PLAYER_COLUMNS)
+        if old.reindex(columns=PLAYER_COLUMNS).equals(df.astype(str)):
+            print(f"{out_path} is already up to date")
+        else:
+            _write_excel(df, out_path)
+            print(f"Successfully wrote to {out_path}")
         return True
     except Exception:
         print("Exception during excel write")
         traceback.print_exc()
         return False
 
-def run_players(out_path: Optional[str] = None) -> str:
-    out_path = out_path or DEFAULT_OUTPUT
-    ok = _scrape_with_selenium(out_path)
-    return out_path if ok else ""
+
+def load_roster_diff(path: str = DEFAULT_DIFF, changes: tuple = ("added", "traded", "position")) -> pd.DataFrame:
+    """Rows of the last roster diff whose Change is in `changes`; empty when there is no diff file."""
+    if not path or not os.path.exists(path):
+        return pd.DataFrame(columns=DIFF_COLUMNS)
+    diff = pd.read_excel(path, dtype={"PlayerID": str})
+    return diff[diff["Change"].isin(changes)]
+
+
+def run_players(out_path: Optional[str] = None, cache: Optional[HtmlCache] = None,
+                diff_path: Optional[str] = DEFAULT_DIFF, db_path: str = DEFAULT_DB) -> str:
+    """Scrape the roster into the players table of `db_path`; `out_path` also exports it as xlsx."""
+    html = _fetch_roster_html(cache)
+    if html is None:
+        return ""
+    ok = _write_players(html, db_path, out_path, diff_path)
+    return db_path if ok else ""
 
 
 if __name__ == "__main__":
-    run_players()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scrape the RealGM player list into the players table of gamelogs.db")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Database receiving the players table")
+    parser.add_argument("--output", "-o", nargs="?", const=DEFAULT_OUTPUT, default=None,
+                        help="Also export the roster as xlsx (default path: players.xlsx)")
+    parser.add_argument("--offline", action="store_true", help="Only use the page already in the HTML cache")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk HTML cache")
+    parser.add_argument("--diff", default=DEFAULT_DIFF,
+                        help="Where to write players added/removed/traded/repositioned since the last run (empty to skip)")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache and not args.offline else HtmlCache(offline=args.offline)
+    run_players(args.output, cache=cache, diff_path=args.diff or None, db_path=args.db)
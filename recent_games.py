@@ -0,0 +1,140 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+from schema import COMBO_STATS, GAME_STATS, SQL_TYPES
+from storage import connect, player_fingerprints
+
+# Largest last-N window the app shows (Last 5 / 10 / 20)
+RECENT_GAMES_MAX = 20
+
+RECENT_KEY_COLS = ['PlayerID', 'Season', 'GameType', 'Rank']
+RECENT_GAME_COLS = ['Player', 'Date', 'Team', 'Opponent', 'WL', 'Status', 'Pos', 'MIN'] + GAME_STATS
+COMBO_COLS = [combo for combo, _ in COMBO_STATS]
+RECENT_COLS = RECENT_KEY_COLS + RECENT_GAME_COLS + COMBO_COLS
+
+RECENT_INDEXES = {
+    'idx_recent_games_season_type': 'Season, GameType, Rank',
+}
+
+
+def _quote(col: str) -> str:
+    return f'"{col}"'
+
+
+def ensure_recent_games_tables(cur) -> None:
+    # Combo sums are REAL, as the app's pandas sums were
+    types = {**SQL_TYPES, 'Rank': 'INTEGER', **{c: 'REAL' for c in COMBO_COLS}}
+    columns = ',\n        '.join(f"{_quote(c)} {types[c]}" for c in RECENT_COLS)
+    cur.execute(f'''
+    CREATE TABLE IF NOT EXISTS recent_games (
+        {columns},
+        PRIMARY KEY ({', '.join(RECENT_KEY_COLS)})
+    )
+    ''')
+    for name, cols in RECENT_INDEXES.items():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON recent_games ({cols})")
+    cur.execute('''
+    CREATE TABLE IF NOT EXISTS recent_games_state (
+        PlayerID INTEGER PRIMARY KEY,
+        Fingerprint TEXT
+    )
+    ''')
+
+
+def _combo_sql(parts: list) -> str:
+    # pandas sums skip missing values; so does this
+    return ' + '.join(f"COALESCE({p}, 0)" for p in parts)
+
+
+# Each player's RECENT_GAMES_MAX latest games per (Season, GameType), newest first (Rank 1)
+_REBUILD_QUERY = f'''
+INSERT INTO recent_games ({', '.join(_quote(c) for c in RECENT_COLS)})
+SELECT {', '.join(_quote(c) for c in RECENT_COLS)} FROM (
+    SELECT PlayerID, Season, GameType,
+           ROW_NUMBER() OVER (PARTITION BY PlayerID, Season, GameType ORDER BY Date DESC, Opponent) AS Rank,
+           {', '.join(RECENT_GAME_COLS)},
+           {', '.join(f'{_combo_sql(parts)} AS {_quote(combo)}' for combo, parts in COMBO_STATS)}
+    FROM gamelogs
+    WHERE PlayerID IN (SELECT PlayerID FROM recent_players) AND Season IS NOT NULL AND GameType IS NOT NULL
+)
+WHERE Rank <= {RECENT_GAMES_MAX}
+'''
+
+
+def refresh_recent_games(db_path: str, force: bool = False) -> int:
+    """Bring the recent_games table of `db_path` up to date with its gamelogs.
+
+    Only players whose gamelogs changed since the last refresh are re-ranked (`force`
+    re-ranks everyone). Returns the number of players rebuilt.
+    """
+    if not os.path.exists(db_path):
+        return 0
+    conn = connect(db_path)
+    try:
+        cur = conn.cursor()
+        tables = {r[0] for r in cur.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+        if 'gamelogs' not in tables:
+            return 0
+        ensure_recent_games_tables(cur)
+        stored = dict(cur.execute("SELECT PlayerID, Fingerprint FROM recent_games_state").fetchall())
+        # The window size is part of the fingerprint, so changing it re-ranks everyone
+        current = {pid: f'{RECENT_GAMES_MAX}:{fp}' for pid, fp in player_fingerprints(conn).items()}
+        changed = {pid for pid, fp in current.items() if force or stored.get(pid) != fp}
+        removed = set(stored) - set(current)
+        if not changed and not removed:
+            return 0
+
+        with conn:
+            cur.execute("CREATE TEMP TABLE IF NOT EXISTS recent_players (PlayerID INTEGER PRIMARY KEY)")
+            cur.execute("DELETE FROM recent_players")
+            cur.executemany("INSERT INTO recent_players VALUES (?)", [(p,) for p in changed | removed])
+            cur.execute("DELETE FROM recent_games WHERE PlayerID IN (SELECT PlayerID FROM recent_players)")
+            cur.execute(_REBUILD_QUERY)
+            cur.execute("DELETE FROM recent_games_state WHERE PlayerID IN (SELECT PlayerID FROM recent_players)")
+            cur.executemany("INSERT INTO recent_games_state VALUES (?, ?)", [(p, current[p]) for p in changed])
+    finally:
+        conn.close()
+    print(f"Recent games: re-ranked {len(changed)} players.")
+    return len(changed)
+
+
+def load_recent_games(db_path: str, seasons: list = None, game_types: list = None, n: int = RECENT_GAMES_MAX,
+                      player_id: int = None, columns: list = None):
+    """Each player's `n` latest games across the given seasons and game types, newest first.
+
+    Rows carry `LastN` (1 = latest game of the selection), so a shorter window is `LastN <= k`.
+    Only the stored top-`RECENT_GAMES_MAX` rows of each (Season, GameType) are read, since the
+    latest `n` games of a selection are always among them. Returns None when the table is
+    missing or `n` is beyond what it holds, so callers can fall back to the gamelogs.
+    """
+    if n > RECENT_GAMES_MAX or not os.path.exists(db_path):
+        return None
+    cols = [c for c in (columns or RECENT_COLS) if c in RECENT_COLS]
+    # The ranking keys and the precomputed combo sums always come along
+    cols += [c for c in ['PlayerID', 'Date', 'Opponent'] + COMBO_COLS if c not in cols]
+    clauses, params = ["Rank <= ?"], [n]
+    for col, values in (('Season', seasons), ('GameType', game_types)):
+        if values:
+            clauses.append(f"{col} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    # One player is a range of the primary key; names are not unique
+    if player_id is not None:
+        clauses.append("PlayerID = ?")
+        params.append(int(player_id))
+    select = ', '.join(_quote(c) for c in cols)
+    query = (
+        f"SELECT {select}, LastN FROM ("
+        f"  SELECT {select}, ROW_NUMBER() OVER (PARTITION BY PlayerID ORDER BY Date DESC, GameType, Opponent) AS LastN"
+        f"  FROM recent_games WHERE {' AND '.join(clauses)}"
+        f") WHERE LastN <= ? ORDER BY PlayerID, LastN"
+    )
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+        if 'recent_games' not in tables:
+            return None
+        return pd.read_sql_query(query, conn, params=params + [n])
+    finally:
+        conn.close()
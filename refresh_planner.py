@@ -0,0 +1,75 @@
+import glob
+import os
+import sqlite3
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from teams import REF_BY_ID, team_id, team_refs
+
+
+def team_key(name) -> str:
+    """Map any spelling of a team ('Atlanta Hawks', 'Atlanta-Hawks', 'L.a.-Lakers', 'ATL') to its schedule ref, or ''."""
+    return REF_BY_ID.get(team_id(name), '')
+
+
+def find_schedule(directory: str) -> Optional[str]:
+    """Newest `<year>-Schedules-Extracted.xlsx` written by generate_schedule.py in `directory`."""
+    paths = sorted(glob.glob(os.path.join(directory, '*-Schedules-Extracted.xlsx')))
+    return paths[-1] if paths else None
+
+
+def load_schedule(path: str) -> pd.DataFrame:
+    df = pd.read_excel(path)
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce', format='%m/%d/%Y')
+    df['Team'] = team_refs(df['Team'])
+    df['Opponent'] = team_refs(df['Opponent'])
+    return df.dropna(subset=['Date'])
+
+
+def teams_played(schedule: pd.DataFrame, since: datetime, until: datetime = None) -> set:
+    """Teams with a game on any day from `since` (inclusive, a game that day may have ended after the run) to `until`."""
+    until = until or datetime.now()
+    window = schedule[(schedule['Date'] >= pd.Timestamp(since.date())) & (schedule['Date'] <= pd.Timestamp(until.date()))]
+    return (set(window['Team']) | set(window['Opponent'])) - {''}
+
+
+def latest_gamelog_teams(db_path: str) -> dict:
+    """PlayerID -> schedule ref of the team on each player's most recent stored game."""
+    if not os.path.exists(db_path):
+        return {}
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+        if 'gamelogs' not in tables:
+            return {}
+        rows = conn.execute(
+            "SELECT PlayerID, Team FROM ("
+            "  SELECT PlayerID, Team, ROW_NUMBER() OVER (PARTITION BY PlayerID ORDER BY Date DESC) AS rn"
+            "  FROM gamelogs"
+            ") WHERE rn = 1"
+        ).fetchall()
+    finally:
+        conn.close()
+    return {int(pid): team_key(team) for pid, team in rows if str(pid).strip().isdigit()}
+
+
+def plan_refresh(players_df: pd.DataFrame, schedule: pd.DataFrame, since: datetime, db_path: str,
+                 until: datetime = None) -> tuple[set, set]:
+    """Return (PlayerHrefs to refresh, teams that played).
+
+    A player is refreshed when either their `Current Team` or the team on their latest
+    stored game played in the window, so a traded player is picked up whether
+    the players table already shows the new team or not. Players whose team cannot be
+    resolved and players with nothing stored yet are always refreshed.
+    """
+    played = teams_played(schedule, since, until)
+    hrefs = players_df['PlayerHref'].fillna('').astype(str)
+    pids = pd.to_numeric(hrefs.str.extract(r'/Summary/(\d+)', expand=False), errors='coerce')
+    current = pd.Series(team_refs(players_df.get('Current Team', pd.Series('', index=players_df.index))),
+                        index=players_df.index)
+    last_team = pids.map(latest_gamelog_teams(db_path)).fillna('')
+
+    keep = current.isin(played) | last_team.isin(played) | (current == '') | (last_team == '')
+    return set(hrefs[keep & (hrefs != '')]), played
@@ -0,0 +1,179 @@
+import os
+import sqlite3
+
+import pandas as pd
+
+from storage import connect, player_fingerprints
+
+# One row per stored game (same key as gamelogs) with what the schedule says around it
+CONTEXT_COLS = ['PlayerID', 'Date', 'GameType', 'Opponent', 'TeamID', 'OpponentID', 'Home', 'DaysRest', 'BackToBack',
+                'NextDate', 'NextOpponentID', 'NextOpponent', 'NextHome', 'NextBackToBack']
+NEXT_GAME_COLS = ['PlayerID', 'LastDate', 'NextDate', 'NextOpponentID', 'NextOpponent', 'NextHome', 'NextBackToBack']
+
+
+def ensure_schedule_context_tables(cur) -> None:
+    cur.execute('''
+    CREATE TABLE IF NOT EXISTS schedule_context (
+        PlayerID INTEGER,
+        Date TEXT,
+        GameType TEXT,
+        Opponent TEXT,
+        TeamID INTEGER,
+        OpponentID INTEGER,
+        Home INTEGER,
+        DaysRest INTEGER,
+        BackToBack INTEGER,
+        NextDate TEXT,
+        NextOpponentID INTEGER,
+        NextOpponent TEXT,
+        NextHome INTEGER,
+        NextBackToBack INTEGER,
+        PRIMARY KEY (PlayerID, Date, Opponent, GameType)
+    )
+    ''')
+    # Fingerprints of the inputs each player's and team's rows were built from
+    cur.execute('''
+    CREATE TABLE IF NOT EXISTS schedule_context_state (
+        Kind TEXT,
+        ID INTEGER,
+        Fingerprint TEXT,
+        PRIMARY KEY (Kind, ID)
+    )
+    ''')
+
+
+def team_fingerprints(conn: sqlite3.Connection) -> dict:
+    """{team id: fingerprint of its games in the schedule}."""
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+    if 'games' not in tables:
+        return {}
+    rows = conn.execute(
+        "SELECT TeamID, COUNT(*), MAX(Date), SUM(julianday(Date)), SUM(OpponentID * julianday(Date)) FROM ("
+        "  SELECT HomeTeamID AS TeamID, Date, AwayTeamID AS OpponentID FROM games"
+        "  UNION ALL SELECT AwayTeamID, Date, HomeTeamID FROM games"
+        ") WHERE TeamID IS NOT NULL GROUP BY TeamID"
+    ).fetchall()
+    return {int(tid): ':'.join(map(str, rest)) for tid, *rest in rows}
+
+
+def _build_team_games(cur) -> None:
+    # Each game from both sides, keyed for the "first game after this date" lookup
+    cur.execute("DROP TABLE IF EXISTS temp.team_games")
+    cur.execute(
+        "CREATE TEMP TABLE team_games (TeamID INTEGER, Date TEXT, OpponentID INTEGER, Opponent TEXT, Home INTEGER, "
+        "PRIMARY KEY (TeamID, Date))"
+    )
+    tables = {r[0] for r in cur.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+    if 'games' in tables:
+        cur.execute(
+            "INSERT OR IGNORE INTO team_games "
+            "SELECT HomeTeamID, Date, AwayTeamID, AwayTeam, 1 FROM games WHERE HomeTeamID IS NOT NULL "
+            "UNION ALL SELECT AwayTeamID, Date, HomeTeamID, HomeTeam, 0 FROM games WHERE AwayTeamID IS NOT NULL"
+        )
+
+
+# DaysRest counts the days off between games (0 on the second night of a back-to-back).
+# The next game is the first one on the team's schedule after the game's date.
+_REBUILD_QUERY = f'''
+INSERT INTO schedule_context ({', '.join(CONTEXT_COLS)})
+SELECT c.PlayerID, c.Date, c.GameType, c.Opponent, c.TeamID, c.OpponentID, c.Home,
+       MAX(c.Gap - 1, 0), c.Gap = 1,
+       n.Date, n.OpponentID, n.Opponent, n.Home,
+       CASE WHEN n.Date IS NOT NULL THEN julianday(n.Date) - julianday(c.Date) = 1 END
+FROM (
+    SELECT PlayerID, Date, GameType, Opponent, TeamID, OpponentID,
+           CASE WHEN Opponent LIKE '@%' THEN 0 WHEN Opponent LIKE 'v%' THEN 1 END AS Home,
+           CAST(julianday(Date) - julianday(LAG(Date) OVER w) AS INTEGER) AS Gap
+    FROM gamelogs
+    WHERE PlayerID IN (SELECT PlayerID FROM context_players)
+    WINDOW w AS (PARTITION BY PlayerID ORDER BY Date)
+) c
+LEFT JOIN team_games n
+    ON n.TeamID = c.TeamID
+   AND n.Date = (SELECT MIN(Date) FROM team_games WHERE TeamID = c.TeamID AND Date > c.Date)
+'''
+
+
+def refresh_schedule_context(db_path: str, force: bool = False) -> int:
+    """Bring the schedule_context table of `db_path` up to date with its gamelogs and games.
+
+    Only players whose gamelogs changed, or who played for a team whose schedule changed,
+    are rebuilt (`force` rebuilds everyone). Returns the number of players rebuilt.
+    """
+    if not os.path.exists(db_path):
+        return 0
+    conn = connect(db_path)
+    try:
+        cur = conn.cursor()
+        tables = {r[0] for r in cur.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+        if 'gamelogs' not in tables:
+            return 0
+        ensure_schedule_context_tables(cur)
+        stored = {(kind, i): fp for kind, i, fp in cur.execute("SELECT Kind, ID, Fingerprint FROM schedule_context_state")}
+        players = player_fingerprints(conn)
+        teams = team_fingerprints(conn)
+
+        changed_players = {pid for pid, fp in players.items() if force or stored.get(('player', pid)) != fp}
+        changed_teams = {tid for tid, fp in teams.items() if stored.get(('team', tid)) != fp}
+        changed_teams |= {i for kind, i in stored if kind == 'team' and i not in teams}
+        if changed_teams:
+            marks = ', '.join('?' * len(changed_teams))
+            changed_players |= {int(pid) for pid, in cur.execute(
+                f"SELECT DISTINCT PlayerID FROM gamelogs WHERE TeamID IN ({marks})", sorted(changed_teams))}
+        removed_players = {i for kind, i in stored if kind == 'player' and i not in players}
+        if not changed_players and not removed_players and not changed_teams:
+            return 0
+
+        with conn:
+            cur.execute("CREATE TEMP TABLE IF NOT EXISTS context_players (PlayerID INTEGER PRIMARY KEY)")
+            cur.execute("DELETE FROM context_players")
+            cur.executemany("INSERT INTO context_players VALUES (?)", [(p,) for p in changed_players | removed_players])
+            cur.execute("DELETE FROM schedule_context WHERE PlayerID IN (SELECT PlayerID FROM context_players)")
+            _build_team_games(cur)
+            cur.execute(_REBUILD_QUERY)
+            cur.execute("DELETE FROM schedule_context_state")
+            cur.executemany("INSERT INTO schedule_context_state VALUES ('player', ?, ?)", players.items())
+            cur.executemany("INSERT INTO schedule_context_state VALUES ('team', ?, ?)", teams.items())
+    finally:
+        conn.close()
+    print(f"Schedule context: rebuilt {len(changed_players)} players"
+          + (f" ({len(changed_teams)} team schedules changed)" if changed_teams else "") + ".")
+    return len(changed_players)
+
+
+def _read(db_path: str, query: str, params: list) -> pd.DataFrame:
+    if not os.path.exists(db_path):
+        return pd.DataFrame()
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+        if 'schedule_context' not in tables:
+            return pd.DataFrame()
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+
+def _id_filter(player_ids) -> tuple[str, list]:
+    if player_ids is None:
+        return '', []
+    ids = [int(p) for p in player_ids]
+    return f" WHERE PlayerID IN ({', '.join('?' * len(ids))})" if ids else " WHERE 0", ids
+
+
+def load_schedule_context(db_path: str, player_ids: list = None) -> pd.DataFrame:
+    """schedule_context rows of the given players (all when omitted), read through the primary key."""
+    where, params = _id_filter(player_ids)
+    return _read(db_path, f"SELECT {', '.join(CONTEXT_COLS)} FROM schedule_context{where}", params)
+
+
+def load_next_games(db_path: str, player_ids: list = None) -> pd.DataFrame:
+    """Per player, the next scheduled game after their latest stored one (NEXT_GAME_COLS)."""
+    where, params = _id_filter(player_ids)
+    # SQLite fills the bare columns from the row holding MAX(Date)
+    return _read(
+        db_path,
+        f"SELECT PlayerID, MAX(Date) AS LastDate, NextDate, NextOpponentID, NextOpponent, NextHome, NextBackToBack "
+        f"FROM schedule_context{where} GROUP BY PlayerID",
+        params,
+    )
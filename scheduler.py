@@ -0,0 +1,220 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+
+# Lower runs first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+THROTTLE_STATUSES = {429, 503}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostLimiter:
+    """Token bucket for one host whose refill rate adapts to how the host responds.
+
+    Successes with low latency raise the rate additively up to `max_rate`; slow
+    responses shrink it a little, throttling (429/503, challenge pages) halves it and
+    pauses the host for `Retry-After` if given. `failure_threshold` consecutive
+    failures open the circuit: requests fail fast for `cooldown` seconds (doubling on
+    every failed probe), then a single probe request decides whether it closes again.
+    Waiting requests are granted tokens in priority order.
+    """
+
+    def __init__(self, host: str, rate: float = 4.0, min_rate: float = 0.2, max_rate: float = 25.0,
+                 burst: int = 4, slow_latency: float = 3.0, increase: float = 0.25,
+                 failure_threshold: int = 5, cooldown: float = 30.0, max_cooldown: float = 300.0):
+        self.host = host
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.slow_latency = slow_latency
+        self.increase = increase
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self.tokens = float(burst)
+        self.latency = None
+        self.failures = 0
+        self.blocked_until = 0.0
+        self.open_until = 0.0
+        self.probing = False
+        self._stamp = time.monotonic()
+        self._waiters = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def circuit_open(self) -> bool:
+        return self.open_until > 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def _ticket(self, priority: int) -> tuple:
+        ticket = (priority, next(self._seq))
+        with self._lock:
+            heapq.heappush(self._waiters, ticket)
+        return ticket
+
+    def _cancel(self, ticket: tuple) -> None:
+        with self._lock:
+            if ticket in self._waiters:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+
+    def _try(self, ticket: tuple) -> Optional[float]:
+        """0 when `ticket` got a token, seconds to wait before asking again, or None if the circuit is open."""
+        with self._lock:
+            now = time.monotonic()
+            if self.circuit_open:
+                if now < self.open_until or self.probing:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                    return None
+                # Cooldown over: let exactly one request through to probe the host
+                self.probing = True
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                return 0.0
+            self._refill(now)
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if self._waiters[0] != ticket:
+                return max(0.01, 1.0 / self.rate)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                heapq.heappop(self._waiters)
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, priority: int = PRIORITY_NORMAL) -> bool:
+        """Block until a request to this host may go out; False means the circuit is open."""
+        ticket = self._ticket(priority)
+        try:
+            while True:
+                delay = self._try(ticket)
+                if delay is None:
+                    return False
+                if delay == 0:
+                    return True
+                time.sleep(delay)
+        finally:
+            self._cancel(ticket)
+
+    async def acquire_async(self, priority: int = PRIORITY_NORMAL) -> bool:
+        ticket = self._ticket(priority)
+        try:
+            while True:
+                delay = self._try(ticket)
+                if delay is None:
+                    return False
+                if delay == 0:
+                    return True
+                await asyncio.sleep(delay)
+        finally:
+            self._cancel(ticket)
+
+    def record(self, status: Optional[int], latency: float = None, retry_after: Optional[float] = None) -> None:
+        """Feed back the outcome of a request; `status` None means it failed without a response."""
+        with self._lock:
+            now = time.monotonic()
+            if status in THROTTLE_STATUSES:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.tokens = 0.0
+                self.blocked_until = max(self.blocked_until, now + (retry_after or 1.0 / self.rate))
+                failed = status == 503
+            else:
+                failed = status is None or status >= 500
+            if not failed and status not in THROTTLE_STATUSES:
+                if latency is not None:
+                    self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+                if self.latency is not None and self.latency > self.slow_latency:
+                    self.rate = max(self.min_rate, self.rate * 0.9)
+                else:
+                    self.rate = min(self.max_rate, self.rate + self.increase)
+
+            if failed:
+                self.failures += 1
+                if self.probing or self.failures >= self.failure_threshold:
+                    if self.probing:
+                        self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+                    self.open_until = now + self.cooldown
+                    self.probing = False
+                    print(f"Circuit open for {self.host}: {self.failures} failures, pausing {self.cooldown:.0f}s")
+            else:
+                self.failures = 0
+                if self.circuit_open and self.probing:
+                    print(f"Circuit closed for {self.host}")
+                if self.probing or not self.circuit_open:
+                    self.open_until = 0.0
+                    self.probing = False
+                    self.cooldown = self.base_cooldown
+
+
+class RequestScheduler:
+    """Shared pacing for every scraper: one adaptive HostLimiter per host."""
+
+    def __init__(self, **limiter_kwargs):
+        self.limiter_kwargs = limiter_kwargs
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, url: str) -> HostLimiter:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._limiters:
+                self._limiters[host] = HostLimiter(host, **self.limiter_kwargs)
+            return self._limiters[host]
+
+    def acquire(self, url: str, priority: int = PRIORITY_NORMAL) -> bool:
+        return self.limiter(url).acquire(priority)
+
+    async def acquire_async(self, url: str, priority: int = PRIORITY_NORMAL) -> bool:
+        return await self.limiter(url).acquire_async(priority)
+
+    def record(self, url: str, status: Optional[int], latency: float = None, retry_after=None) -> None:
+        if isinstance(retry_after, str):
+            retry_after = parse_retry_after(retry_after)
+        self.limiter(url).record(status, latency, retry_after)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    """Process-wide scheduler, so all scrapers in one process share each host's budget."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = RequestScheduler()
+        return _default
+
+
+def set_scheduler(scheduler: RequestScheduler) -> None:
+    global _default
+    with _default_lock:
+        _default = scheduler
@@ -0,0 +1,186 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Games before the 2015-16 season are not kept
+SEASON_START = datetime(2015, 10, 27)
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    kind: str = 'text'          # text | int | float | date
+    aliases: tuple = ()         # raw RealGM headers that mean this column
+    sql: str = None             # storage type when it differs from the in-memory kind
+
+    @property
+    def sql_type(self) -> str:
+        return self.sql or {'int': 'INTEGER', 'float': 'REAL'}.get(self.kind, 'TEXT')
+
+
+# gamelogs table, in column order
+GAMELOG_SCHEMA = [
+    Column('Player'),
+    Column('PlayerID', sql='INTEGER'),    # carried as text until written
+    Column('SummaryHref'),
+    Column('GameLogsURL', aliases=('GameLogsUrl',)),
+    Column('GameType'),
+    Column('Season'),
+    Column('Date', 'date'),
+    Column('Team'),
+    Column('Opponent'),
+    Column('WL', aliases=('W/L', 'W / L', 'W-L')),
+    Column('Status'),
+    Column('Pos'),
+    Column('MIN', aliases=('Min',)),
+    Column('PTS', 'int'),
+    Column('FGM', 'int'),
+    Column('FGA', 'int'),
+    Column('FGPercent', 'float', ('FG%',)),
+    Column('TPM', 'int', ('3PM',)),
+    Column('TPA', 'int', ('3PA',)),
+    Column('TPPercent', 'float', ('3P%',)),
+    Column('FTM', 'int'),
+    Column('FTA', 'int'),
+    Column('FTPercent', 'float', ('FT%',)),
+    Column('ORB', 'int'),
+    Column('DRB', 'int'),
+    Column('REB', 'int'),
+    Column('AST', 'int'),
+    Column('STL', 'int'),
+    Column('BLK', 'int'),
+    Column('TOV', 'int'),
+    Column('PF', 'int'),
+    Column('FIC', 'float'),
+    Column('TeamID', sql='INTEGER'),        # teams.py ids of Team and Opponent, resolved per batch
+    Column('OpponentID', sql='INTEGER'),
+    Column('RowHash', 'int'),   # written by storage.upsert_gamelogs, never scraped
+]
+
+GAMELOG_COLUMNS = [c.name for c in GAMELOG_SCHEMA]
+SQL_TYPES = {c.name: c.sql_type for c in GAMELOG_SCHEMA}
+RENAMES = {alias: c.name for c in GAMELOG_SCHEMA for alias in c.aliases}
+INT_COLUMNS = [c.name for c in GAMELOG_SCHEMA if c.kind == 'int']
+FLOAT_COLUMNS = [c.name for c in GAMELOG_SCHEMA if c.kind == 'float']
+
+# players table (the roster written by players.py), keyed by PlayerID
+PLAYER_SCHEMA = [
+    Column('PlayerID', 'int'),
+    Column('Player'),
+    Column('Pos'),
+    Column('Age', 'int'),
+    Column('CurrentTeam', aliases=('Current Team',)),
+    Column('YOS', 'int'),
+    Column('PlayerHref'),
+    Column('Active', 'int'),    # 0 once the player is no longer on the roster page
+    Column('UpdatedAt'),        # last time any roster value of the player changed
+]
+
+# Roster frame layout shared by players.py, stats.py and the app (and the optional players.xlsx)
+PLAYER_COLUMNS = ['Player', 'Pos', 'Age', 'Current Team', 'YOS', 'PlayerHref', 'PlayerID']
+PLAYER_RENAMES = {alias: c.name for c in PLAYER_SCHEMA for alias in c.aliases}
+
+# Box-score stats the app filters on, and the sums it offers as combo lines
+GAME_STATS = ['PTS', 'TPM', 'REB', 'AST', 'STL', 'BLK', 'TOV']
+COMBO_STATS = [('P|R|A', ['PTS', 'REB', 'AST']), ('P|A', ['PTS', 'AST']), ('P|R', ['PTS', 'REB'])]
+
+
+def clean_header(col):
+    if col is None:
+        return ''
+    s = str(col).strip()
+    if not s:
+        return ''
+    s = re.sub(r"\s+", '_', s)
+    s = re.sub(r'[^A-Za-z0-9_%]', '', s)
+    return s
+
+
+def normalize_header(col) -> str:
+    """Schema name for a raw header if it is a known alias, otherwise the cleaned header."""
+    raw = '' if col is None else str(col).strip()
+    return RENAMES.get(raw) or clean_header(raw)
+
+
+def season_labels(dates: pd.Series) -> pd.Series:
+    """'2015-16' style season for each date (seasons roll over in August), computed on whole arrays."""
+    years = dates.dt.year.to_numpy()
+    end = years + (dates.dt.month.to_numpy() >= 8)
+    labels = np.char.add(np.char.add((end - 1).astype(int).astype(str), '-'),
+                         np.char.zfill((end % 100).astype(int).astype(str), 2))
+    return pd.Series(labels, index=dates.index, dtype=object)
+
+
+def enrich_positions(df: pd.DataFrame, pos_lookup: tuple[dict, dict]) -> pd.DataFrame:
+    """Fill Pos from the roster ({PlayerID: Pos}, {Player: Pos}), falling back to the gamelog's own Pos."""
+    by_id, by_name = pos_lookup or ({}, {})
+    if not by_id and not by_name:
+        return df
+    pos = pd.Series(pd.NA, index=df.index, dtype=object)
+    if by_id and 'PlayerID' in df.columns:
+        df['PlayerID'] = df['PlayerID'].astype(str).str.strip()
+        pos = df['PlayerID'].map(by_id)
+    if by_name and 'Player' in df.columns:
+        pos = pos.fillna(df['Player'].map(by_name))
+    df['Pos'] = pos.fillna(df['Pos']) if 'Pos' in df.columns else pos
+    return df
+
+
+def normalize_gamelogs(df: pd.DataFrame, player: str = None, player_id: str = None, summary_href: str = None,
+                       gamelogs_url: str = None, pos_lookup: tuple[dict, dict] = None) -> pd.DataFrame:
+    """Single pass from parsed gamelog rows to gamelogs-table rows, driven by GAMELOG_SCHEMA.
+
+    Headers are renamed and cleaned, rows before SEASON_START dropped, Season derived,
+    Date rewritten as YYYY-MM-DD, identity columns added, numeric columns cast, and Pos
+    enriched when a lookup is given. Extra parsed columns (e.g. the *Href links) are kept
+    after the schema columns. The result is built as one frame instead of column by column.
+    """
+    df.attrs = {}
+    df.columns = [normalize_header(c) for c in df.columns]
+    date_col = next((c for c in df.columns if c.lower() == 'date'), df.columns[0])
+
+    dates = pd.to_datetime(df[date_col], errors='coerce', format='%m/%d/%Y')
+    keep = (dates >= SEASON_START).to_numpy()
+    if not keep.any():
+        return pd.DataFrame()
+    if not keep.all():
+        df = df.loc[keep]
+        dates = dates[keep]
+    n = len(df)
+
+    derived = {
+        'Player': player,
+        'PlayerID': player_id,
+        'SummaryHref': summary_href,
+        'GameLogsURL': gamelogs_url,
+        'Season': season_labels(dates).to_numpy(),
+        'Date': dates.dt.strftime('%Y-%m-%d').to_numpy(),
+    }
+    columns = {}
+    for col in GAMELOG_SCHEMA:
+        name = col.name
+        value = derived.get(name)
+        if value is None:
+            if name not in df.columns:
+                continue
+            value = df[name].to_numpy()
+        if col.kind == 'int':
+            value = pd.to_numeric(value, errors='coerce')
+            value = np.where(np.isnan(value), 0, value).astype(int)
+        elif col.kind == 'float':
+            value = pd.to_numeric(value, errors='coerce').astype(float)
+            value = np.where(np.isnan(value), 0.0, value)
+        elif np.isscalar(value):
+            value = np.full(n, value, dtype=object)
+        columns[name] = value
+    for name in df.columns:
+        if name not in columns:
+            columns[name] = df[name].to_numpy()
+
+    out = pd.DataFrame(columns)
+    if pos_lookup is not None:
+        out = enrich_positions(out, pos_lookup)
+    return out
@@ -1,3 +1,5 @@
+import asyncio
+import hashlib
 import os
 import re
 import sys
@@ -5,34 +7,47 @@ import time
 from datetime import datetime
 from urllib.parse import urljoin
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
 import pandas as pd
+from lxml import etree
 import requests
-import sqlite3
 from bs4 import BeautifulSoup
 from bisect import bisect_right
-from selenium import webdriver
+from functools import lru_cache
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from driver_pool import DriverPool
+from fetching import make_session, is_challenge_page, sync_session_from_driver
+from async_fetch import fetch_as_completed
+from html_cache import HtmlCache, DEFAULT_CACHE_DIR, fetch_cached
+from pipeline import run_pipeline
+from telemetry import Telemetry, DEFAULT_EVENTS_PATH, get_telemetry, set_telemetry
+from scheduler import PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW, RequestScheduler, get_scheduler, set_scheduler
+from manifest import RunManifest, DEFAULT_MANIFEST, last_finished_run
+from export import DEFAULT_EXPORT_DIR, export_gamelogs
+from players import DEFAULT_DIFF, load_roster_diff
+from refresh_planner import find_schedule, load_schedule, plan_refresh
+from recent_games import refresh_recent_games
+from schedule_context import refresh_schedule_context
+from schema import GAMELOG_COLUMNS, enrich_positions, normalize_gamelogs
+from storage import (connect, upsert_gamelogs, load_watermarks, record_checked_pages, maintain, load_rotation_players,
+                     shard_of, shard_db_path, merge_databases, load_page_hashes, record_page_hashes,
+                     load_players)
 
 
-def clean_header(col):
-    if col is None:
-        return ''
-    s = str(col).strip()
-    if not s:
-        return ''
-    s = re.sub(r"\s+", '_', s)
-    s = re.sub(r'[^A-Za-z0-9_%]', '', s)
-    return s
-
 # Base site URL for resolving relative player links
 BASE = 'https://basketball.realgm.com'
 
+GAME_TYPES = ['Regular Season', 'Playoffs', 'Play-In', 'Preseason']
+GAME_TYPE_SUFFIXES = {
+    'Regular Season': 'Reg',
+    'Playoffs': 'Playoffs',
+    'Play-In': 'Play-In',
+    'Preseason': 'Preseason',
+}
+
 def build_gamelogs_url(summary_url: str) -> str:
     if not summary_url:
         return ''
@@ -56,62 +71,208 @@ def build_gamelogs_url(summary_url: str) -> str:
 
     return gamelogs
 
-def fetch_html(url: str, headers=None, timeout=15) -> str:
+def fetch_html(url: str, headers=None, timeout=15, session: requests.Session = None,
+               cache: HtmlCache = None, priority: int = PRIORITY_NORMAL) -> str:
     headers = headers or {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
                       '(KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36'
     }
+    if session is not None:
+        # The session's HTTPAdapter already retries transient errors and keeps connections alive
+        try:
+            return fetch_cached(session, url, cache, timeout=timeout, priority=priority)
+        except Exception as e:
+            get_telemetry().error('fetch', url, e)
+            return ''
+
     tries = 3
     for attempt in range(1, tries + 1):
         try:
-            resp = requests.get(url, headers=headers, timeout=timeout)
-            if resp.status_code == 200:
-                return resp.text
-        except Exception:
-            pass
-        time.sleep(1)
+            html = fetch_cached(requests, url, cache, timeout=timeout, headers=headers, priority=priority)
+            if html or (cache is not None and cache.offline):
+                return html
+        except Exception as e:
+            get_telemetry().error('fetch', url, e, retries=attempt - 1)
     return ''
 
-def fetch_htmls_selenium(urls: list[str], timeout: int = 30) -> list[str]:
-    chrome_options = Options()
-    chrome_options.add_argument("--incognito")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    )
+def _load_page(driver, url: str, priority: int = PRIORITY_NORMAL, retries: int = 0) -> str:
+    scheduler = get_scheduler()
+    telemetry = get_telemetry()
+    queued = time.perf_counter()
+    if not scheduler.acquire(url, priority):
+        telemetry.error('fetch', url, fetcher='browser', error='circuit open', queue_s=time.perf_counter() - queued)
+        return ''
+    start = time.perf_counter()
+    try:
+        driver.get(url)
+        try:
+            wait = WebDriverWait(driver, 5)
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr")))
+        except TimeoutException:
+            pass
+        html = driver.page_source
+    except Exception as e:
+        scheduler.record(url, None, time.perf_counter() - start)
+        telemetry.error('fetch', url, e, fetcher='browser', queue_s=start - queued,
+                        fetch_s=time.perf_counter() - start, retries=retries)
+        raise
+    # The browser hides status codes; a challenge page is the site pushing back
+    challenged = is_challenge_page(html)
+    latency = time.perf_counter() - start
+    scheduler.record(url, 429 if challenged else 200, latency)
+    telemetry.event('fetch', url=url, fetcher='browser', queue_s=start - queued, fetch_s=latency,
+                    bytes=len(html), retries=retries, error='challenge page' if challenged else None)
+    return html
 
-    driver = None
+def fetch_htmls_selenium(urls: list[str], timeout: int = 30, pool: DriverPool = None,
+                         session: requests.Session = None, cache: HtmlCache = None,
+                         priorities: list[int] = None) -> list[str]:
+    # Without a shared pool, fall back to a throwaway single-driver pool for this call
+    own_pool = pool is None
+    if own_pool:
+        pool = DriverPool(size=1, timeout=timeout)
+
+    telemetry = get_telemetry()
     results = []
+    driver = None
     try:
-        driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=chrome_options)
-        driver.set_page_load_timeout(timeout)
-        driver.implicitly_wait(2)
+        for i, url in enumerate(urls):
+            entry = cache.get(url) if cache is not None else None
+            if entry is not None and entry.fresh:
+                telemetry.event('fetch', url=url, fetcher='cache', bytes=len(entry.html))
+                results.append(entry.html)
+                continue
+            if cache is not None and cache.offline:
+                results.append('')
+                continue
 
-        for url in urls:
-            try:
-                driver.get(url)
+            html = ''
+            for attempt in range(2):
                 try:
-                    wait = WebDriverWait(driver, 5)
-                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr")))
-                except TimeoutException:
-                    pass
-                results.append(driver.page_source)
-            except Exception:
-                results.append('')
-            time.sleep(0.5)
-    except WebDriverException:
-        results = [''] * len(urls)
+                    if driver is None:
+                        driver = pool.acquire()
+                    html = _load_page(driver, url, priorities[i] if priorities else PRIORITY_NORMAL, retries=attempt)
+                    pool.record_page(driver)
+                    if html and not is_challenge_page(html):
+                        if cache is not None:
+                            cache.put(url, html)
+                        if session is not None:
+                            sync_session_from_driver(session, driver)
+                            session = None
+                    break
+                except WebDriverException as e:
+                    # Browser crashed or hung: drop it and retry once on a fresh one
+                    if driver is None:
+                        telemetry.error('fetch', url, e, fetcher='browser', retries=attempt)
+                    pool.release(driver, broken=True)
+                    driver = None
+                except Exception as e:
+                    # Failures inside _load_page are already recorded; this catches the pool failing to start a browser
+                    if driver is None:
+                        telemetry.error('fetch', url, e, fetcher='browser', retries=attempt)
+                    break
+            results.append(html)
+    except Exception as e:
+        telemetry.error('fetch', None, e, fetcher='browser')
+        results.extend([''] * (len(urls) - len(results)))
     finally:
-        try:
-            if driver:
-                driver.quit()
-        except Exception:
-            pass
+        pool.release(driver)
+        if own_pool:
+            pool.close()
     return results
 
+# Text nodes as BeautifulSoup's get_text() sees them (comments, scripts and styles excluded)
+_TEXT_NODES = etree.XPath('.//text()[not(parent::script) and not(parent::style)]')
+_FIXED_TABLE = etree.XPath("(//div[contains(concat(' ', normalize-space(@class), ' '), ' fixed-table-body ')]//table)[1]")
+_TOGGLE_TABLE = etree.XPath("(//table[@data-toggle='table'])[1]")
+
+_HTML_PARSER = etree.HTMLParser(encoding='utf-8')
+
+@lru_cache(maxsize=4096)
+def _absolute_href(href: str) -> str:
+    return urljoin(BASE, href) if href.startswith('/') else href
+
+def _node_text(el) -> str:
+    if len(el) == 0:
+        return (el.text or '').strip()
+    return ''.join(t.strip() for t in _TEXT_NODES(el))
+
 def parse_gamelogs_table(html: str) -> pd.DataFrame:
+    try:
+        return parse_gamelogs_table_fast(html)
+    except Exception:
+        return parse_gamelogs_table_soup(html)
+
+def parse_gamelogs_table_fast(html: str) -> pd.DataFrame:
+    """lxml version of parse_gamelogs_table_soup that fills one list per column instead of a dict per row."""
+    if not html or not html.strip():
+        return pd.DataFrame()
+    root = etree.fromstring(html.encode('utf-8'), _HTML_PARSER)
+    if root is None:
+        return pd.DataFrame()
+
+    found = _FIXED_TABLE(root) or _TOGGLE_TABLE(root)
+    if found:
+        table = found[0]
+    else:
+        tables = list(root.iter('table'))
+        if not tables:
+            return pd.DataFrame()
+        table = max(tables, key=lambda t: sum(1 for _ in t.iter('tr')))
+
+    thead = next(table.iter('thead'), None)
+    headers = [_node_text(th) for th in thead.iter('th')] if thead is not None else []
+    if not headers:
+        tr0 = next(table.iter('tr'), None)
+        cols = sum(1 for _ in tr0.iter('td', 'th')) if tr0 is not None else 0
+        headers = [f'col_{i}' for i in range(cols)]
+
+    tbody = next(table.iter('tbody'), None)
+    if tbody is None:
+        return pd.DataFrame()
+
+    n_headers = len(headers)
+    href_keys = [f'{h}Href' for h in headers]
+    columns = {}
+    n = 0
+
+    def put(key, value):
+        col = columns.get(key)
+        if col is None:
+            col = columns[key] = [np.nan] * n
+        if len(col) > n:
+            # Repeated header in the same row: the later cell wins, as with a dict
+            col[n] = value
+        else:
+            col.append(value)
+
+    for tr in tbody.iter('tr'):
+        cells = list(tr.iter('td'))
+        if not cells:
+            continue
+        for i, td in enumerate(cells):
+            if i < n_headers:
+                key, href_key = headers[i], href_keys[i]
+            else:
+                key = f'col_{i}'
+                href_key = f'{key}Href'
+            a = next(td.iter('a'), None)
+            href = a.get('href') if a is not None else None
+            if href:
+                put(key, _node_text(a))
+                put(href_key, _absolute_href(href))
+            else:
+                put(key, _node_text(td))
+        n += 1
+        for col in columns.values():
+            if len(col) < n:
+                col.append(np.nan)
+
+    if n == 0:
+        return pd.DataFrame()
+    return pd.DataFrame(columns)
+
+def parse_gamelogs_table_soup(html: str) -> pd.DataFrame:
     soup = BeautifulSoup(html, 'lxml')
 
     table = soup.select_one('div.fixed-table-body table')
@@ -167,23 +328,205 @@ def parse_gamelogs_table(html: str) -> pd.DataFrame:
     df = pd.DataFrame(rows)
     return df
 
-def process_player(player_name: str, summary_href: str, out_dir: str) -> pd.DataFrame:
+def page_hash(html: str) -> str:
+    """Hash of the gamelog table markup, so ads and tokens elsewhere on the page do not count as changes."""
+    start = min((i for i in (html.find(m) for m in GAMELOG_TABLE_MARKERS) if i >= 0), default=0)
+    end = html.find('</table>', start)
+    return hashlib.blake2b(html[start:end if end >= 0 else None].encode('utf-8'), digest_size=16).hexdigest()
+
+def parse_page(html: str, known_hash: str = None) -> pd.DataFrame:
+    """parse_gamelogs_table plus bookkeeping in `attrs`: parse time and page hash, or why the page has no rows.
+
+    A page whose hash equals `known_hash` (its rows are already stored) is not parsed and
+    comes back empty with `attrs['unchanged']` set.
+    """
+    if not html:
+        df = pd.DataFrame()
+        df.attrs['error'] = 'fetch failed'
+        return df
+    if is_challenge_page(html):
+        df = pd.DataFrame()
+        df.attrs['error'] = 'challenge page'
+        return df
+    digest = page_hash(html)
+    if known_hash is not None and digest == known_hash:
+        df = pd.DataFrame()
+        df.attrs.update(page_hash=digest, unchanged=True)
+        return df
+    start = time.perf_counter()
+    df = parse_gamelogs_table(html)
+    df.attrs.update(parse_s=time.perf_counter() - start, page_hash=digest)
+    return df
+
+def _record_fetch(manifest, url: str, html: str, seconds: float = None) -> None:
+    if manifest is None:
+        return
+    if html:
+        manifest.record(url, 'fetched', bytes=len(html), fetch_s=seconds)
+    else:
+        manifest.record(url, 'failed', error='fetch failed', fetch_s=seconds)
+
+# Months in which games of each type can be played; used to skip pages that cannot have changed
+GAME_TYPE_MONTHS = {
+    'Regular Season': {10, 11, 12, 1, 2, 3, 4},
+    'Playoffs': {4, 5, 6},
+    'Play-In': {4},
+    'Preseason': {9, 10},
+}
+
+# Markup around the gamelog table, as located by parse_gamelogs_table
+GAMELOG_TABLE_MARKERS = ('fixed-table-body', 'data-toggle="table"')
+
+def _has_gamelog_table(html: str) -> bool:
+    # Cheap stand-in for a full parse when deciding whether the browser fallback is needed
+    return any(m in html for m in GAMELOG_TABLE_MARKERS)
+
+def needs_browser(html: str) -> bool:
+    """True when a plain HTTP response cannot be used: nothing came back, a challenge, or no gamelog table.
+
+    A real gamelog page without rows (no Playoff or Play-In games) is a valid answer and
+    does not go through the browser. Shared by the threads, async and pipeline engines.
+    """
+    return not html or is_challenge_page(html) or not _has_gamelog_table(html)
+
+def fetch_gamelog_htmls(urls: list[str], session: requests.Session = None, pool: DriverPool = None,
+                        fetch_mode: str = 'http', cache: HtmlCache = None, manifest=None,
+                        priorities: list[int] = None) -> list[str]:
+    priorities = priorities or [PRIORITY_NORMAL] * len(urls)
+    htmls = ['' for _ in urls]
+    pending = list(range(len(urls)))
+
+    if fetch_mode == 'http' and session is not None:
+        pending = []
+        for i, url in enumerate(urls):
+            start = time.perf_counter()
+            html = fetch_html(url, session=session, cache=cache, priority=priorities[i])
+            if needs_browser(html):
+                pending.append(i)
+                continue
+            _record_fetch(manifest, url, html, time.perf_counter() - start)
+            htmls[i] = html
+
+    # Only pages the plain HTTP path could not read go through the browser
+    if pending:
+        start = time.perf_counter()
+        browser_htmls = fetch_htmls_selenium([urls[i] for i in pending], pool=pool, session=session, cache=cache,
+                                             priorities=[priorities[i] for i in pending])
+        per_page = (time.perf_counter() - start) / len(pending)
+        for i, html in zip(pending, browser_htmls):
+            _record_fetch(manifest, urls[i], html, per_page)
+            htmls[i] = html
+    return htmls
+
+def fetch_gamelog_frames(urls: list[str], session: requests.Session = None, pool: DriverPool = None,
+                         fetch_mode: str = 'http', cache: HtmlCache = None, manifest=None,
+                         priorities: list[int] = None, page_hashes: dict = None) -> list[pd.DataFrame]:
+    page_hashes = page_hashes or {}
+    htmls = fetch_gamelog_htmls(urls, session=session, pool=pool, fetch_mode=fetch_mode, cache=cache,
+                                manifest=manifest, priorities=priorities)
+    return [parse_page(html, page_hashes.get(url)) for url, html in zip(urls, htmls)]
+
+def parse_player_pages(payload: tuple):
+    """Pipeline parse stage: turn one player's raw pages into the normalized frame (runs in a worker process)."""
+    player_name, summary_href, gamelogs_url, game_types, htmls, known_hashes = payload
+    frames = [parse_page(html, known) for html, known in zip(htmls, known_hashes)]
+    return build_player_frame(player_name, summary_href, gamelogs_url, game_types, frames)
+
+def player_id_from_href(href: str):
+    m = re.search(r"/Summary/(\d+)", href or '')
+    return int(m.group(1)) if m else None
+
+def plan_incremental_pages(player_ids: list, watermarks: dict, checked: dict = None,
+                           today: datetime = None) -> dict:
+    """Map PlayerID -> game types whose pages can hold games played since they were last stored or checked."""
+    today = today or datetime.now()
+    checked = checked or {}
+    latest_by_player = {}
+    for (pid, _), d in watermarks.items():
+        latest_by_player[pid] = max(d, latest_by_player.get(pid, ''))
+
+    plan = {}
+    for pid in player_ids:
+        if pid not in latest_by_player:
+            # Never stored before: needs the full history
+            plan[pid] = list(GAME_TYPES)
+            continue
+        types = []
+        for gt in GAME_TYPES:
+            since_str = max(watermarks.get((pid, gt), latest_by_player[pid]), (checked.get((pid, gt)) or '')[:10])
+            since = datetime.strptime(since_str, '%Y-%m-%d')
+            months = set()
+            cursor = datetime(since.year, since.month, 1)
+            while cursor <= today and len(months) < 12:
+                months.add(cursor.month)
+                cursor = datetime(cursor.year + (cursor.month == 12), cursor.month % 12 + 1, 1)
+            if months & GAME_TYPE_MONTHS[gt]:
+                types.append(gt)
+        plan[pid] = types
+    return plan
+
+def drop_rows_before_watermarks(df: pd.DataFrame, watermarks: dict) -> pd.DataFrame:
+    if df.empty or not watermarks:
+        return df
+    keys = list(zip(pd.to_numeric(df['PlayerID'], errors='coerce'), df['GameType']))
+    marks = pd.Series([watermarks.get((int(p), gt), '') if pd.notna(p) else '' for p, gt in keys], index=df.index)
+    # The watermark day itself is kept: a box-score correction to the latest stored game must still be
+    # written, and the RowHash upsert leaves it alone when nothing changed
+    return df[df['Date'].astype(str) >= marks].copy()
+
+def page_priority(game_type: str, rotation: bool = False, today: datetime = None) -> int:
+    # Rotation players' pages for game types being played right now go first, bench players' off-season pages last
+    in_season = (today or datetime.now()).month in GAME_TYPE_MONTHS[game_type]
+    if rotation and in_season:
+        return PRIORITY_HIGH
+    return PRIORITY_NORMAL if rotation or in_season else PRIORITY_LOW
+
+def gamelog_page_urls(gamelogs_url: str, game_types: list[str] = None) -> list[str]:
+    game_types = GAME_TYPES if game_types is None else game_types
+    return [f"{gamelogs_url}/{GAME_TYPE_SUFFIXES[gt]}" for gt in game_types]
+
+def process_player(player_name: str, summary_href: str, out_dir: str, pool: DriverPool = None,
+                   session: requests.Session = None, fetch_mode: str = 'http',
+                   game_types: list[str] = None, cache: HtmlCache = None, manifest=None,
+                   rotation: bool = False, page_hashes: dict = None) -> pd.DataFrame:
     gamelogs_url = build_gamelogs_url(summary_href)
     if not gamelogs_url:
         return pd.DataFrame()
     
-    suffixes = ['Reg', 'Playoffs', 'Play-In', 'Preseason']
-    game_types = ['Regular Season', 'Playoffs', 'Play-In', 'Preseason']
-    urls = [f"{gamelogs_url}/{s}" for s in suffixes]
-    
-    htmls = fetch_htmls_selenium(urls)
-    
+    game_types = GAME_TYPES if game_types is None else game_types
+    if not game_types:
+        return pd.DataFrame()
+    urls = gamelog_page_urls(gamelogs_url, game_types)
+    frames = fetch_gamelog_frames(urls, session=session, pool=pool, fetch_mode=fetch_mode, cache=cache,
+                                  manifest=manifest, priorities=[page_priority(gt, rotation) for gt in game_types],
+                                  page_hashes=page_hashes)
+    return build_player_frame(player_name, summary_href, gamelogs_url, game_types, frames)
+
+def build_player_frame(player_name: str, summary_href: str, gamelogs_url: str,
+                       game_types: list[str], frames: list[pd.DataFrame]) -> pd.DataFrame:
+    # Per-page outcome travels with the frame (also across the pipeline's process boundary) for the run manifest
+    pages = {}
+    for url, gt, df_parsed in zip(gamelog_page_urls(gamelogs_url, game_types), game_types, frames):
+        attrs = df_parsed.attrs if df_parsed is not None else {'error': 'fetch failed'}
+        rows = 0 if df_parsed is None else len(df_parsed)
+        if attrs.get('error'):
+            stage = 'failed'
+        elif attrs.get('unchanged'):
+            stage = 'unchanged'
+        else:
+            stage = 'parsed' if rows else 'empty'
+        pages[url] = {'game_type': gt, 'stage': stage, 'rows': rows, 'parse_s': attrs.get('parse_s'),
+                      'error': attrs.get('error'), 'page_hash': attrs.get('page_hash')}
+
+    df = _build_player_frame(player_name, summary_href, gamelogs_url, game_types, frames)
+    df.attrs = {'summary_href': summary_href, 'pages': pages}
+    return df
+
+def _build_player_frame(player_name: str, summary_href: str, gamelogs_url: str,
+                        game_types: list[str], frames: list[pd.DataFrame]) -> pd.DataFrame:
     dfs = []
-    for gt, html in zip(game_types, htmls):
-        if not html:
-            continue
-        df_parsed = parse_gamelogs_table(html)
-        if df_parsed.empty:
+    for gt, df_parsed in zip(game_types, frames):
+        if df_parsed is None or df_parsed.empty:
             continue
         df_parsed['GameType'] = gt
         dfs.append(df_parsed)
@@ -192,75 +535,264 @@ def process_player(player_name: str, summary_href: str, out_dir: str) -> pd.Data
         return pd.DataFrame()
         
     df = pd.concat(dfs, ignore_index=True)
-    
-    date_col = None
-    for c in df.columns:
-        if str(c).strip().lower() == 'date':
-            date_col = c
-            break
-    if date_col is None:
-        date_col = df.columns[0]
-
-    parsed_dates = pd.to_datetime(df[date_col], errors='coerce', format='%m/%d/%Y')
-    df['Date_Parsed'] = parsed_dates
-    
-    # Keep only dates after the 2015-16 season starts (2015-10-27)
-    df = df[df['Date_Parsed'] >= datetime(2015, 10, 27)].copy()
-    if df.empty:
-        return pd.DataFrame()
-        
-    def calc_season(d):
-        if pd.isna(d):
-            return None
-        season_end = d.year + 1 if d.month >= 8 else d.year
-        return f"{season_end-1}-{str(season_end)[-2:]}"
-        
-    df['Season'] = df['Date_Parsed'].apply(calc_season)
-    df.drop(columns=['Date_Parsed'], inplace=True, errors='ignore')
-
-    df.insert(0, 'Player', player_name)
     m = re.search(r"/Summary/(\d+)", summary_href)
     pid = m.group(1) if m else ''
-    df.insert(1, 'PlayerID', pid)
-    df.insert(2, 'SummaryHref', summary_href)
-    df.insert(3, 'GameLogsURL', gamelogs_url)
-    
-    rename_map = {
-        'W/L': 'WL',
-        'W / L': 'WL',
-        'W-L': 'WL',
-        'FG%': 'FGPercent',
-        '3PM': 'TPM',
-        '3PA': 'TPA',
-        '3P%': 'TPPercent',
-        'FT%': 'FTPercent',
-        'Min': 'MIN',
-        'MIN': 'MIN',
-        'GameLogsUrl': 'GameLogsURL',
-    }
-    df = df.rename(columns=rename_map)
+    return normalize_gamelogs(df, player_name, pid, summary_href, gamelogs_url)
 
-    int_cols = ['PTS', 'FGM', 'FGA', 'TPM', 'TPA', 'FTM', 'FTA', 'ORB', 'DRB', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PF']
-    for c in int_cols:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0).astype(int)
-            
-    float_cols = ['FGPercent', 'TPPercent', 'FTPercent', 'FIC']
-    for c in float_cols:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors='coerce').fillna(0.0).astype(float)
+async def _gather_players_async(player_args: list[tuple], concurrency: int, per_host: int,
+                                pool: DriverPool = None, session: requests.Session = None,
+                                page_plan: dict = None, cache: HtmlCache = None,
+                                on_frame=None, manifest=None, rotation: set = None,
+                                page_hashes: dict = None, fetch_mode: str = 'http') -> list[pd.DataFrame]:
+    loop = asyncio.get_running_loop()
+    page_hashes = page_hashes or {}
+    rotation = rotation or set()
+    jobs = {}
+    priorities = {}
+    for name, href, _ in player_args:
+        gamelogs_url = build_gamelogs_url(href)
+        game_types = page_plan.get(href, GAME_TYPES) if page_plan else GAME_TYPES
+        if not gamelogs_url or not game_types:
+            continue
+        state = {'player': name, 'href': href, 'gamelogs_url': gamelogs_url, 'game_types': game_types,
+                 'frames': [parse_page('') for _ in game_types], 'left': len(game_types)}
+        in_rotation = player_id_from_href(href) in rotation
+        for slot, (gt, url) in enumerate(zip(game_types, gamelog_page_urls(gamelogs_url, game_types))):
+            jobs[url] = (state, slot)
+            priorities[url] = page_priority(gt, in_rotation)
 
-    return df
+    results = []
+    fallback = []
+    # One writer thread: batches are upserted in arrival order while the loop keeps fetching
+    writer = ThreadPoolExecutor(max_workers=1) if on_frame is not None else None
+    writes = []
+
+    def finish(state, slot, df_parsed):
+        state['frames'][slot] = df_parsed
+        state['left'] -= 1
+        if state['left'] == 0:
+            df = build_player_frame(state['player'], state['href'], state['gamelogs_url'], state['game_types'], state['frames'])
+            if writer is not None:
+                writes.append(loop.run_in_executor(writer, on_frame, df))
+            elif not df.empty:
+                results.append(df)
+
+    headers = dict(session.headers) if session is not None else None
+    cookies = session.cookies.get_dict() if session is not None else None
+    # browser mode: every page goes through the driver pool, as in the other engines
+    http_urls = list(jobs) if fetch_mode == 'http' else []
+    fallback.extend(url for url in jobs if url not in http_urls)
+
+    # Pages plain HTTP could not read go through the driver pool, bounded by its size
+    async def browser_fetch(url):
+        start = time.perf_counter()
+        htmls = await loop.run_in_executor(None, fetch_htmls_selenium, [url], 30, pool, session, cache,
+                                           [priorities[url]])
+        _record_fetch(manifest, url, htmls[0], time.perf_counter() - start)
+        df_parsed = parse_page(htmls[0], page_hashes.get(url))
+        state, slot = jobs[url]
+        finish(state, slot, df_parsed)
+
+    try:
+        async for url, html in fetch_as_completed(http_urls, concurrency=concurrency, per_host=per_host,
+                                                  headers=headers, cookies=cookies, cache=cache,
+                                                  priorities=priorities):
+            state, slot = jobs[url]
+            if needs_browser(html):
+                fallback.append(url)
+                continue
+            # Parse off the event loop so the sockets keep being serviced
+            df_parsed = await loop.run_in_executor(None, parse_page, html, page_hashes.get(url))
+            _record_fetch(manifest, url, html)
+            finish(state, slot, df_parsed)
+
+        if fallback:
+            await asyncio.gather(*(browser_fetch(url) for url in fallback))
+    finally:
+        if writer is not None:
+            # Surface write errors here, after every queued frame had its turn
+            await asyncio.gather(*writes)
+            writer.shutdown()
+    return results
+
+def run_async_engine(player_args: list[tuple], concurrency: int = 100, per_host: int = 16,
+                     pool: DriverPool = None, session: requests.Session = None,
+                     page_plan: dict = None, cache: HtmlCache = None, on_frame=None,
+                     manifest=None, rotation: set = None, page_hashes: dict = None,
+                     fetch_mode: str = 'http') -> list[pd.DataFrame]:
+    return asyncio.run(_gather_players_async(player_args, concurrency, per_host, pool=pool, session=session,
+                                             page_plan=page_plan, cache=cache, on_frame=on_frame,
+                                             manifest=manifest, rotation=rotation, page_hashes=page_hashes,
+                                             fetch_mode=fetch_mode))
+
+def build_pos_lookup(players_df: pd.DataFrame) -> tuple[dict, dict]:
+    """Prebuilt ({PlayerID: Pos}, {Player: Pos}) maps from the roster, applied to every batch.
+
+    Gamelogs are matched on PlayerID; names are only used for a roster without ids
+    (an old players.xlsx), since two players can share a name.
+    """
+    if players_df is None or 'Pos' not in players_df.columns:
+        return {}, {}
+    if 'PlayerID' in players_df.columns:
+        ids = players_df['PlayerID']
+    elif 'PlayerHref' in players_df.columns:
+        ids = players_df['PlayerHref'].astype(str).str.extract(r'/Summary/(\d+)', expand=False)
+    else:
+        ids = None
+    if ids is not None:
+        ids = ids.astype(str).str.strip().str.replace(r'\.0$', '', regex=True)
+        lookup = pd.DataFrame({'PlayerID': ids, 'Pos': players_df['Pos']})
+        lookup = lookup[lookup['PlayerID'].notna() & ~lookup['PlayerID'].isin(['', 'nan'])]
+        lookup = lookup.drop_duplicates(subset=['PlayerID']).dropna(subset=['Pos'])
+        return dict(zip(lookup['PlayerID'], lookup['Pos'])), {}
+    by_name = {}
+    if 'Player' in players_df.columns:
+        lookup = players_df[['Player', 'Pos']].dropna(subset=['Player']).drop_duplicates(subset=['Player'])
+        lookup = lookup.dropna(subset=['Pos'])
+        by_name = dict(zip(lookup['Player'], lookup['Pos']))
+    return {}, by_name
+
+def prepare_gamelogs_batch(df: pd.DataFrame, pos_lookup: tuple[dict, dict]) -> pd.DataFrame:
+    # Frames arrive already normalized by build_player_frame; only cross-player work is left.
+    # Rows that agree on every stored column write the same record, so the rest need not be compared.
+    df = df.drop_duplicates(subset=[c for c in GAMELOG_COLUMNS if c in df.columns]).reset_index(drop=True)
+    return enrich_positions(df, pos_lookup)
+
+class GamelogWriter:
+    """Sink for per-player frames that writes them to gamelogs.db.
+
+    With `batch_size` set, every `batch_size` players are normalized and upserted as soon
+    as they arrive, so memory stays flat and a crash keeps what was already written.
+    Without it, everything is held until `close()`, like a single end-of-run write.
+    Page hashes are stored with the rows they produced, so the next run can skip those pages.
+    """
+
+    def __init__(self, db_path: str, players_df: pd.DataFrame = None, batch_size: int = None,
+                 incremental: bool = False, watermarks: dict = None, manifest=None):
+        self.db_path = db_path
+        self.manifest = manifest
+        self.pos_lookup = build_pos_lookup(players_df)
+        self.batch_size = batch_size
+        self.incremental = incremental
+        self.watermarks = watermarks or {}
+        self.player_ids = set()
+        # (PlayerID, GameType) of every page read this run, rows or not
+        self.checked_pages = set()
+        self.row_counts = {'new': 0, 'changed': 0, 'unchanged': 0}
+        self.pages_unchanged = 0
+        self._pending = []
+        self._hashes = []
+
+    def add(self, df: pd.DataFrame) -> None:
+        if df is None:
+            return
+        self._record_pages(df)
+        pages = df.attrs.get('pages', {})
+        # Empty and unchanged pages were read too; without this their CheckedAt would never move
+        player_id = player_id_from_href(df.attrs.get('summary_href', ''))
+        if player_id is not None:
+            self.checked_pages.update((player_id, page['game_type']) for page in pages.values()
+                                      if page['stage'] != 'failed')
+        self.pages_unchanged += sum(page['stage'] == 'unchanged' for page in pages.values())
+        self._hashes.extend((url, page['page_hash'], page['rows']) for url, page in pages.items()
+                            if page['stage'] in ('parsed', 'empty') and page.get('page_hash'))
+        if df.empty:
+            return
+        self.player_ids.add(player_id_from_href(df.attrs.get('summary_href') or df['SummaryHref'].iloc[0]))
+        self._pending.append(df)
+        if self.batch_size and len(self._pending) >= self.batch_size:
+            self.flush()
 
-def main(players_excel: str = None):
-    players_excel = players_excel or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'players.xlsx')
+    def flush(self) -> None:
+        if not self._pending and not self._hashes:
+            return
+        frames, self._pending = self._pending, []
+        hashes, self._hashes = self._hashes, []
+        start = time.perf_counter()
+        try:
+            batch = prepare_gamelogs_batch(pd.concat(frames, ignore_index=True), self.pos_lookup) if frames else pd.DataFrame()
+            if self.incremental:
+                batch = drop_rows_before_watermarks(batch, self.watermarks)
+            conn = connect(self.db_path)
+            try:
+                if not batch.empty:
+                    for key, n in zip(('new', 'changed', 'unchanged'), upsert_gamelogs(conn, batch)):
+                        self.row_counts[key] += n
+                # Only after the rows are in, or a failed write would be skipped as unchanged next time
+                record_page_hashes(conn, hashes)
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"Error writing to database: {e}")
+            self._record_written(frames, error=str(e))
+            return
+        self._record_written(frames, write_s=time.perf_counter() - start)
+
+    def _record_pages(self, df: pd.DataFrame) -> None:
+        telemetry = get_telemetry()
+        player_id = player_id_from_href(df.attrs.get('summary_href', ''))
+        for url, page in df.attrs.get('pages', {}).items():
+            # Pages that never got parsed were already reported by the fetch stage
+            if page['parse_s'] is not None:
+                telemetry.event('parse', url=url, game_type=page['game_type'], rows=page['rows'],
+                                parse_s=page['parse_s'])
+            if self.manifest is not None:
+                self.manifest.record(url, page['stage'], player_id=player_id, game_type=page['game_type'],
+                                     error=page['error'], rows=page['rows'], parse_s=page['parse_s'])
+
+    def _record_written(self, frames: list[pd.DataFrame], write_s: float = None, error: str = None) -> None:
+        telemetry = get_telemetry()
+        pages = [(url, page['rows']) for df in frames for url, page in df.attrs.get('pages', {}).items()
+                 if page['stage'] == 'parsed']
+        for url, rows in pages:
+            if error:
+                telemetry.error('write', url, error=error)
+            else:
+                telemetry.event('write', url=url, rows=rows, write_s=write_s / len(pages))
+            if self.manifest is None:
+                continue
+            if error:
+                self.manifest.record(url, 'failed', error=error)
+            else:
+                self.manifest.record(url, 'written', write_s=write_s / len(pages))
+
+    def close(self) -> None:
+        self.flush()
+        counts = self.row_counts
+        if sum(counts.values()) or self.pages_unchanged:
+            print(f"Game logs: {counts['new']} new, {counts['changed']} changed, {counts['unchanged']} untouched; "
+                  f"{self.pages_unchanged} unchanged pages skipped.")
+        elif self.incremental and self.player_ids:
+            print("No new game logs past the stored high-water marks.")
+
+
+def load_roster(db_path: str, players_excel: str = None) -> pd.DataFrame:
+    """Players to scrape: an explicitly given xlsx, else the players table of gamelogs.db.
+
+    players.xlsx next to the database is only read while the table does not exist yet.
+    """
+    if not players_excel:
+        players_df = load_players(db_path)
+        if not players_df.empty:
+            return players_df
+        players_excel = os.path.join(os.path.dirname(os.path.abspath(db_path)), 'players.xlsx')
     if not os.path.exists(players_excel):
-        return
+        return pd.DataFrame()
+    return pd.read_excel(players_excel)
 
+def main(players_excel: str = None, workers: int = 4, drivers: int = 2, recycle_after: int = 200,
+         fetch_mode: str = 'http', engine: str = 'threads', concurrency: int = 100, per_host: int = 16,
+         incremental: bool = False, cache: HtmlCache = None, parse_workers: int = None, queue_size: int = 32,
+         stream: bool = False, batch_size: int = 20, manifest: RunManifest = None,
+         only_played: bool = False, schedule_path: str = None, since: datetime = None,
+         shard: tuple[int, int] = None, force_parse: bool = False, export_dir: str = None,
+         roster_changes: str = None):
     out_dir = os.path.dirname(os.path.abspath(__file__))
+    db_path = os.path.join(out_dir, 'gamelogs.db')
 
-    players_df = pd.read_excel(players_excel)
-    if 'PlayerHref' not in players_df.columns and 'Player' not in players_df.columns:
+    players_df = load_roster(db_path, players_excel)
+    if players_df.empty or ('PlayerHref' not in players_df.columns and 'Player' not in players_df.columns):
+        print("No players to scrape: run players.py first (or pass --players PATH.xlsx).")
         return
 
     def player_row_to_args(row, idx):
@@ -275,164 +807,223 @@ def main(players_excel: str = None):
     
     player_args = [player_row_to_args(row, idx) for idx, row in players_df.iterrows()]
     player_args = [a for a in player_args if a is not None]
-    
-    all_frames = []
-    # Reduce workers to avoid spawning too many browser instances
-    max_workers = min(2, len(player_args))
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [executor.submit(process_player, *args) for args in player_args]
-        for future in as_completed(futures):
-            try:
-                df = future.result()
-                if not df.empty:
-                    all_frames.append(df)
-            except Exception:
-                pass
-
-    if not all_frames:
-        return
+    if roster_changes:
+        # Players the last players.py run found added, traded or repositioned, scraped without a full refresh
+        changed_ids = set(load_roster_diff(roster_changes)['PlayerID'].astype(str))
+        player_args = [a for a in player_args if str(player_id_from_href(a[1])) in changed_ids]
+        print(f"Roster changes: {len(player_args)} players to scrape.")
+    write_path = db_path
+    if shard is not None:
+        # Planning still reads the merged gamelogs.db; this worker's rows go to its own database
+        index, count = shard
+        player_args = [a for a in player_args if shard_of(player_id_from_href(a[1]) or a[1], count) == index - 1]
+        write_path = shard_db_path(db_path, index, count)
+        print(f"Shard {index}/{count}: {len(player_args)} players, writing to {os.path.basename(write_path)}")
+    if manifest is not None and manifest.resumed:
+        done = manifest.completed_players()
+        skipped = len(player_args)
+        player_args = [a for a in player_args if player_id_from_href(a[1]) not in done]
+        print(f"Resuming run {manifest.run_id}: skipping {skipped - len(player_args)} completed players.")
 
-    combined_new = pd.concat(all_frames, ignore_index=True)
-    merged = combined_new
+    run_started = datetime.now().isoformat(timespec='seconds')
+    if only_played:
+        schedule_path = schedule_path or find_schedule(out_dir)
+        since = since or last_finished_run(manifest.path if manifest is not None else DEFAULT_MANIFEST)
+        if not schedule_path or since is None:
+            print("Schedule-aware refresh needs a schedule and a previous finished run; refreshing all players.")
+        else:
+            hrefs, played = plan_refresh(players_df, load_schedule(schedule_path), since, db_path)
+            player_args = [a for a in player_args if a[1] in hrefs]
+            print(f"Schedule-aware refresh: {len(played)} teams played since {since:%Y-%m-%d %H:%M}, "
+                  f"{len(player_args)} players to refresh.")
+    # Players getting minutes right now are scraped (and scheduled) first
+    rotation = load_rotation_players(db_path)
+    player_args.sort(key=lambda a: player_id_from_href(a[1]) not in rotation)
+    watermarks = {}
+    page_plan = None
+    if incremental:
+        watermarks, checked = load_watermarks(db_path)
+        by_pid = plan_incremental_pages([player_id_from_href(a[1]) for a in player_args], watermarks, checked)
+        page_plan = {a[1]: by_pid.get(player_id_from_href(a[1]), list(GAME_TYPES)) for a in player_args}
+        player_args = [a for a in player_args if page_plan.get(a[1])]
+        print(f"Incremental refresh: {len(player_args)} players, "
+              f"{sum(len(v) for v in page_plan.values())} pages to fetch.")
+    
+    page_hashes = {}
+    # Team and position changes only reach stored rows if the pages are parsed again
+    if not force_parse and not roster_changes:
+        # Pages whose content matches what produced the stored rows are neither parsed nor written
+        page_hashes = load_page_hashes(db_path)
+        if write_path != db_path:
+            page_hashes.update(load_page_hashes(write_path))
 
-    try:
-        merged_deduped = merged.drop_duplicates().reset_index(drop=True)
-    except Exception:
-        merged_deduped = merged.copy() if hasattr(merged, 'copy') else merged
+    writer = GamelogWriter(write_path, players_df, batch_size=batch_size if stream else None,
+                           incremental=incremental, watermarks=watermarks, manifest=manifest)
+    # Browser count is capped by the pool, so workers can exceed the number of drivers
+    max_workers = max(1, min(workers, len(player_args)))
+    pool = DriverPool(size=drivers, max_pages=recycle_after)
+    session = make_session(pool_size=max_workers) if fetch_mode == 'http' or engine == 'async' else None
 
-    merged.columns = [clean_header(c) for c in merged.columns]
+    def fetch_player_pages(args):
+        name, href, _ = args
+        gamelogs_url = build_gamelogs_url(href)
+        game_types = page_plan.get(href) if page_plan else GAME_TYPES
+        if not gamelogs_url or not game_types:
+            return None
+        urls = gamelog_page_urls(gamelogs_url, game_types)
+        in_rotation = player_id_from_href(href) in rotation
+        htmls = fetch_gamelog_htmls(urls, session=session, pool=pool, fetch_mode=fetch_mode, cache=cache,
+                                    manifest=manifest, priorities=[page_priority(gt, in_rotation) for gt in game_types])
+        return (name, href, gamelogs_url, game_types, htmls, [page_hashes.get(url) for url in urls])
 
     try:
-        if 'Pos' in players_df.columns:
-            if 'PlayerID' not in players_df.columns and 'PlayerHref' in players_df.columns:
-                players_df['PlayerID'] = players_df['PlayerHref'].astype(str).str.extract(r'/Summary/(\d+)', expand=False).fillna('')
-
-            if 'PlayerID' in players_df.columns:
-                players_df['PlayerID'] = players_df['PlayerID'].astype(str).str.strip()
-
-            if 'PlayerID' in merged_deduped.columns:
-                merged_deduped['PlayerID'] = merged_deduped['PlayerID'].astype(str).str.strip()
-
-            if 'Pos_Scraped' not in merged_deduped.columns:
-                merged_deduped['Pos_Scraped'] = merged_deduped.get('Pos', '')
-
-            updated_rows = 0
-
-            if 'PlayerID' in players_df.columns and 'PlayerID' in merged_deduped.columns:
-                pos_lookup = players_df[['PlayerID', 'Pos']].dropna(subset=['PlayerID'])
-                pos_lookup = pos_lookup[pos_lookup['PlayerID'].astype(str).str.strip() != '']
-                pos_lookup = pos_lookup.drop_duplicates(subset=['PlayerID'])
-
-                merged = merged_deduped.merge(pos_lookup, on='PlayerID', how='left', suffixes=('', '_from_players'))
-
-                if 'Pos_from_players' in merged.columns:
-                    mask_update = merged['Pos_from_players'].notna() & (merged['Pos_from_players'] != merged['Pos'])
-                    updated_rows = int(mask_update.sum())
-                    merged['Pos'] = merged['Pos_from_players'].fillna(merged['Pos'])
-                    merged.drop(columns=['Pos_from_players'], inplace=True)
-                    merged_deduped = merged
-
-            if updated_rows == 0 and 'Player' in players_df.columns and 'Player' in merged_deduped.columns:
-                pos_lookup = players_df[['Player', 'Pos']].dropna(subset=['Player']).drop_duplicates(subset=['Player'])
-                merged = merged_deduped.merge(pos_lookup, on='Player', how='left', suffixes=('', '_from_players'))
-                if 'Pos_from_players' in merged.columns:
-                    mask_update = merged['Pos_from_players'].notna() & (merged['Pos_from_players'] != merged['Pos'])
-                    updated_rows = int(mask_update.sum())
-                    merged['Pos'] = merged['Pos_from_players'].fillna(merged['Pos'])
-                    merged.drop(columns=['Pos_from_players'], inplace=True)
-                    merged_deduped = merged
-    except Exception:
-        pass
-
-    if 'Date' in merged.columns:
-        merged['Date'] = pd.to_datetime(merged['Date'], errors='coerce', format='%m/%d/%Y')
+        if engine == 'async':
+            run_async_engine(player_args, concurrency=concurrency, per_host=per_host, pool=pool,
+                             session=session, page_plan=page_plan, cache=cache, on_frame=writer.add,
+                             manifest=manifest, rotation=rotation, page_hashes=page_hashes, fetch_mode=fetch_mode)
+        elif engine == 'pipeline':
+            run_pipeline(player_args, fetch_player_pages, parse_player_pages, writer.add,
+                         fetch_workers=max_workers, parse_workers=parse_workers or os.cpu_count() or 1,
+                         queue_size=queue_size)
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(process_player, *args, pool=pool, session=session, fetch_mode=fetch_mode,
+                                           game_types=page_plan.get(args[1]) if page_plan else None, cache=cache,
+                                           manifest=manifest, rotation=player_id_from_href(args[1]) in rotation,
+                                           page_hashes=page_hashes)
+                           for args in player_args]
+                for future in as_completed(futures):
+                    try:
+                        writer.add(future.result())
+                    except Exception as e:
+                        print(f"Error processing player: {e}")
+                        get_telemetry().error('player', exc=e)
+    finally:
+        pool.close()
+        writer.close()
+        if manifest is not None:
+            manifest.finish()
+        get_telemetry().summary()
 
-    if not merged_deduped.empty:
-        try:
-            if 'Date' in merged.columns:
-                merged['Date'] = pd.to_datetime(merged['Date'], errors='coerce').dt.strftime('%Y-%m-%d')
-
-            db_path = os.path.join(out_dir, 'gamelogs.db')
-            conn = sqlite3.connect(db_path)
-            cur = conn.cursor()
-
-            # Schema migration check: drop old table if GameType doesn't exist
-            table_exists = cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='gamelogs'").fetchone()
-            if table_exists:
-                columns = [r[1] for r in cur.execute("PRAGMA table_info(gamelogs)").fetchall()]
-                if 'GameType' not in columns:
-                    print("Outdated database schema detected. Recreating table...")
-                    cur.execute("DROP TABLE gamelogs")
-
-            cur.execute('''
-            CREATE TABLE IF NOT EXISTS gamelogs (
-                Player TEXT,
-                PlayerID INTEGER,
-                SummaryHref TEXT,
-                GameLogsURL TEXT,
-                GameType TEXT,
-                Season TEXT,
-                Date TEXT,
-                Team TEXT,
-                Opponent TEXT,
-                WL TEXT,
-                Status TEXT,
-                Pos TEXT,
-                MIN TEXT,
-                PTS INTEGER,
-                FGM INTEGER,
-                FGA INTEGER,
-                FGPercent REAL,
-                TPM INTEGER,
-                TPA INTEGER,
-                TPPercent REAL,
-                FTM INTEGER,
-                FTA INTEGER,
-                FTPercent REAL,
-                ORB INTEGER,
-                DRB INTEGER,
-                REB INTEGER,
-                AST INTEGER,
-                STL INTEGER,
-                BLK INTEGER,
-                TOV INTEGER,
-                PF INTEGER,
-                FIC REAL,
-                PRIMARY KEY (PlayerID, Date, Opponent, GameType)
-            )
-            ''')
-
-            db_cols = [
-                'Player', 'PlayerID', 'SummaryHref', 'GameLogsURL', 'GameType', 'Season',
-                'Date', 'Team', 'Opponent', 'WL', 'Status', 'Pos', 'MIN', 'PTS',
-                'FGM', 'FGA', 'FGPercent', 'TPM', 'TPA', 'TPPercent', 'FTM', 'FTA',
-                'FTPercent', 'ORB', 'DRB', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PF', 'FIC'
-            ]
-            
-            for col in db_cols:
-                if col not in merged.columns:
-                    merged[col] = None
-                    
-            to_write = merged[db_cols]
-            records = to_write.to_numpy().tolist()
-            
-            placeholders = ', '.join(['?'] * len(db_cols))
-            query = f"INSERT OR REPLACE INTO gamelogs ({', '.join(db_cols)}) VALUES ({placeholders})"
-            
-            cur.executemany(query, records)
-            conn.commit()
-            conn.close()
-            print(f"Successfully upserted {len(records)} game logs into database.")
-        except Exception as e:
-            print(f"Error writing to database: {e}")
+    if incremental:
+        record_checked_pages(write_path, sorted(writer.checked_pages), run_started)
+    # Shards hold a slice of the players; the export and derived tables are built after `merge` instead
+    if shard is None:
+        refresh_recent_games(db_path)
+        refresh_schedule_context(db_path)
+        if export_dir:
+            export_gamelogs(db_path, export_dir)
 
+def parse_shard(spec: str) -> tuple[int, int]:
+    """'2/4' -> (2, 4); shards are numbered from 1."""
+    index, _, count = spec.partition('/')
+    index, count = int(index), int(count)
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(spec)
+    return index, count
 
 if __name__ == '__main__':
     import argparse
+    import glob
 
     parser = argparse.ArgumentParser(description='Scrape gamelogs from RealGM and write to gamelogs.db')
-    parser.add_argument('--players', '-p', help='Path to players.xlsx (optional)', default=None)
+    parser.add_argument('--players', '-p', default=None,
+                        help='Read the roster from this xlsx instead of the players table of gamelogs.db')
+    parser.add_argument('--workers', type=int, default=4, help='Number of players processed concurrently')
+    parser.add_argument('--drivers', type=int, default=2, help='Number of warm Chrome drivers kept in the pool')
+    parser.add_argument('--recycle-after', type=int, default=200, help='Restart a driver after this many page loads')
+    parser.add_argument('--fetch-mode', choices=['http', 'browser'], default='http',
+                        help='http: plain requests first, browser only as fallback; browser: always use Selenium')
+    parser.add_argument('--engine', choices=['threads', 'async', 'pipeline'], default='threads',
+                        help='threads: one worker per player; async: all pages on one asyncio event loop; '
+                             'pipeline: fetch threads -> parse processes -> single writer')
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help='Parse processes in the pipeline engine (default: CPU count)')
+    parser.add_argument('--queue-size', type=int, default=32, help='Bound of the queues between pipeline stages')
+    parser.add_argument('--concurrency', type=int, default=100, help='Max requests in flight (async engine)')
+    parser.add_argument('--per-host', type=int, default=16, help='Max open connections per host (async engine)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only fetch pages that can hold games newer than each player\'s stored high-water mark')
+    parser.add_argument('--offline', action='store_true',
+                        help='Reparse pages from the HTML cache only; never touch the network')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the on-disk HTML cache')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Directory of the on-disk HTML cache')
+    parser.add_argument('--cache-max-mb', type=int, default=500, help='Disk budget of the HTML cache in MB')
+    parser.add_argument('--stream', action='store_true',
+                        help='Upsert players in small batches as they finish instead of once at the end')
+    parser.add_argument('--batch-size', type=int, default=20, help='Players per database batch with --stream')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue the last unfinished run, skipping players whose pages were all written')
+    parser.add_argument('--only-played', action='store_true',
+                        help='Only refresh players whose team played since the last finished run')
+    parser.add_argument('--schedule', default=None,
+                        help='Schedule from generate_schedule.py for --only-played (default: newest *-Schedules-Extracted.xlsx)')
+    parser.add_argument('--since', type=datetime.fromisoformat, default=None,
+                        help='With --only-played, look for games from this date (YYYY-MM-DD) instead of the last run')
+    parser.add_argument('--events', default=DEFAULT_EVENTS_PATH,
+                        help='JSON-lines file receiving one event per fetched/parsed/written page (empty to disable)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Serve Prometheus text metrics on this local port while the scrape runs')
+    parser.add_argument('--rate', type=float, default=4.0, help='Starting requests per second per host')
+    parser.add_argument('--max-rate', type=float, default=25.0,
+                        help='Ceiling for the per-host request rate as the site proves responsive')
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST, help='SQLite file recording per-page progress of each run')
+    parser.add_argument('--force-parse', action='store_true',
+                        help='Parse and compare every page, even those whose content hash matches the stored rows')
+    parser.add_argument('--export-dir', default=DEFAULT_EXPORT_DIR,
+                        help='Parquet copy of gamelogs partitioned by Season/GameType, refreshed after each run')
+    parser.add_argument('--no-export', action='store_true', help='Skip the Parquet export')
+    parser.add_argument('--roster-changes', nargs='?', const=DEFAULT_DIFF, default=None, metavar='DIFF',
+                        help='Only scrape players added, traded or repositioned in the last players.py diff '
+                             '(default: players_diff.xlsx)')
+    parser.add_argument('--shard', type=parse_shard, default=None, metavar='I/N',
+                        help='Only scrape shard I of N (players partitioned by PlayerID hash) into gamelogs.shard-I-of-N.db')
+
+    subparsers = parser.add_subparsers(dest='command')
+    maintain_parser = subparsers.add_parser('maintain', help='Run integrity check, ANALYZE and VACUUM on gamelogs.db')
+    maintain_parser.add_argument('--db', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gamelogs.db'))
+    maintain_parser.add_argument('--no-vacuum', action='store_true', help='Skip VACUUM')
+    maintain_parser.add_argument('--no-analyze', action='store_true', help='Skip ANALYZE')
+    maintain_parser.add_argument('--quick', action='store_true', help='Use quick_check instead of integrity_check')
+    merge_parser = subparsers.add_parser('merge', help='Merge shard databases from --shard runs into gamelogs.db')
+    merge_parser.add_argument('sources', nargs='*', help='Shard databases (default: gamelogs.shard-*-of-*.db next to gamelogs.db)')
+    merge_parser.add_argument('--db', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gamelogs.db'))
+    merge_parser.add_argument('--export-dir', default=DEFAULT_EXPORT_DIR, help='Parquet export refreshed after the merge')
     args = parser.parse_args()
 
-    main(args.players)
\ No newline at end of file
+    if args.command == 'maintain':
+        maintain(args.db, analyze=not args.no_analyze, vacuum=not args.no_vacuum, quick=args.quick)
+        sys.exit(0)
+    if args.command == 'merge':
+        sources = args.sources or sorted(glob.glob(shard_db_path(args.db, '*', '*')))
+        if not sources:
+            print("No shard databases found.")
+            sys.exit(1)
+        merge_databases(args.db, sources)
+        refresh_recent_games(args.db)
+        refresh_schedule_context(args.db)
+        export_gamelogs(args.db, args.export_dir)
+        sys.exit(0)
+
+    set_scheduler(RequestScheduler(rate=args.rate, max_rate=max(args.rate, args.max_rate)))
+    telemetry = Telemetry(args.events or None)
+    set_telemetry(telemetry)
+    if args.metrics_port:
+        telemetry.serve(args.metrics_port)
+    manifest_path = args.manifest
+    if args.shard and manifest_path == DEFAULT_MANIFEST:
+        # Shards running side by side keep separate progress, so each can --resume on its own
+        manifest_path = shard_db_path(DEFAULT_MANIFEST, *args.shard)
+    cache = None
+    if not args.no_cache or args.offline:
+        cache = HtmlCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024, offline=args.offline)
+
+    main(args.players, workers=args.workers, drivers=args.drivers, recycle_after=args.recycle_after,
+         fetch_mode=args.fetch_mode, engine=args.engine, concurrency=args.concurrency, per_host=args.per_host,
+         incremental=args.incremental, cache=cache, parse_workers=args.parse_workers, queue_size=args.queue_size,
+         stream=args.stream, batch_size=args.batch_size,
+         manifest=RunManifest(manifest_path, resume=args.resume, args=vars(args)),
+         only_played=args.only_played, schedule_path=args.schedule, since=args.since, shard=args.shard,
+         force_parse=args.force_parse, export_dir=None if args.no_export else args.export_dir,
+         roster_changes=args.roster_changes)
+    telemetry.close()
@@ -0,0 +1,592 @@
+import hashlib
+import os
+import sqlite3
+import time
+import zlib
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from teams import team_ids
+from schema import GAMELOG_COLUMNS, PLAYER_COLUMNS, PLAYER_RENAMES, PLAYER_SCHEMA, SQL_TYPES
+
+PAGE_SIZE = 8192
+CACHE_SIZE_KB = 65536
+
+GAMELOG_DB_COLS = GAMELOG_COLUMNS
+
+GAMELOG_KEY_COLS = ['PlayerID', 'Date', 'Opponent', 'GameType']
+
+# Team ids are derived from Team/Opponent, which are already hashed
+TEAM_ID_COLS = {'TeamID': 'Team', 'OpponentID': 'Opponent'}
+
+# Columns whose values make up RowHash: everything that an upsert could change
+GAMELOG_HASHED_COLS = [c for c in GAMELOG_DB_COLS
+                       if c not in GAMELOG_KEY_COLS and c != 'RowHash' and c not in TEAM_ID_COLS]
+
+GAMELOG_INDEXES = {
+    'idx_gamelogs_player_date': 'Player, Date',
+    'idx_gamelogs_season_type': 'Season, GameType',
+    'idx_gamelogs_team_date': 'TeamID, Date',
+}
+
+PLAYER_DB_COLS = [c.name for c in PLAYER_SCHEMA]
+# Values compared on upsert; UpdatedAt only moves when one of them does
+PLAYER_VALUE_COLS = [c for c in PLAYER_DB_COLS if c not in ('PlayerID', 'UpdatedAt')]
+
+GAME_DB_COLS = ['GameKey', 'Season', 'Date', 'HomeTeam', 'AwayTeam', 'HomeTeamID', 'AwayTeamID']
+
+GAME_INDEXES = {
+    'idx_games_season_date': 'Season, Date',
+    'idx_games_home_date': 'HomeTeamID, Date',
+    'idx_games_away_date': 'AwayTeamID, Date',
+}
+
+PLAYER_INDEXES = {
+    'idx_players_active': 'Active, PlayerID',
+    'idx_players_name': 'Player',
+}
+
+
+def connect(db_path: str, readonly: bool = False) -> sqlite3.Connection:
+    """Open gamelogs.db with the write-friendly settings every writer should use."""
+    if readonly:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        conn.execute("PRAGMA query_only=ON")
+        return conn
+    is_new = not os.path.exists(db_path) or os.path.getsize(db_path) == 0
+    conn = sqlite3.connect(db_path, timeout=30)
+    if is_new:
+        # page_size only takes effect before the first table is created (and cannot change once in WAL)
+        conn.execute(f"PRAGMA page_size={PAGE_SIZE}")
+    # WAL lets app.py keep reading while a scrape is writing
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def ensure_gamelogs_schema(cur) -> None:
+    # Schema migration check: drop old table if GameType doesn't exist
+    table_exists = cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='gamelogs'").fetchone()
+    if table_exists:
+        columns = [r[1] for r in cur.execute("PRAGMA table_info(gamelogs)").fetchall()]
+        if 'GameType' not in columns:
+            print("Outdated database schema detected. Recreating table...")
+            cur.execute("DROP TABLE gamelogs")
+            cur.execute("DROP TABLE IF EXISTS page_hashes")
+        else:
+            missing = [c for c in GAMELOG_DB_COLS if c not in columns]
+            for col in missing:
+                cur.execute(f"ALTER TABLE gamelogs ADD COLUMN {col} {SQL_TYPES[col]}")
+            if any(c in TEAM_ID_COLS for c in missing):
+                fill_team_ids(cur)
+
+    columns = ',\n        '.join(f"{c} {SQL_TYPES[c]}" for c in GAMELOG_DB_COLS)
+    cur.execute(f'''
+    CREATE TABLE IF NOT EXISTS gamelogs (
+        {columns},
+        PRIMARY KEY ({', '.join(GAMELOG_KEY_COLS)})
+    )
+    ''')
+    for name, cols in GAMELOG_INDEXES.items():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON gamelogs ({cols})")
+
+
+def team_id_values(names) -> np.ndarray:
+    """teams.team_ids as an object array with None for unknown teams, ready to bind as INTEGER/NULL."""
+    ids = team_ids(names)
+    return np.where(ids > 0, ids.astype(object), None)
+
+
+def add_team_ids(df: pd.DataFrame) -> pd.DataFrame:
+    for id_col, name_col in TEAM_ID_COLS.items():
+        if name_col in df.columns:
+            df[id_col] = team_id_values(df[name_col])
+    return df
+
+
+def fill_team_ids(cur) -> int:
+    """Resolve TeamID/OpponentID of stored rows that have none (older rows, merged shards)."""
+    filled = 0
+    for id_col, name_col in TEAM_ID_COLS.items():
+        names = [r[0] for r in cur.execute(
+            f"SELECT DISTINCT {name_col} FROM gamelogs WHERE {id_col} IS NULL AND {name_col} IS NOT NULL")]
+        pairs = [(name, int(i)) for name, i in zip(names, team_ids(names)) if i > 0]
+        if not pairs:
+            continue
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS team_name_ids (Name TEXT PRIMARY KEY, TeamID INTEGER)")
+        cur.execute("DELETE FROM team_name_ids")
+        cur.executemany("INSERT INTO team_name_ids VALUES (?, ?)", pairs)
+        filled += cur.execute(
+            f"UPDATE gamelogs SET {id_col} = (SELECT TeamID FROM team_name_ids WHERE Name = gamelogs.{name_col}) "
+            f"WHERE {id_col} IS NULL AND {name_col} IN (SELECT Name FROM team_name_ids)"
+        ).rowcount
+    return filled
+
+
+def _canonical_text(values: pd.Series, sql_type: str) -> list:
+    # The value as its stored type would hold it, as text; missing is ''
+    if sql_type in ('INTEGER', 'REAL'):
+        numbers = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+        missing = np.isnan(numbers).tolist()
+        if sql_type == 'INTEGER':
+            numbers = np.round(np.nan_to_num(numbers)).astype(np.int64)
+        values = numbers.tolist()
+    else:
+        missing = values.isna().tolist()
+        values = values.tolist()
+    return ['' if m else str(v) for v, m in zip(values, missing)]
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """64-bit hash of each row's GAMELOG_HASHED_COLS, compared on upsert to skip rows that did not change.
+
+    Values are cast to their schema type and hashed as text, so the hash depends neither on how
+    the batch was built (NaN vs None, '1' vs 1) nor on the installed pandas.
+    """
+    columns = [_canonical_text(df[c], SQL_TYPES[c]) for c in GAMELOG_HASHED_COLS]
+    digests = b''.join(hashlib.blake2b('\x1f'.join(row).encode('utf-8'), digest_size=8).digest()
+                       for row in zip(*columns))
+    return np.frombuffer(digests, dtype='<i8').astype(np.int64)
+
+
+def _upsert_query(source: str) -> str:
+    # Identical rows hit the WHERE and are left alone, so they do not count as changes or dirty pages.
+    # Stored rows without a RowHash (written before it existed) cannot be compared and are always rewritten.
+    updates = ', '.join(f"{c} = excluded.{c}" for c in GAMELOG_DB_COLS if c not in GAMELOG_KEY_COLS)
+    return (
+        f"INSERT INTO gamelogs ({', '.join(GAMELOG_DB_COLS)}) {source} "
+        f"ON CONFLICT ({', '.join(GAMELOG_KEY_COLS)}) DO UPDATE SET {updates} "
+        f"WHERE gamelogs.RowHash IS NOT excluded.RowHash OR gamelogs.RowHash IS NULL"
+    )
+
+
+def upsert_gamelogs(conn: sqlite3.Connection, df: pd.DataFrame, chunk_size: int = 5000) -> tuple[int, int, int]:
+    """Insert new rows and update changed ones on the (PlayerID, Date, Opponent, GameType) key.
+
+    Returns (new, changed, unchanged) row counts. One transaction per chunk.
+    """
+    cur = conn.cursor()
+    ensure_gamelogs_schema(cur)
+    conn.commit()
+    # assign/drop_duplicates return new frames: the caller's frame (a writer buffer) is left as it was
+    df = df.assign(**{col: None for col in GAMELOG_DB_COLS if col not in df.columns})
+    # The last row per key is the one that would survive a row-by-row upsert
+    df = df.drop_duplicates(subset=GAMELOG_KEY_COLS, keep='last')
+    df = add_team_ids(df)
+    df['RowHash'] = row_hashes(df)
+
+    to_write = df[GAMELOG_DB_COLS]
+    records = to_write.to_numpy().tolist()
+    query = _upsert_query(f"VALUES ({', '.join(['?'] * len(GAMELOG_DB_COLS))})")
+
+    before = cur.execute("SELECT COUNT(*) FROM gamelogs").fetchone()[0]
+    changes = conn.total_changes
+    for i in range(0, len(records), chunk_size):
+        with conn:
+            conn.executemany(query, records[i:i + chunk_size])
+    touched = conn.total_changes - changes
+    new = cur.execute("SELECT COUNT(*) FROM gamelogs").fetchone()[0] - before
+    if touched:
+        with conn:
+            update_watermarks(conn.cursor(), to_write['PlayerID'].dropna().unique().tolist())
+    return new, touched - new, len(records) - touched
+
+
+def player_fingerprints(conn: sqlite3.Connection) -> dict:
+    """{PlayerID: fingerprint of their gamelogs}; RowHash moves whenever a row's values do, ids are counted apart."""
+    rows = conn.execute(
+        "SELECT PlayerID, COUNT(*), MAX(Date), COUNT(TeamID), SUM(COALESCE(TeamID, 0)), "
+        "SUM(RowHash % 4294967296), SUM(RowHash / 4294967296) "
+        "FROM gamelogs WHERE PlayerID IS NOT NULL GROUP BY PlayerID"
+    ).fetchall()
+    return {int(pid): ':'.join(map(str, rest)) for pid, *rest in rows}
+
+
+def maintain(db_path: str, analyze: bool = True, vacuum: bool = True, integrity: bool = True,
+             quick: bool = False) -> dict:
+    """Run integrity check / ANALYZE / VACUUM on gamelogs.db and report how long each step took."""
+    if not os.path.exists(db_path):
+        print(f"{db_path} does not exist")
+        return {}
+    timings = {}
+    size_before = os.path.getsize(db_path)
+    conn = connect(db_path)
+    try:
+        ensure_gamelogs_schema(conn.cursor())
+        conn.commit()
+        if integrity:
+            start = time.perf_counter()
+            pragma = 'quick_check' if quick else 'integrity_check'
+            result = [r[0] for r in conn.execute(f"PRAGMA {pragma}").fetchall()]
+            timings[pragma] = time.perf_counter() - start
+            print(f"{pragma}: {', '.join(result[:5])} ({timings[pragma]:.2f}s)")
+        if analyze:
+            start = time.perf_counter()
+            conn.execute("ANALYZE")
+            conn.commit()
+            timings['analyze'] = time.perf_counter() - start
+            print(f"ANALYZE: {timings['analyze']:.2f}s")
+        if vacuum:
+            start = time.perf_counter()
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            timings['vacuum'] = time.perf_counter() - start
+            print(f"VACUUM: {timings['vacuum']:.2f}s")
+        rows = conn.execute("SELECT COUNT(*) FROM gamelogs").fetchone()[0]
+    finally:
+        conn.close()
+    size_after = os.path.getsize(db_path)
+    print(f"{rows} rows, {size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB")
+    return timings
+
+
+def ensure_watermarks_table(cur) -> None:
+    cur.execute('''
+    CREATE TABLE IF NOT EXISTS player_watermarks (
+        PlayerID INTEGER,
+        GameType TEXT,
+        LastDate TEXT,
+        CheckedAt TEXT,
+        PRIMARY KEY (PlayerID, GameType)
+    )
+    ''')
+
+
+def load_watermarks(db_path: str) -> tuple[dict, dict]:
+    """Return ({(PlayerID, GameType): last stored 'YYYY-MM-DD'}, {(PlayerID, GameType): last checked ISO time})."""
+    if not os.path.exists(db_path):
+        return {}, {}
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.cursor()
+        tables = {r[0] for r in cur.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+        if 'player_watermarks' in tables:
+            rows = cur.execute("SELECT PlayerID, GameType, LastDate, CheckedAt FROM player_watermarks").fetchall()
+        elif 'gamelogs' in tables:
+            rows = cur.execute("SELECT PlayerID, GameType, MAX(Date), NULL FROM gamelogs GROUP BY PlayerID, GameType").fetchall()
+        else:
+            rows = []
+    finally:
+        conn.close()
+    marks = {(int(pid), gt): d for pid, gt, d, _ in rows if pid not in (None, '') and d}
+    checked = {(int(pid), gt): c for pid, gt, _, c in rows if pid not in (None, '') and c}
+    return marks, checked
+
+
+def update_watermarks(cur, player_ids: list) -> None:
+    ensure_watermarks_table(cur)
+    ids = sorted({int(p) for p in player_ids if str(p).strip().isdigit()})
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        marks = ', '.join(['?'] * len(chunk))
+        cur.execute(
+            f"INSERT INTO player_watermarks (PlayerID, GameType, LastDate) "
+            f"SELECT PlayerID, GameType, MAX(Date) FROM gamelogs WHERE PlayerID IN ({marks}) GROUP BY PlayerID, GameType "
+            f"ON CONFLICT (PlayerID, GameType) DO UPDATE SET LastDate = excluded.LastDate "
+            f"WHERE LastDate IS NOT excluded.LastDate",
+            chunk,
+        )
+
+
+def record_checked_pages(db_path: str, pairs: list[tuple], checked_at: str) -> None:
+    # Remember when each (player, game type) page was last read so quiet pages are not refetched
+    if not pairs:
+        return
+    conn = connect(db_path)
+    try:
+        cur = conn.cursor()
+        ensure_watermarks_table(cur)
+        cur.executemany(
+            "INSERT INTO player_watermarks (PlayerID, GameType, CheckedAt) VALUES (?, ?, ?) "
+            "ON CONFLICT (PlayerID, GameType) DO UPDATE SET CheckedAt = excluded.CheckedAt",
+            [(pid, gt, checked_at) for pid, gt in pairs],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def ensure_players_table(cur) -> None:
+    columns = ',\n        '.join(f"{c.name} {c.sql_type}" for c in PLAYER_SCHEMA if c.name != 'PlayerID')
+    cur.execute(f'''
+    CREATE TABLE IF NOT EXISTS players (
+        PlayerID INTEGER PRIMARY KEY,
+        {columns}
+    )
+    ''')
+    for name, cols in PLAYER_INDEXES.items():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON players ({cols})")
+
+
+def _player_records(df: pd.DataFrame, updated_at: str) -> list[tuple]:
+    # Roster frame (PLAYER_COLUMNS) -> players rows; players without a numeric PlayerID cannot be keyed
+    df = df.rename(columns=PLAYER_RENAMES)
+    out = pd.DataFrame({'PlayerID': pd.to_numeric(df['PlayerID'], errors='coerce')})
+    for col in PLAYER_SCHEMA[1:]:
+        if col.name == 'Active':
+            out[col.name] = 1
+        elif col.name == 'UpdatedAt':
+            out[col.name] = updated_at
+        elif col.kind == 'int':
+            out[col.name] = pd.to_numeric(df[col.name], errors='coerce') if col.name in df.columns else None
+        elif col.name in df.columns:
+            text = df[col.name].fillna('').astype(str).str.strip()
+            out[col.name] = text.where(text != '', None)
+        else:
+            out[col.name] = None
+    out = out.dropna(subset=['PlayerID']).drop_duplicates(subset=['PlayerID'], keep='first')
+    out['PlayerID'] = out['PlayerID'].astype(int)
+    out = out.astype(object).where(out.notna(), None)
+    return list(out[PLAYER_DB_COLS].itertuples(index=False, name=None))
+
+
+def write_players(db_path: str, df: pd.DataFrame) -> tuple[int, int, int]:
+    """Store the scraped roster in the players table of `db_path`.
+
+    Players are upserted on PlayerID and only rewritten when a roster value changed;
+    players missing from `df` stay in the table (their gamelogs still point at them)
+    but are marked Active = 0. Returns (added, changed, deactivated).
+    """
+    now = datetime.now().isoformat(timespec='seconds')
+    records = _player_records(df, now)
+    updates = ', '.join(f"{c} = excluded.{c}" for c in PLAYER_DB_COLS if c != 'PlayerID')
+    differs = ' OR '.join(f"players.{c} IS NOT excluded.{c}" for c in PLAYER_VALUE_COLS)
+    conn = connect(db_path)
+    try:
+        cur = conn.cursor()
+        ensure_players_table(cur)
+        before = cur.execute("SELECT COUNT(*) FROM players").fetchone()[0]
+        changes = conn.total_changes
+        with conn:
+            cur.executemany(
+                f"INSERT INTO players ({', '.join(PLAYER_DB_COLS)}) VALUES ({', '.join('?' * len(PLAYER_DB_COLS))}) "
+                f"ON CONFLICT (PlayerID) DO UPDATE SET {updates} WHERE {differs}",
+                records,
+            )
+            touched = conn.total_changes - changes
+            cur.execute("CREATE TEMP TABLE IF NOT EXISTS roster_ids (PlayerID INTEGER PRIMARY KEY)")
+            cur.execute("DELETE FROM roster_ids")
+            cur.executemany("INSERT OR IGNORE INTO roster_ids VALUES (?)", [(r[0],) for r in records])
+            deactivated = cur.execute(
+                "UPDATE players SET Active = 0, UpdatedAt = ? "
+                "WHERE Active = 1 AND PlayerID NOT IN (SELECT PlayerID FROM roster_ids)",
+                (now,),
+            ).rowcount
+        added = cur.execute("SELECT COUNT(*) FROM players").fetchone()[0] - before
+    finally:
+        conn.close()
+    return added, touched - added, deactivated
+
+
+def load_players(db_path: str, active_only: bool = True) -> pd.DataFrame:
+    """Roster from the players table as a PLAYER_COLUMNS frame (integer PlayerID); empty when there is none."""
+    if not os.path.exists(db_path):
+        return pd.DataFrame(columns=PLAYER_COLUMNS)
+    select = ', '.join(f'{PLAYER_RENAMES[c]} AS "{c}"' if c in PLAYER_RENAMES else c for c in PLAYER_COLUMNS)
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+        if 'players' not in tables:
+            return pd.DataFrame(columns=PLAYER_COLUMNS)
+        # Served by idx_players_active (or the PlayerID primary key for the whole table)
+        where = " WHERE Active = 1" if active_only else ""
+        return pd.read_sql_query(f"SELECT {select} FROM players{where} ORDER BY PlayerID", conn)
+    finally:
+        conn.close()
+
+
+def ensure_games_table(cur) -> None:
+    cur.execute('''
+    CREATE TABLE IF NOT EXISTS games (
+        GameKey TEXT PRIMARY KEY,
+        Season TEXT,
+        Date TEXT,
+        HomeTeam TEXT,
+        AwayTeam TEXT,
+        HomeTeamID INTEGER,
+        AwayTeamID INTEGER
+    )
+    ''')
+    columns = [r[1] for r in cur.execute("PRAGMA table_info(games)").fetchall()]
+    for col in ('HomeTeamID', 'AwayTeamID'):
+        if col not in columns:
+            cur.execute(f"ALTER TABLE games ADD COLUMN {col} INTEGER")
+    for name, cols in GAME_INDEXES.items():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON games ({cols})")
+
+
+def write_games(db_path: str, games: pd.DataFrame, season: str, teams: list[str]) -> tuple[int, int]:
+    """Store one season's deduplicated schedule in the games table.
+
+    Games already stored are left alone. A stored game of `season` that involves one of
+    `teams` (the teams whose schedule page was read) but is no longer on the schedule was
+    moved or cancelled, and is deleted; teams whose page failed keep their games.
+    Returns (added, removed).
+    """
+    conn = connect(db_path)
+    try:
+        cur = conn.cursor()
+        ensure_games_table(cur)
+        before = cur.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+        with conn:
+            # Known games are only touched to fill in ids missing from older rows
+            cur.executemany(
+                f"INSERT INTO games ({', '.join(GAME_DB_COLS)}) VALUES ({', '.join('?' * len(GAME_DB_COLS))}) "
+                f"ON CONFLICT (GameKey) DO UPDATE SET HomeTeamID = excluded.HomeTeamID, AwayTeamID = excluded.AwayTeamID "
+                f"WHERE HomeTeamID IS NOT excluded.HomeTeamID OR AwayTeamID IS NOT excluded.AwayTeamID",
+                list(games[GAME_DB_COLS].itertuples(index=False, name=None)),
+            )
+            added = cur.execute("SELECT COUNT(*) FROM games").fetchone()[0] - before
+            cur.execute("CREATE TEMP TABLE IF NOT EXISTS scheduled_keys (GameKey TEXT PRIMARY KEY)")
+            cur.execute("DELETE FROM scheduled_keys")
+            cur.executemany("INSERT OR IGNORE INTO scheduled_keys VALUES (?)", [(k,) for k in games['GameKey']])
+            marks = ', '.join('?' * len(teams))
+            removed = cur.execute(
+                f"DELETE FROM games WHERE Season = ? AND (HomeTeam IN ({marks}) OR AwayTeam IN ({marks})) "
+                f"AND GameKey NOT IN (SELECT GameKey FROM scheduled_keys)",
+                [season, *teams, *teams],
+            ).rowcount if teams else 0
+    finally:
+        conn.close()
+    return added, removed
+
+
+def ensure_page_hashes_table(cur) -> None:
+    cur.execute('''
+    CREATE TABLE IF NOT EXISTS page_hashes (
+        URL TEXT PRIMARY KEY,
+        Hash TEXT,
+        Rows INTEGER
+    )
+    ''')
+
+
+def _page_hashes_query(source: str) -> str:
+    return (
+        f"INSERT INTO page_hashes (URL, Hash, Rows) {source} "
+        f"ON CONFLICT (URL) DO UPDATE SET Hash = excluded.Hash, Rows = excluded.Rows "
+        f"WHERE Hash IS NOT excluded.Hash"
+    )
+
+
+def load_page_hashes(db_path: str) -> dict:
+    """{gamelog page URL: content hash of the page whose rows are stored}."""
+    if not os.path.exists(db_path):
+        return {}
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+        if 'page_hashes' not in tables:
+            return {}
+        return dict(conn.execute("SELECT URL, Hash FROM page_hashes").fetchall())
+    finally:
+        conn.close()
+
+
+def record_page_hashes(conn: sqlite3.Connection, pages: list[tuple]) -> int:
+    """Store (url, hash, rows) for pages whose rows were written; only pages whose hash moved are rewritten."""
+    if not pages:
+        return 0
+    cur = conn.cursor()
+    ensure_page_hashes_table(cur)
+    changes = conn.total_changes
+    with conn:
+        cur.executemany(_page_hashes_query("VALUES (?, ?, ?)"), pages)
+    return conn.total_changes - changes
+
+
+def load_rotation_players(db_path: str, min_minutes: float = 20.0, last_games: int = 10) -> set:
+    """PlayerIDs averaging at least `min_minutes` over their last `last_games` stored games."""
+    if not os.path.exists(db_path):
+        return set()
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+        if 'gamelogs' not in tables:
+            return set()
+        rows = conn.execute(
+            "SELECT PlayerID FROM ("
+            "  SELECT PlayerID, CAST(MIN AS REAL) AS Minutes,"
+            "         ROW_NUMBER() OVER (PARTITION BY PlayerID ORDER BY Date DESC) AS rn"
+            "  FROM gamelogs"
+            ") WHERE rn <= ? GROUP BY PlayerID HAVING AVG(Minutes) >= ?",
+            (last_games, min_minutes),
+        ).fetchall()
+    finally:
+        conn.close()
+    return {int(pid) for pid, in rows if str(pid).strip().isdigit()}
+
+
+def shard_of(key, count: int) -> int:
+    """Stable shard index in [0, count) for a PlayerID (or any key); the same on every machine and run."""
+    return zlib.crc32(str(key).strip().encode('utf-8')) % count
+
+
+def shard_db_path(db_path: str, index: int, count: int) -> str:
+    """gamelogs.db -> gamelogs.shard-2-of-4.db for the 1-based shard `index`."""
+    root, ext = os.path.splitext(db_path)
+    return f"{root}.shard-{index}-of-{count}{ext or '.db'}"
+
+
+def merge_databases(db_path: str, sources: list[str]) -> dict:
+    """Fold shard databases into `db_path`, upserting on the gamelogs primary key.
+
+    Sources are merged oldest first, so on a key conflict the most recently written shard
+    wins, as it would have in a single run. Watermarks are recomputed for merged players,
+    the latest CheckedAt and page hash of each page are kept.
+    Returns {source: (rows, new, changed, unchanged)}.
+    """
+    sources = sorted((p for p in sources if os.path.abspath(p) != os.path.abspath(db_path)), key=os.path.getmtime)
+    report = {}
+    conn = connect(db_path)
+    try:
+        cur = conn.cursor()
+        ensure_gamelogs_schema(cur)
+        ensure_watermarks_table(cur)
+        ensure_page_hashes_table(cur)
+        conn.commit()
+        for source in sources:
+            cur.execute("ATTACH DATABASE ? AS shard", (source,))
+            try:
+                tables = {r[0] for r in cur.execute("SELECT name FROM shard.sqlite_master WHERE type='table'")}
+                if 'gamelogs' not in tables:
+                    print(f"{source}: no gamelogs table, skipped")
+                    continue
+                # Shards written before a column existed contribute NULLs for it
+                shard_cols = {r[1] for r in cur.execute("PRAGMA shard.table_info(gamelogs)")}
+                select = ', '.join(c if c in shard_cols else f"NULL AS {c}" for c in GAMELOG_DB_COLS)
+                before = cur.execute("SELECT COUNT(*) FROM main.gamelogs").fetchone()[0]
+                rows = cur.execute("SELECT COUNT(*) FROM shard.gamelogs").fetchone()[0]
+                changes = conn.total_changes
+                with conn:
+                    # WHERE true keeps SQLite from reading ON CONFLICT as a join constraint
+                    cur.execute(_upsert_query(f"SELECT {select} FROM shard.gamelogs WHERE true"))
+                touched = conn.total_changes - changes
+                with conn:
+                    if not TEAM_ID_COLS.keys() <= shard_cols:
+                        fill_team_ids(cur)
+                    if touched:
+                        update_watermarks(cur, [r[0] for r in cur.execute("SELECT DISTINCT PlayerID FROM shard.gamelogs")])
+                    if 'player_watermarks' in tables:
+                        cur.execute(
+                            "INSERT INTO main.player_watermarks (PlayerID, GameType, CheckedAt) "
+                            "SELECT PlayerID, GameType, CheckedAt FROM shard.player_watermarks WHERE CheckedAt IS NOT NULL "
+                            "ON CONFLICT (PlayerID, GameType) DO UPDATE SET CheckedAt = excluded.CheckedAt "
+                            "WHERE excluded.CheckedAt > COALESCE(CheckedAt, '')"
+                        )
+                    if 'page_hashes' in tables:
+                        cur.execute(_page_hashes_query("SELECT URL, Hash, Rows FROM shard.page_hashes WHERE true"))
+                new = cur.execute("SELECT COUNT(*) FROM main.gamelogs").fetchone()[0] - before
+                report[source] = (rows, new, touched - new, rows - touched)
+                print(f"{os.path.basename(source)}: {rows} rows, {new} new, {touched - new} changed, "
+                      f"{rows - touched} unchanged")
+            finally:
+                cur.execute("DETACH DATABASE shard")
+        total = cur.execute("SELECT COUNT(*) FROM main.gamelogs").fetchone()[0]
+    finally:
+        conn.close()
+    print(f"Merged {len(report)} shard databases into {db_path}: {total} rows")
+    return report
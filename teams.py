@@ -0,0 +1,93 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# team_id, schedule ref (RealGM URL slug), abbreviations, other names (short, historical)
+# team_id is this project's own stable key, stored as TeamID/OpponentID/HomeTeamID/AwayTeamID
+TEAMS = [
+    (1, 'Atlanta-Hawks', ('ATL',), ()),
+    (2, 'Boston-Celtics', ('BOS',), ()),
+    (3, 'Brooklyn-Nets', ('BKN', 'BRK', 'NJN', 'NJ'), ('New Jersey Nets',)),
+    (4, 'Charlotte-Hornets', ('CHA', 'CHO', 'CHH'), ('Charlotte Bobcats', 'Bobcats')),
+    (5, 'Chicago-Bulls', ('CHI',), ()),
+    (6, 'Cleveland-Cavaliers', ('CLE',), ('Cavs',)),
+    (7, 'Dallas-Mavericks', ('DAL',), ('Mavs',)),
+    (8, 'Denver-Nuggets', ('DEN',), ()),
+    (9, 'Detroit-Pistons', ('DET',), ()),
+    (10, 'Golden-State-Warriors', ('GSW', 'GS'), ('Golden State',)),
+    (11, 'Houston-Rockets', ('HOU',), ()),
+    (12, 'Indiana-Pacers', ('IND',), ()),
+    (13, 'Los-Angeles-Clippers', ('LAC',), ('L.A. Clippers', 'LA Clippers')),
+    (14, 'Los-Angeles-Lakers', ('LAL',), ('L.A. Lakers', 'LA Lakers')),
+    (15, 'Memphis-Grizzlies', ('MEM', 'VAN'), ('Vancouver Grizzlies',)),
+    (16, 'Miami-Heat', ('MIA',), ()),
+    (17, 'Milwaukee-Bucks', ('MIL',), ()),
+    (18, 'Minnesota-Timberwolves', ('MIN',), ('Wolves',)),
+    (19, 'New-Orleans-Pelicans', ('NOP', 'NO', 'NOH', 'NOK'), ('New Orleans Hornets', 'New Orleans/Oklahoma City Hornets')),
+    (20, 'New-York-Knicks', ('NYK', 'NY'), ()),
+    (21, 'Oklahoma-City-Thunder', ('OKC', 'SEA'), ('Seattle SuperSonics', 'Seattle Supersonics', 'Sonics')),
+    (22, 'Orlando-Magic', ('ORL',), ()),
+    (23, 'Philadelphia-Sixers', ('PHI',), ('Philadelphia 76ers', '76ers')),
+    (24, 'Phoenix-Suns', ('PHX', 'PHO'), ()),
+    (25, 'Portland-Trail-Blazers', ('POR',), ('Blazers',)),
+    (26, 'Sacramento-Kings', ('SAC',), ()),
+    (27, 'San-Antonio-Spurs', ('SAS', 'SA'), ()),
+    (28, 'Toronto-Raptors', ('TOR',), ()),
+    (29, 'Utah-Jazz', ('UTA', 'UTAH'), ()),
+    (30, 'Washington-Wizards', ('WAS', 'WSH'), ('Washington Bullets',)),
+]
+
+TEAM_REFS = [ref for _, ref, _, _ in TEAMS]
+REF_BY_ID = {team_id: ref for team_id, ref, _, _ in TEAMS}
+
+
+def alias_key(name) -> str:
+    """Lookup form of a team spelling: lowercase words, punctuation and a leading 'v.'/'@'/'vs' marker dropped."""
+    if not isinstance(name, str):
+        return ''
+    text = re.sub(r'[^a-z0-9]+', ' ', name.lower()).strip()
+    text = re.sub(r'^(?:vs?|at) ', '', text)
+    return re.sub(r'^l a ', 'los angeles ', text)
+
+
+def _build_aliases() -> dict:
+    aliases = {}
+    for team_id, ref, abbrs, others in TEAMS:
+        full = ref.replace('-', ' ')
+        words = full.split(' ')
+        names = [ref, full, words[-1], *abbrs, *others]
+        if ref == 'Portland-Trail-Blazers':
+            names += ['Trail Blazers', 'Portland']
+        elif words[:2] != ['Los', 'Angeles']:
+            # City alone ('Phoenix', 'Oklahoma City'); Los Angeles is two teams
+            names.append(' '.join(words[:-1]))
+        for name in names:
+            aliases[alias_key(name)] = team_id
+    return aliases
+
+
+# Every known spelling -> team_id, built once at import
+TEAM_ALIASES = _build_aliases()
+
+
+def team_id(name) -> int:
+    """team_id for any spelling of a team ('Atlanta Hawks', 'Atlanta-Hawks', 'L.A. Lakers', 'v. ATL'), or 0."""
+    key = alias_key(name)
+    if not key:
+        return 0
+    # Spellings not listed ('LA Lakers Legends'...) still end in the nickname
+    return TEAM_ALIASES.get(key) or TEAM_ALIASES.get(key.split(' ')[-1], 0)
+
+
+def team_ids(values) -> np.ndarray:
+    """Vectorized team_id: each distinct spelling is resolved once, then broadcast. Unknown -> 0."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    resolved = np.array([team_id(u) for u in uniques] + [0], dtype=np.int64)
+    return resolved[codes]
+
+
+def team_refs(values) -> np.ndarray:
+    """Schedule ref ('Atlanta-Hawks') for each spelling, '' when unknown."""
+    refs = np.array([''] + TEAM_REFS, dtype=object)
+    return refs[team_ids(values)]
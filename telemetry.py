@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+DEFAULT_EVENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scrape_events.jsonl')
+
+# Event fields that are sampled for the p50/p95 summary, as (field, stage label)
+TIMED_FIELDS = [
+    ('queue_s', 'queue wait'),
+    ('fetch_s', 'fetch'),
+    ('parse_s', 'parse'),
+    ('write_s', 'db write'),
+]
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+class Telemetry:
+    """Per-URL scrape events written as JSON lines, plus in-memory aggregates for a run summary.
+
+    Every `event()` is appended to `path` (when set) as one JSON object and folded into
+    counters and timing samples. `summary()` prints p50/p95 per stage and throughput;
+    `serve(port)` exposes the same aggregates as Prometheus text on /metrics.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+        self._samples = defaultdict(list)
+        self._counters = defaultdict(float)
+        self._server = None
+
+    def event(self, kind: str, **fields) -> None:
+        record = {'ts': round(time.time(), 3), 'event': kind}
+        record.update({k: v for k, v in fields.items() if v is not None})
+        with self._lock:
+            if self._file is not None:
+                self._file.write(json.dumps(record, default=str) + '\n')
+            self._counters[('events', kind)] += 1
+            if kind == 'fetch':
+                self._counters[('pages', record.get('fetcher', 'http'))] += 1
+                self._counters[('bytes', '')] += record.get('bytes', 0)
+                self._counters[('retries', '')] += record.get('retries', 0)
+            if kind == 'parse':
+                self._counters[('rows', '')] += record.get('rows', 0)
+            if record.get('error'):
+                self._counters[('errors', kind)] += 1
+            for field, _ in TIMED_FIELDS:
+                if isinstance(record.get(field), (int, float)):
+                    self._samples[field].append(record[field])
+
+    def error(self, stage: str, url: str = None, exc: BaseException = None, **fields) -> None:
+        """Record a failure that used to be swallowed; it still does not stop the run."""
+        message = f"{type(exc).__name__}: {exc}" if exc is not None else fields.pop('error', 'unknown error')
+        self.event(stage, url=url, error=message, **fields)
+
+    def snapshot(self) -> tuple[dict, dict]:
+        with self._lock:
+            samples = {k: sorted(v) for k, v in self._samples.items()}
+            counters = dict(self._counters)
+        return samples, counters
+
+    def summary(self) -> None:
+        samples, counters = self.snapshot()
+        elapsed = max(time.time() - self.started, 1e-9)
+        pages = sum(n for (name, _), n in counters.items() if name == 'pages')
+        if not pages and not samples:
+            return
+        print(f"Scrape telemetry ({elapsed:.1f}s):")
+        for field, label in TIMED_FIELDS:
+            values = samples.get(field)
+            if values:
+                print(f"  {label:<10} n={len(values):<6} p50={_percentile(values, 0.5) * 1000:8.1f} ms  "
+                      f"p95={_percentile(values, 0.95) * 1000:8.1f} ms  total={sum(values):8.1f} s")
+        by_fetcher = ', '.join(f"{n:.0f} {f}" for (name, f), n in sorted(counters.items()) if name == 'pages')
+        errors = ', '.join(f"{n:.0f} {stage}" for (name, stage), n in sorted(counters.items()) if name == 'errors')
+        print(f"  pages      {pages:.0f} ({by_fetcher or 'none'}), {pages / elapsed:.2f} pages/s, "
+              f"{counters.get(('rows', ''), 0) / elapsed:.1f} rows/s, "
+              f"{counters.get(('bytes', ''), 0) / elapsed / 1e6:.2f} MB/s, "
+              f"{counters.get(('retries', ''), 0):.0f} retries")
+        if errors:
+            print(f"  errors     {errors}")
+
+    def prometheus(self) -> str:
+        samples, counters = self.snapshot()
+        lines = [
+            '# TYPE nba_scrape_pages_total counter',
+            *(f'nba_scrape_pages_total{{fetcher="{f}"}} {n:.0f}' for (name, f), n in sorted(counters.items()) if name == 'pages'),
+            '# TYPE nba_scrape_errors_total counter',
+            *(f'nba_scrape_errors_total{{stage="{s}"}} {n:.0f}' for (name, s), n in sorted(counters.items()) if name == 'errors'),
+            '# TYPE nba_scrape_bytes_total counter',
+            f"nba_scrape_bytes_total {counters.get(('bytes', ''), 0):.0f}",
+            '# TYPE nba_scrape_rows_total counter',
+            f"nba_scrape_rows_total {counters.get(('rows', ''), 0):.0f}",
+            '# TYPE nba_scrape_retries_total counter',
+            f"nba_scrape_retries_total {counters.get(('retries', ''), 0):.0f}",
+            '# TYPE nba_scrape_stage_seconds summary',
+        ]
+        for field, _ in TIMED_FIELDS:
+            values = samples.get(field, [])
+            stage = field[:-2]
+            for q in (0.5, 0.95):
+                lines.append(f'nba_scrape_stage_seconds{{stage="{stage}",quantile="{q}"}} {_percentile(values, q):.6f}')
+            lines.append(f'nba_scrape_stage_seconds_sum{{stage="{stage}"}} {sum(values):.6f}')
+            lines.append(f'nba_scrape_stage_seconds_count{{stage="{stage}"}} {len(values)}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int, host: str = '127.0.0.1') -> None:
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') not in ('', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = telemetry.prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"Serving scrape metrics on http://{host}:{port}/metrics")
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_telemetry() -> Telemetry:
+    """Process-wide telemetry; without `set_telemetry` it only keeps in-memory aggregates."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Telemetry()
+        return _default
+
+
+def set_telemetry(telemetry: Telemetry) -> None:
+    global _default
+    with _default_lock:
+        _default = telemetry
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import stats  # noqa: E402
+from fixtures import gamelog_page  # noqa: E402
+
+
+def summary_href(player_id: int, name: str = 'Test Player') -> str:
+    return f"https://basketball.realgm.com/player/{name.replace(' ', '-')}/Summary/{player_id}"
+
+
+@pytest.fixture
+def player_frame():
+    """Factory for one player's frame, built as every engine hands it to GamelogWriter.
+
+    `pages` maps game types to parsed pages; by default it is the synthetic Playoffs page.
+    """
+    def make(player_id: int = 7, name: str = 'Test Player', pages: dict = None):
+        if pages is None:
+            pages = {'Playoffs': stats.parse_page(gamelog_page(player_id, 'Playoffs'))}
+        href = summary_href(player_id, name)
+        return stats.build_player_frame(name, href, stats.build_gamelogs_url(href), list(pages), list(pages.values()))
+
+    return make
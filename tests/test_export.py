@@ -0,0 +1,45 @@
+import sqlite3
+
+import pytest
+
+from export import export_gamelogs, read_gamelogs
+from storage import connect, fill_team_ids, upsert_gamelogs
+
+pytest.importorskip('pyarrow')
+
+
+def test_backfilled_team_ids_reach_the_export(tmp_path, player_frame):
+    db, out = str(tmp_path / 'gamelogs.db'), str(tmp_path / 'parquet')
+    conn = connect(db)
+    try:
+        upsert_gamelogs(conn, player_frame())
+        # A database from before the id columns: ids missing, rows otherwise identical
+        conn.execute("UPDATE gamelogs SET TeamID = NULL, OpponentID = NULL")
+        conn.commit()
+    finally:
+        conn.close()
+    export_gamelogs(db, out)
+    assert read_gamelogs(out)['TeamID'].isna().all()
+
+    conn = sqlite3.connect(db)
+    try:
+        fill_team_ids(conn.cursor())
+        conn.commit()
+    finally:
+        conn.close()
+    report = export_gamelogs(db, out)
+    assert report['written'] > 0
+    assert read_gamelogs(out)['TeamID'].notna().all()
+
+
+def test_row_hash_is_not_exported(tmp_path, player_frame):
+    db, out = str(tmp_path / 'gamelogs.db'), str(tmp_path / 'parquet')
+    conn = connect(db)
+    try:
+        upsert_gamelogs(conn, player_frame())
+    finally:
+        conn.close()
+    export_gamelogs(db, out)
+    df = read_gamelogs(out)
+    assert len(df) > 0 and 'RowHash' not in df.columns
+    assert 'PTS' in df.columns and 'Season' in df.columns
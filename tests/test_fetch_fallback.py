@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import stats
+from fixtures import gamelog_page, load_pages
+
+# Sanitized RealGM pages committed under benchmarks/fixtures/
+RECORDED = load_pages('gamelogs')
+EMPTY_PAGE = next(html for name, html in RECORDED.items() if name.endswith('_Play_In.html'))
+CHALLENGE_PAGE = next(iter(load_pages('challenge').values()))
+URLS = ['https://example.test/GameLogs/1/NBA/Playoffs', 'https://example.test/GameLogs/1/NBA/Reg']
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    """Records the URLs sent to the browser fallback, which answers with a real gamelog page."""
+    calls = []
+
+    def fake_selenium(urls, timeout=30, pool=None, session=None, cache=None, priorities=None):
+        calls.extend(urls)
+        return [gamelog_page(1, 'Playoffs') for _ in urls]
+
+    monkeypatch.setattr(stats, 'fetch_htmls_selenium', fake_selenium)
+    return calls
+
+
+def _serve(monkeypatch, pages: dict):
+    monkeypatch.setattr(stats, 'fetch_html', lambda url, **kwargs: pages[url])
+
+
+def test_needs_browser():
+    assert not any(stats.needs_browser(html) for html in RECORDED.values())
+    assert not stats.needs_browser(EMPTY_PAGE)
+    assert not stats.needs_browser(gamelog_page(1, 'Play-In'))
+    assert stats.needs_browser(CHALLENGE_PAGE)
+    assert stats.needs_browser('')
+    assert stats.needs_browser('<html><body>Not found</body></html>')
+
+
+def test_threads_engine_keeps_empty_pages_off_the_browser(monkeypatch, browser):
+    _serve(monkeypatch, {URLS[0]: EMPTY_PAGE, URLS[1]: CHALLENGE_PAGE})
+    frames = stats.fetch_gamelog_frames(URLS, session=object())
+    assert browser == [URLS[1]]
+    assert frames[0].empty and not frames[0].attrs.get('error')
+    assert not frames[1].empty
+
+
+def test_pipeline_engine_keeps_empty_pages_off_the_browser(monkeypatch, browser):
+    _serve(monkeypatch, {URLS[0]: EMPTY_PAGE, URLS[1]: CHALLENGE_PAGE})
+    htmls = stats.fetch_gamelog_htmls(URLS, session=object())
+    assert browser == [URLS[1]]
+    assert htmls[0] == EMPTY_PAGE
+
+
+def test_async_engine_keeps_empty_pages_off_the_browser(monkeypatch, browser):
+    href = 'https://basketball.realgm.com/player/Test-Player/Summary/1'
+    urls = stats.gamelog_page_urls(stats.build_gamelogs_url(href), ['Playoffs', 'Regular Season'])
+    pages = {urls[0]: EMPTY_PAGE, urls[1]: CHALLENGE_PAGE}
+
+    async def fake_fetch(urls, **kwargs):
+        for url in urls:
+            yield url, pages[url]
+
+    monkeypatch.setattr(stats, 'fetch_as_completed', fake_fetch)
+    frames = []
+    asyncio.run(stats._gather_players_async([('Test Player', href, None)], 4, 2, on_frame=frames.append,
+                                            page_plan={href: ['Playoffs', 'Regular Season']}))
+    assert browser == [urls[1]]
+    stages = {page['game_type']: page['stage'] for page in frames[0].attrs['pages'].values()}
+    assert stages == {'Playoffs': 'empty', 'Regular Season': 'parsed'}
+
+
+def test_async_engine_honors_browser_mode(monkeypatch, browser):
+    href = 'https://basketball.realgm.com/player/Test-Player/Summary/1'
+    urls = stats.gamelog_page_urls(stats.build_gamelogs_url(href), ['Playoffs'])
+
+    async def no_http(urls, **kwargs):
+        assert not urls
+        return
+        yield
+
+    monkeypatch.setattr(stats, 'fetch_as_completed', no_http)
+    frames = []
+    asyncio.run(stats._gather_players_async([('Test Player', href, None)], 4, 2, on_frame=frames.append,
+                                            page_plan={href: ['Playoffs']}, fetch_mode='browser'))
+    assert browser == urls
+    assert not frames[0].empty
+
+
+
+def test_async_engine_writes_off_the_event_loop(monkeypatch):
+    hrefs = [f'https://basketball.realgm.com/player/Test-Player/Summary/{pid}' for pid in (1, 2, 3)]
+
+    async def fake_fetch(urls, **kwargs):
+        for url in urls:
+            yield url, gamelog_page(1, 'Playoffs')
+
+    monkeypatch.setattr(stats, 'fetch_as_completed', fake_fetch)
+    loop_thread = threading.get_ident()
+    writes = []
+
+    def on_frame(df):
+        time.sleep(0.01)
+        writes.append((threading.get_ident(), stats.player_id_from_href(df.attrs['summary_href'])))
+
+    asyncio.run(stats._gather_players_async([('Test Player', href, None) for href in hrefs], 4, 2, on_frame=on_frame,
+                                            page_plan={href: ['Playoffs'] for href in hrefs}))
+    # Every frame is written, in arrival order, on one thread other than the loop's
+    assert [pid for _, pid in writes] == [1, 2, 3]
+    assert len({tid for tid, _ in writes}) == 1 and writes[0][0] != loop_thread
+
+def test_fixture_server_serves_recorded_pages_by_game_type():
+    from fixture_server import FixtureServer
+
+    server = FixtureServer()
+    assert server.page('/player/Any/GameLogs/42/NBA/All/Play-In') == EMPTY_PAGE
+    assert stats.parse_page(server.page('/player/Any/GameLogs/42/NBA/All/Playoffs')).shape[0] == 11
+    assert stats.parse_page(server.page('/player/Any/GameLogs/42/NBA/All/Preseason')).shape[0] == 4
@@ -0,0 +1,38 @@
+import stats
+from fixtures import gamelog_page
+from storage import load_watermarks, record_checked_pages
+
+
+def test_unchanged_page_advances_checked_at(tmp_path, player_frame):
+    db = str(tmp_path / 'gamelogs.db')
+    html = gamelog_page(7, 'Playoffs')
+    record_checked_pages(db, [(7, 'Playoffs')], '2026-01-01T00:00:00')
+
+    # The page matches the stored hash: nothing is parsed, the frame is empty
+    df = player_frame(pages={'Playoffs': stats.parse_page(html, stats.page_hash(html))})
+    assert df.empty
+    writer = stats.GamelogWriter(db, incremental=True)
+    writer.add(df)
+    writer.close()
+    record_checked_pages(db, sorted(writer.checked_pages), '2026-03-01T00:00:00')
+
+    _, checked = load_watermarks(db)
+    assert checked[(7, 'Playoffs')] == '2026-03-01T00:00:00'
+
+
+def test_empty_page_is_checked_but_failed_page_is_not(tmp_path, player_frame):
+    db = str(tmp_path / 'gamelogs.db')
+    empty = stats.parse_page('<html><body><div class="fixed-table-body"><table data-toggle="table">'
+                             '<thead><tr><th>Date</th></tr></thead><tbody></tbody></table></div></body></html>')
+    writer = stats.GamelogWriter(db, incremental=True)
+    writer.add(player_frame(pages={'Play-In': empty, 'Preseason': stats.parse_page('')}))
+    writer.close()
+    assert writer.checked_pages == {(7, 'Play-In')}
+
+
+def test_watermark_day_is_kept(player_frame):
+    df = player_frame()
+    dates = sorted(df['Date'].astype(str))
+    kept = stats.drop_rows_before_watermarks(df, {(7, 'Playoffs'): dates[-1]})
+    assert list(kept['Date'].astype(str)) == [d for d in df['Date'].astype(str) if d >= dates[-1]]
+    assert len(kept) >= 1
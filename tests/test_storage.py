@@ -0,0 +1,53 @@
+import sqlite3
+
+from storage import connect, merge_databases, row_hashes, upsert_gamelogs
+
+
+def test_upsert_leaves_the_callers_frame_alone(tmp_path, player_frame):
+    df = player_frame()
+    columns = list(df.columns)
+    conn = connect(str(tmp_path / 'gamelogs.db'))
+    try:
+        new, changed, unchanged = upsert_gamelogs(conn, df)
+    finally:
+        conn.close()
+    assert new == len(df) and not changed and not unchanged
+    assert list(df.columns) == columns
+    assert 'RowHash' not in df.columns and 'TeamID' not in df.columns
+
+
+def test_merge_rewrites_rows_without_row_hash(tmp_path, player_frame):
+    main_db, shard_db = str(tmp_path / 'gamelogs.db'), str(tmp_path / 'shard.db')
+    for path in (main_db, shard_db):
+        conn = connect(path)
+        try:
+            upsert_gamelogs(conn, player_frame())
+        finally:
+            conn.close()
+    # Rows from before RowHash existed: stale in the main database, fresh in the shard
+    conn = sqlite3.connect(main_db)
+    conn.execute("UPDATE gamelogs SET RowHash = NULL, PTS = -1")
+    conn.commit()
+    conn.close()
+    conn = sqlite3.connect(shard_db)
+    conn.execute("UPDATE gamelogs SET RowHash = NULL")
+    conn.commit()
+    conn.close()
+
+    merge_databases(main_db, [shard_db])
+    conn = sqlite3.connect(main_db)
+    try:
+        stale = conn.execute("SELECT COUNT(*) FROM gamelogs WHERE PTS = -1").fetchone()[0]
+    finally:
+        conn.close()
+    assert stale == 0
+
+
+def test_row_hash_ignores_how_the_batch_was_built(player_frame):
+    df = player_frame().assign(TeamID=None, OpponentID=None, RowHash=None)
+    df.loc[0, 'Status'] = None
+    rebuilt = df.astype({'PTS': str, 'FGPercent': str, 'Status': object})
+    rebuilt.loc[0, 'Status'] = float('nan')
+    assert list(row_hashes(df)) == list(row_hashes(rebuilt))
+    rebuilt.loc[1, 'PTS'] = '-1'
+    assert list(row_hashes(df)) != list(row_hashes(rebuilt))
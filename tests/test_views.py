@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+import stats
+import views
+from export import export_gamelogs
+from fixtures import gamelog_page
+from recent_games import refresh_recent_games
+from storage import connect, upsert_gamelogs
+
+# Two different players with the same name
+PLAYERS = [7, 8]
+
+
+@pytest.fixture
+def db(tmp_path, player_frame):
+    path = str(tmp_path / 'gamelogs.db')
+    conn = connect(path)
+    try:
+        for pid in PLAYERS:
+            pages = {'Regular Season': stats.parse_page(gamelog_page(pid, 'Reg'))}
+            upsert_gamelogs(conn, player_frame(pid, 'Jalen Brown', pages))
+    finally:
+        conn.close()
+    refresh_recent_games(path)
+    return path
+
+
+def test_players_sharing_a_name_are_listed_apart(db):
+    assert views.GamelogStore(db).players() == [(7, 'Jalen Brown'), (8, 'Jalen Brown')]
+
+
+def test_player_view_reads_one_player(db):
+    store = views.GamelogStore(db)
+    for pid in PLAYERS:
+        recent = store.recent_games(player_id=pid, n=10, columns=views.PLAYER_VIEW_COLS)
+        assert set(recent['PlayerID']) == {pid}
+        assert list(recent['LastN']) == list(range(1, 11))
+        assert set(store.gamelogs(player_id=pid, columns=views.PLAYER_VIEW_COLS)['PlayerID']) == {pid}
+
+
+def test_exported_player_view_reads_one_player(db, tmp_path):
+    pytest.importorskip('pyarrow')
+    export_dir = str(tmp_path / 'parquet')
+    export_gamelogs(db, export_dir)
+    store = views.GamelogStore(db, export_dir)
+    assert set(store.gamelogs(player_id=8, columns=views.PLAYER_VIEW_COLS)['PlayerID']) == {8}
+    assert store.players() == [(7, 'Jalen Brown'), (8, 'Jalen Brown')]
+
+
+def test_leaderboard_rows_are_keyed_by_player_id(db):
+    recent = views.GamelogStore(db).recent_games(columns=views.LEADERBOARD_COLS)
+    lines = {stat: 0 for stat in views.STAT_FIELDS}
+    lines['PTS'] = 1
+    display_df, temp = views.leaderboard(recent, pd.DataFrame(), 5, lines)
+    assert display_df.index.name == 'PlayerID'
+    assert sorted(display_df.index) == [7, 8]
+    for pid in display_df.index:
+        assert set(temp[temp['PlayerID'] == pid]['PlayerID']) == {pid}
@@ -0,0 +1,356 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from export import PARTITIONS_FILE, has_export, list_partitions, read_gamelogs as read_exported_gamelogs
+from schema import COMBO_STATS, GAME_STATS
+from recent_games import RECENT_GAMES_MAX, load_recent_games
+from storage import GAMELOG_DB_COLS
+
+COLUMNS_TO_DISPLAY = [
+    'Date', 'Team', 'Opponent', 'H/A', 'Rest', 'B2B', 'WL', 'Status', 'Pos', 'MIN',
+    'PTS', 'TPM', 'REB', 'AST', 'STL', 'BLK', 'TOV',
+    'P|R|A', 'P|A', 'P|R'
+]
+STAT_FIELDS = ['PTS', 'TPM', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'P|R|A', 'P|A', 'P|R']
+CONTEXT_KEY = ['PlayerID', 'Date', 'Opponent', 'GameType']
+# Columns each app view reads; the rest of the table stays on disk
+PLAYER_VIEW_COLS = ['PlayerID', 'Player', 'Season', 'GameType', 'Date', 'Team', 'Opponent', 'WL', 'Status', 'Pos',
+                    'MIN'] + GAME_STATS
+LEADERBOARD_COLS = ['PlayerID', 'Player', 'Season', 'GameType', 'Date', 'Team', 'Opponent', 'WL', 'Status',
+                    'MIN'] + GAME_STATS
+
+
+def list_seasons(db_path: str, export_dir: str = None) -> list[str]:
+    """Stored seasons, newest first, without loading any gamelog rows."""
+    if has_export(export_dir):
+        return sorted({season for season, _ in list_partitions(export_dir)}, reverse=True)
+    if not os.path.exists(db_path):
+        return []
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT DISTINCT Season FROM gamelogs WHERE Season IS NOT NULL").fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    finally:
+        conn.close()
+    return sorted((r[0] for r in rows), reverse=True)
+
+
+def _where(seasons: list = None, game_types: list = None, player_id: int = None) -> tuple[str, list]:
+    # Parameterized, so the plan is reused and the primary key / idx_gamelogs_season_type apply
+    clauses, params = [], []
+    for col, values in (('Season', seasons), ('GameType', game_types)):
+        if values:
+            clauses.append(f"{col} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    # By PlayerID, not name: two players can share a name
+    if player_id is not None:
+        clauses.append("PlayerID = ?")
+        params.append(int(player_id))
+    return (f" WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+
+def load_gamelogs(db_path: str, seasons: list = None, game_types: list = None, export_dir: str = None,
+                  columns: list = None, player_id: int = None) -> pd.DataFrame:
+    """Gamelogs of the given seasons, game types and player (all when omitted), only `columns` when given.
+
+    Reads only the matching partitions of the Parquet export when `export_dir` has one,
+    otherwise filters gamelogs.db in SQL.
+    """
+    columns = [c for c in columns if c in GAMELOG_DB_COLS] if columns else None
+    if has_export(export_dir):
+        df = read_exported_gamelogs(export_dir, seasons, game_types, columns, player_id)
+    elif os.path.exists(db_path):
+        where, params = _where(seasons, game_types, player_id)
+        select = ', '.join(columns) if columns else '*'
+        conn = sqlite3.connect(db_path)
+        try:
+            df = pd.read_sql_query(f"SELECT {select} FROM gamelogs{where}", conn, params=params)
+        finally:
+            conn.close()
+    else:
+        return pd.DataFrame()
+    if not df.empty:
+        if 'Season' in df.columns:
+            df['season_label'] = df['Season']
+        if 'GameType' in df.columns:
+            df['is_preseason'] = df['GameType'] == 'Preseason'
+    return df
+
+
+def list_players(db_path: str, seasons: list = None, game_types: list = None,
+                 export_dir: str = None) -> list[tuple[int, str]]:
+    """(PlayerID, Player) of the players with games in the given seasons and game types, sorted by name."""
+    if has_export(export_dir):
+        df = read_exported_gamelogs(export_dir, seasons, game_types, ['PlayerID', 'Player'])
+        rows = df.dropna().drop_duplicates(subset=['PlayerID']).itertuples(index=False, name=None)
+    elif os.path.exists(db_path):
+        where, params = _where(seasons, game_types)
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute(f"SELECT PlayerID, MAX(Player) FROM gamelogs{where} GROUP BY PlayerID", params).fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+        finally:
+            conn.close()
+    else:
+        return []
+    return sorted(((int(pid), name) for pid, name in rows if pid is not None and name is not None),
+                  key=lambda r: (r[1], r[0]))
+
+
+class GamelogStore:
+    """Read API over gamelogs.db (or its Parquet export) for app.py.
+
+    Sidebar filters and the column list are pushed into the query, so only the rows and
+    columns on screen are materialized. Results are kept in a small LRU cache keyed by the
+    data version (mtimes and sizes of the database, its WAL and the export manifest); any
+    write moves the version, and entries of older versions are dropped. Cached frames are
+    shared between callers and must not be modified in place.
+    """
+
+    def __init__(self, db_path: str, export_dir: str = None, cache_size: int = 32):
+        self.db_path = db_path
+        self.export_dir = export_dir
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def version(self) -> tuple:
+        paths = [self.db_path, self.db_path + '-wal']
+        if self.export_dir:
+            paths.append(os.path.join(self.export_dir, PARTITIONS_FILE))
+        version = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+                version.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                version.append(None)
+        return tuple(version)
+
+    def _cached(self, key: tuple, load):
+        version = self.version()
+        key = (version,) + key
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+        value = load()
+        with self._lock:
+            self.misses += 1
+            for stale in [k for k in self._cache if k[0] != version]:
+                del self._cache[stale]
+            self._cache[key] = value
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return value
+
+    def seasons(self) -> list[str]:
+        return self._cached(('seasons',), lambda: list_seasons(self.db_path, self.export_dir))
+
+    def players(self, seasons: list = None, game_types: list = None) -> list[tuple[int, str]]:
+        seasons, game_types = tuple(seasons or ()), tuple(game_types or ())
+        return self._cached(('players', seasons, game_types),
+                            lambda: list_players(self.db_path, list(seasons), list(game_types), self.export_dir))
+
+    def gamelogs(self, seasons: list = None, game_types: list = None, player_id: int = None,
+                 columns: list = None) -> pd.DataFrame:
+        seasons, game_types = tuple(seasons or ()), tuple(game_types or ())
+        columns = tuple(columns or ())
+        return self._cached(
+            ('gamelogs', seasons, game_types, player_id, columns),
+            lambda: load_gamelogs(self.db_path, list(seasons), list(game_types), self.export_dir,
+                                  list(columns), player_id),
+        )
+
+    def recent_games(self, seasons: list = None, game_types: list = None, n: int = RECENT_GAMES_MAX,
+                     player_id: int = None, columns: list = None) -> pd.DataFrame:
+        """Each player's `n` latest games from the recent_games table, ranked in `LastN`.
+
+        Falls back to the matching gamelogs (unranked) when the table is not there yet.
+        """
+        seasons, game_types = tuple(seasons or ()), tuple(game_types or ())
+        columns = tuple(columns or ())
+
+        def load():
+            df = load_recent_games(self.db_path, list(seasons), list(game_types), n, player_id, list(columns))
+            if df is None:
+                return load_gamelogs(self.db_path, list(seasons), list(game_types), self.export_dir,
+                                     list(columns), player_id)
+            return df
+
+        return self._cached(('recent_games', seasons, game_types, n, player_id, columns), load)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+def attach_schedule_context(df: pd.DataFrame, context: pd.DataFrame) -> pd.DataFrame:
+    """Gamelogs with their schedule_context columns (Home, DaysRest, BackToBack, Next*) joined on the game key."""
+    if df.empty or context is None or context.empty or not set(CONTEXT_KEY) <= set(df.columns):
+        return df
+    extra = [c for c in context.columns if c not in df.columns or c in CONTEXT_KEY]
+    return df.merge(context[extra], on=CONTEXT_KEY, how='left')
+
+
+def format_next_game(row) -> str:
+    """'@ Boston Celtics, 2026-01-05 (B2B)' from a load_next_games row; '' when nothing is scheduled."""
+    if row is None or pd.isna(row.get('NextDate')) or not row.get('NextDate'):
+        return ''
+    marker = {1: 'v.', 0: '@'}.get(row.get('NextHome'), 'vs')
+    opponent = str(row.get('NextOpponent') or '').replace('-', ' ')
+    b2b = ' (B2B)' if row.get('NextBackToBack') == 1 else ''
+    return f"{marker} {opponent}, {row['NextDate']}{b2b}"
+
+
+def add_combo_stats(df: pd.DataFrame) -> None:
+    for combo, parts in COMBO_STATS:
+        # recent_games rows arrive with the sums already computed at ingest
+        if combo not in df.columns and all(p in df.columns for p in parts):
+            df[combo] = df[parts].astype(float).sum(axis=1)
+
+
+def make_display_df(df_source: pd.DataFrame, n: int) -> pd.DataFrame:
+    """Player view: the `n` most recent games with combo stats and display formatting."""
+    if df_source.empty:
+        return pd.DataFrame(columns=COLUMNS_TO_DISPLAY)
+    if 'LastN' in df_source.columns:
+        # Ranked by GamelogStore.recent_games: the window is a filter, not a sort
+        temp = df_source[df_source['LastN'] <= n].copy()
+    else:
+        temp = df_source.sort_values('Date', ascending=False).head(n).copy()
+
+    add_combo_stats(temp)
+
+    if 'Date' in temp.columns:
+        temp['Date'] = pd.to_datetime(temp['Date'], errors='coerce').dt.strftime('%Y-%m-%d')
+
+    if 'Home' in temp.columns:
+        temp['H/A'] = temp['Home'].map({1: 'H', 0: 'A'}).fillna('')
+        temp['Rest'] = temp['DaysRest'].apply(lambda x: str(int(x)) if pd.notnull(x) else '')
+        temp['B2B'] = temp['BackToBack'].map({1: 'B2B'}).fillna('')
+
+    for col in ['FGPercent', 'TPPercent', 'FTPercent', 'FIC']:
+        if col in temp.columns:
+            temp[col] = temp[col].apply(lambda x: f'{x:.3f}' if pd.notnull(x) else '')
+
+    for col in COLUMNS_TO_DISPLAY:
+        if col not in temp.columns:
+            temp[col] = ''
+
+    return temp[COLUMNS_TO_DISPLAY].copy()
+
+
+def compute_percent_hits(display_df: pd.DataFrame, stat_inputs: dict) -> dict:
+    results = {}
+    n = len(display_df)
+    if n == 0:
+        for stat in STAT_FIELDS:
+            results[stat] = None
+        return results
+    for stat in STAT_FIELDS:
+        if stat in display_df.columns and stat_inputs[stat] > 0:
+            mask = display_df[stat].astype(float) >= stat_inputs[stat]
+            percent = mask.sum() / n * 100
+            results[stat] = percent
+        else:
+            results[stat] = None
+    return results
+
+
+def _active_streak(series) -> int:
+    streak = 0
+    for val in series:
+        if val == 1:
+            streak += 1
+        else:
+            break
+    return streak
+
+
+def leaderboard(df_all: pd.DataFrame, players_base_df: pd.DataFrame, n_games: int,
+                stat_inputs: dict, next_games: pd.DataFrame = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Stat view: top 10 players hitting every active stat line in their last `n_games`.
+
+    Returns (display table, gamelogs with combo stats for the per-player drill-down).
+    The display table is indexed by PlayerID (Player for frames without ids), the key to
+    look the drill-down rows up by. It is empty when nobody hit the lines. With `next_games`
+    (schedule_context.load_next_games) a 'Next Game' column is added.
+    """
+    temp = df_all.copy()
+    add_combo_stats(temp)
+
+    cols_to_keep = ['PlayerID', 'Player', 'Date', 'LastN'] + [col for col in STAT_FIELDS if stat_inputs[col] > 0]
+    temp_filtered = temp[[c for c in cols_to_keep if c in temp.columns]].copy()
+    # Players are told apart by PlayerID (names can collide); the roster is joined on it too
+    key = 'PlayerID' if 'PlayerID' in temp_filtered.columns else 'Player'
+    if key == 'PlayerID':
+        temp_filtered['PlayerID'] = pd.to_numeric(temp_filtered['PlayerID'], errors='coerce')
+
+    if 'LastN' in temp_filtered.columns:
+        # recent_games rows come ranked per player, newest first
+        temp_filtered = temp_filtered[temp_filtered['LastN'] <= n_games]
+    else:
+        temp_filtered['Date'] = pd.to_datetime(temp_filtered['Date'], errors='coerce')
+        temp_filtered = temp_filtered.sort_values([key, 'Date'], ascending=[True, False])
+        temp_filtered = temp_filtered.groupby(key).head(n_games)
+
+    hit_mask = pd.Series([True] * len(temp_filtered), index=temp_filtered.index)
+    for stat in STAT_FIELDS:
+        if stat_inputs[stat] > 0 and stat in temp_filtered.columns:
+            hit_mask = hit_mask & (temp_filtered[stat].astype(float) >= stat_inputs[stat])
+
+    temp_filtered['Hit'] = hit_mask.astype(int)
+
+    names = {'Player': ('Player', 'first')} if key == 'PlayerID' else {}
+    agg_df = temp_filtered.groupby(key).agg(
+        **names,
+        Hits=('Hit', 'sum'),
+        GamesPlayed=('Hit', 'count'),
+        ActiveStreak=('Hit', _active_streak)
+    ).reset_index()
+
+    agg_df = agg_df[agg_df['Hits'] > 0]
+
+    display_cols = ['Player', 'Pos', 'Age', 'Current Team', 'YOS', 'ActiveStreak', 'Hit Rate']
+    with_next = next_games is not None and not next_games.empty and key == 'PlayerID'
+    if with_next:
+        display_cols.append('Next Game')
+    if agg_df.empty:
+        empty = pd.DataFrame(columns=display_cols, index=pd.Index([], name=key))
+        return empty.rename(columns={'ActiveStreak': 'Active Streak'}), temp
+
+    if not players_base_df.empty and key in players_base_df.columns:
+        roster = players_base_df[[key, 'Pos', 'Age', 'Current Team', 'YOS']].drop_duplicates(subset=[key])
+        if key == 'PlayerID':
+            roster = roster.assign(PlayerID=pd.to_numeric(roster['PlayerID'], errors='coerce'))
+        agg_df = agg_df.merge(roster, on=key, how='left')
+    else:
+        for col in ['Pos', 'Age', 'Current Team', 'YOS']:
+            agg_df[col] = ''
+
+    if with_next:
+        upcoming = next_games.assign(PlayerID=pd.to_numeric(next_games['PlayerID'], errors='coerce'))
+        upcoming = upcoming.set_index('PlayerID').apply(format_next_game, axis=1)
+        agg_df['Next Game'] = agg_df['PlayerID'].map(upcoming).fillna('')
+
+    agg_df['IsHotStreak'] = agg_df['ActiveStreak'] >= 3
+    agg_df['LastName'] = agg_df['Player'].apply(lambda n: n.split(' ')[-1] if isinstance(n, str) and ' ' in n else n)
+    agg_df = agg_df.sort_values(['IsHotStreak', 'Hits', 'LastName'], ascending=[False, False, True]).head(10)
+    keys = pd.Index(agg_df[key], name=key)
+
+    agg_df['Player'] = agg_df.apply(lambda r: f"🔥 {r['Player']}" if r['IsHotStreak'] else r['Player'], axis=1)
+    agg_df['Hit Rate'] = agg_df.apply(lambda r: f"{r['Hits']} / {r['GamesPlayed']}", axis=1)
+
+    display_df = agg_df[display_cols].set_axis(keys)
+    display_df.rename(columns={'ActiveStreak': 'Active Streak'}, inplace=True)
+    return display_df, temp